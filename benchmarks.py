@@ -0,0 +1,418 @@
+"""
+Pipeline Micro-Benchmarks
+Run from the repository root, e.g.:
+
+    python benchmarks.py clean
+    python benchmarks.py backends --dir path/to/pdfs
+    python benchmarks.py formats --scale 50
+    python benchmarks.py profiles
+    python benchmarks.py storage --backends local,gdrive
+"""
+
+import argparse
+import contextlib
+import difflib
+import io
+import multiprocessing
+import os
+import re
+import resource
+import statistics
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import PyPDF2
+
+from src.app.blob_storage import get_storage
+from src.app.extraction_backends import available_backends, get_backend
+from src.app.parquet_creator import (
+    WRITE_PROFILES, ParquetCreator, chunk_table, parquet_writer_options, resolve_write_profile
+)
+from src.app.pdf_processor import PDFProcessor, clean_page_text
+from src.app.text_artifacts import artifact_path, save_text_artifact
+
+# Bundled arXiv papers
+SAMPLE_PDFS = [
+    "1706.03762v7.pdf",  # Transformer paper
+    "2005.11401v4.pdf",  # RAG paper
+]
+
+
+def _time_best(func, repeat: int) -> float:
+    """Best wall-clock time of several runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _clean_text_legacy(text: str) -> str:
+    """Original three-pass cleaning over the concatenated document"""
+    text = re.sub(r'\s+', ' ', text)
+    text = text.replace('\x00', '')
+    return text.strip()
+
+
+# Translation table + one regex, per page
+_TRANSLATE_TABLE = str.maketrans(
+    {code: ' ' for code in range(0x3001) if chr(code).isspace()} | {0: None}
+)
+_SPACE_RUN_RE = re.compile(r' {2,}')
+
+
+def _clean_text_translate(text: str) -> str:
+    """Candidate cleaner: translation table then one regex"""
+    return _SPACE_RUN_RE.sub(' ', text.translate(_TRANSLATE_TABLE)).strip(' ')
+
+
+def benchmark_clean(args):
+    """Compare text cleaning implementations on the bundled PDFs"""
+    print("=" * 60)
+    print("TEXT CLEANING BENCHMARK")
+    print("=" * 60)
+
+    # Extract raw page text once; replicate it to emulate a large document
+    pages = []
+    for pdf_file in SAMPLE_PDFS:
+        pages.extend(page.extract_text() for page in PyPDF2.PdfReader(pdf_file).pages)
+    pages = pages * args.scale
+
+    size_mb = sum(len(page) for page in pages) / 1e6
+    print(f"\n📄 {len(pages)} pages, {size_mb:.1f} MB of raw text (scale x{args.scale})")
+
+    candidates = {
+        'legacy (3 passes, whole doc)':
+            lambda: _clean_text_legacy(''.join(page + "\n\n" for page in pages)),
+        'translate + regex (per page)':
+            lambda: ' '.join(text for text in map(_clean_text_translate, pages) if text),
+        'clean_page_text (per page)':
+            lambda: ' '.join(text for text in map(clean_page_text, pages) if text),
+    }
+
+    baseline = None
+    expected = None
+    print(f"\n{'Implementation':<32} {'Best (ms)':>10} {'MB/s':>8} {'Speedup':>8}  Same output")
+    print("-" * 72)
+    for name, func in candidates.items():
+        output = func()
+        elapsed = _time_best(func, args.repeat)
+        if baseline is None:
+            baseline, expected = elapsed, output
+        print(f"{name:<32} {elapsed * 1000:>10.1f} {size_mb / elapsed:>8.1f} "
+              f"{baseline / elapsed:>7.2f}x  {'✓' if output == expected else '✗'}")
+
+
+def _run_backend(name: str, paths: list) -> dict:
+    """Extract every page with one backend (runs in a fresh process)"""
+    backend = get_backend(name)
+    pdf_files = []
+    for path in paths:
+        with open(path, 'rb') as file:
+            pdf_files.append(file.read())
+
+    # ru_maxrss is the process peak in KB; measure growth over the baseline
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+
+    pages = []
+    for pdf_bytes in pdf_files:
+        document = backend.open(pdf_bytes)
+        pages.extend(clean_page_text(backend.page_text(document, page_index))
+                     for page_index in range(backend.page_count(document)))
+        backend.close(document)
+
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {'pages': pages, 'seconds': elapsed, 'peak_mb': (peak_kb - baseline_kb) / 1024}
+
+
+def _similarity(pages: list, reference: list) -> float:
+    """Mean word-level similarity of each page to the reference extraction"""
+    if len(pages) != len(reference):
+        return 0.0
+    ratios = [difflib.SequenceMatcher(None, page.split(), expected.split(),
+                                      autojunk=False).ratio()
+              for page, expected in zip(pages, reference)]
+    return sum(ratios) / max(1, len(ratios))
+
+
+def benchmark_backends(args):
+    """Compare every installed extraction backend on a set of PDFs"""
+    print("=" * 60)
+    print("EXTRACTION BACKEND BENCHMARK")
+    print("=" * 60)
+
+    if args.dir:
+        paths = sorted(os.path.join(args.dir, name) for name in os.listdir(args.dir)
+                       if name.lower().endswith('.pdf'))
+    else:
+        paths = SAMPLE_PDFS
+
+    names = args.backends.split(',') if args.backends else available_backends()
+    if args.reference not in names:
+        names.insert(0, args.reference)
+    print(f"\n📄 {len(paths)} PDF(s), backends: {', '.join(names)}")
+
+    # A fresh process per backend keeps peak memory and imports separate
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for name in names:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(_run_backend, (name, paths))
+
+    reference = results[args.reference]['pages']
+    print(f"\n{'Backend':<12} {'Pages':>6} {'Seconds':>8} {'Pages/s':>8} "
+          f"{'Peak MB':>8} {'Similarity':>11}")
+    print("-" * 58)
+    for name, result in results.items():
+        pages = len(result['pages'])
+        print(f"{name:<12} {pages:>6} {result['seconds']:>8.2f} "
+              f"{pages / result['seconds']:>8.1f} {result['peak_mb']:>8.1f} "
+              f"{_similarity(result['pages'], reference):>10.1%}")
+    print(f"\nSimilarity is word-level, per page, against {args.reference}")
+
+
+def _resident_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _load_format(path: str, file_format: str) -> dict:
+    """Load a chunk file, then scan its text (runs in a fresh process)"""
+    # read_table imports the dataset module on first use; keep that out
+    import pyarrow.dataset  # noqa: F401
+
+    baseline_mb = _resident_mb()
+    start = time.perf_counter()
+
+    if file_format == 'parquet':
+        table = pq.read_table(path, memory_map=True)
+    else:
+        table = ParquetCreator().read_feather(path)
+
+    load_seconds = time.perf_counter() - start
+    load_mb = _resident_mb() - baseline_mb
+
+    # Reading every character touches all text pages of a mapped file
+    start = time.perf_counter()
+    pc.sum(pc.utf8_length(table.column('text'))).as_py()
+    scan_seconds = time.perf_counter() - start
+
+    return {
+        'rows': table.num_rows,
+        'load_seconds': load_seconds,
+        'load_mb': load_mb,
+        'scan_seconds': scan_seconds,
+        'scan_mb': _resident_mb() - baseline_mb
+    }
+
+
+def _sample_chunk_table(scale: int) -> pa.Table:
+    """Chunk table of the bundled papers, rechunked scale times"""
+    # A different chunk size per copy keeps copies from collapsing into
+    # Parquet dictionary entries
+    results = [PDFProcessor().process_pdf(pdf_file) for pdf_file in SAMPLE_PDFS]
+    tables = []
+    for copy in range(scale):
+        processor = PDFProcessor(chunk_size=300 + copy, overlap=30)
+        tables.extend(
+            chunk_table(processor.chunk_text(result['full_text'], result['page_starts']),
+                        {'filename': pdf_file})
+            for pdf_file, result in zip(SAMPLE_PDFS, results))
+    return pa.concat_tables(tables).combine_chunks()
+
+
+def benchmark_formats(args):
+    """Compare loading chunk files as Parquet and as Arrow IPC"""
+    print("=" * 60)
+    print("CHUNK FILE FORMAT BENCHMARK")
+    print("=" * 60)
+
+    table = _sample_chunk_table(args.scale)
+    print(f"\n📄 {table.num_rows} chunks, {table.nbytes / 1e6:.1f} MB in memory "
+          f"(scale x{args.scale})")
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        files = {
+            'parquet': os.path.join(directory, 'chunks.parquet'),
+            'feather': os.path.join(directory, 'chunks.arrow'),
+            'feather-lz4': os.path.join(directory, 'chunks-lz4.arrow'),
+        }
+        pq.write_table(table, files['parquet'])
+        feather.write_feather(table, files['feather'], compression='uncompressed')
+        feather.write_feather(table, files['feather-lz4'], compression='lz4')
+
+        print(f"\n{'Format':<12} {'Size MB':>8} {'Load ms':>8} {'Load RSS':>9} "
+              f"{'Scan ms':>8} {'Scan RSS':>9}")
+        print("-" * 60)
+        for name, path in files.items():
+            file_format = 'parquet' if name == 'parquet' else 'feather'
+            # Best of several fresh processes; the file stays in the page cache
+            runs = []
+            for _ in range(args.repeat):
+                with context.Pool(1) as pool:
+                    runs.append(pool.apply(_load_format, (path, file_format)))
+            result = min(runs, key=lambda run: run['load_seconds'])
+            print(f"{name:<12} {os.path.getsize(path) / 1e6:>8.1f} "
+                  f"{result['load_seconds'] * 1000:>8.1f} {result['load_mb']:>8.1f}M "
+                  f"{result['scan_seconds'] * 1000:>8.1f} {result['scan_mb']:>8.1f}M")
+
+    print("\nRSS is growth over the process baseline; mapped Arrow pages count "
+          "only once touched")
+
+
+def benchmark_profiles(args):
+    """Compare Parquet write profiles on chunks of the bundled PDFs"""
+    print("=" * 60)
+    print("PARQUET WRITE PROFILE BENCHMARK")
+    print("=" * 60)
+
+    table = _sample_chunk_table(args.scale)
+    pages = pc.max(table.column('end_page')).as_py()
+    print(f"\n📄 {table.num_rows} chunks, {table.nbytes / 1e6:.1f} MB in memory "
+          f"(scale x{args.scale})")
+
+    # A selective query: a few columns of the chunks on one page
+    lookup = {'columns': ['chunk_id', 'start_page'], 'filters': [('start_page', '=', pages)]}
+
+    print(f"\n{'Profile':<16} {'Write ms':>9} {'Size MB':>8} {'Ratio':>6} "
+          f"{'Scan ms':>8} {'Lookup ms':>10}")
+    print("-" * 62)
+    with tempfile.TemporaryDirectory() as directory:
+        for name in WRITE_PROFILES:
+            settings = resolve_write_profile(name)
+            options = parquet_writer_options(settings, table.column_names)
+            path = os.path.join(directory, f"{name}.parquet")
+
+            write_seconds = _time_best(
+                lambda: pq.write_table(table, path, row_group_size=settings['row_group_rows'],
+                                       **options), args.repeat)
+            scan_seconds = _time_best(lambda: pq.read_table(path), args.repeat)
+            lookup_seconds = _time_best(lambda: pq.read_table(path, **lookup), args.repeat)
+
+            size = os.path.getsize(path)
+            print(f"{name:<16} {write_seconds * 1000:>9.1f} {size / 1e6:>8.2f} "
+                  f"{table.nbytes / size:>5.1f}x {scan_seconds * 1000:>8.1f} "
+                  f"{lookup_seconds * 1000:>10.1f}")
+
+    print(f"\nScan reads every column; lookup reads 2 columns of page {pages}")
+
+
+def _store_document(storage, pdf_path: str, output_paths: list):
+    """The storage calls PDFPipeline makes for one document"""
+    file_id = storage.upload_file(pdf_path, 'upload')['id']
+    for source_folder, target_folder in (('upload', 'staging'), ('staging', 'processing')):
+        batch = storage.batch()
+        batch.move_file(file_id, source_folder, target_folder)
+        batch.execute()
+    for output_path in output_paths:
+        storage.upload_file(output_path, 'parquet')
+    batch = storage.batch()
+    batch.move_file(file_id, 'processing', 'processed')
+    batch.execute()
+
+
+def benchmark_storage(args):
+    """Per-document pipeline latency on each storage backend"""
+    print("=" * 60)
+    print("STORAGE BACKEND BENCHMARK")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Processing does not depend on the backend, so it runs once
+        documents = []
+        for pdf_file in SAMPLE_PDFS:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = PDFProcessor().process_pdf(pdf_file)
+                parquet_path = os.path.join(directory, pdf_file.replace('.pdf', '.parquet'))
+                ParquetCreator().create_parquet(result['chunks'], parquet_path, {'filename': pdf_file})
+                text_path = artifact_path(parquet_path)
+                save_text_artifact(text_path, result, {'filename': pdf_file})
+            documents.append((pdf_file, [parquet_path, text_path], time.perf_counter() - start))
+        process_ms = statistics.median(seconds for _, _, seconds in documents) * 1000
+
+        print(f"\n📄 {len(documents)} documents, {args.repeat} run(s) each; "
+              f"processing takes {process_ms:.0f} ms per document on any backend")
+        print(f"\n{'Backend':<10} {'Storage ms':>11} {'Total ms':>9} {'Storage share':>14}")
+        print("-" * 48)
+        for name in args.backends.split(','):
+            options = {'root': os.path.join(directory, 'storage')} if name == 'local' else {}
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    storage = get_storage(name, **options)
+                    storage.setup_pipeline_folders()
+            except Exception as e:
+                print(f"{name:<10} skipped: {e}")
+                continue
+
+            runs = []
+            for _ in range(args.repeat):
+                for pdf_file, output_paths, _ in documents:
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        _store_document(storage, pdf_file, output_paths)
+                    runs.append(time.perf_counter() - start)
+
+            storage_ms = statistics.median(runs) * 1000
+            print(f"{name:<10} {storage_ms:>11.1f} {process_ms + storage_ms:>9.0f} "
+                  f"{storage_ms / (process_ms + storage_ms):>13.1%}")
+
+    print("\nStorage is one upload, three moves and the output uploads, per document "
+          "(median); gdrive runs leave their files in Drive")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline micro-benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    clean_parser = subparsers.add_parser('clean', help="Text cleaning implementations")
+    clean_parser.add_argument('--scale', type=int, default=20,
+                              help="Replicate the sample pages this many times")
+    clean_parser.add_argument('--repeat', type=int, default=5)
+    clean_parser.set_defaults(func=benchmark_clean)
+
+    backends_parser = subparsers.add_parser('backends', help="Text extraction backends")
+    backends_parser.add_argument('--dir', help="Directory of PDFs (default: bundled papers)")
+    backends_parser.add_argument('--backends',
+                                 help="Comma-separated backend names (default: all installed)")
+    backends_parser.add_argument('--reference', default='pypdf2',
+                                 help="Backend the text similarity is measured against")
+    backends_parser.set_defaults(func=benchmark_backends)
+
+    formats_parser = subparsers.add_parser('formats', help="Parquet vs Arrow IPC loading")
+    formats_parser.add_argument('--scale', type=int, default=50,
+                                help="Replicate the sample chunks this many times")
+    formats_parser.add_argument('--repeat', type=int, default=3)
+    formats_parser.set_defaults(func=benchmark_formats)
+
+    profiles_parser = subparsers.add_parser('profiles', help="Parquet write profiles")
+    profiles_parser.add_argument('--scale', type=int, default=50,
+                                 help="Rechunk the sample papers this many times")
+    profiles_parser.add_argument('--repeat', type=int, default=3)
+    profiles_parser.set_defaults(func=benchmark_profiles)
+
+    storage_parser = subparsers.add_parser('storage', help="Pipeline latency per storage backend")
+    storage_parser.add_argument('--backends', default='local',
+                                help="Comma-separated storage backends (gdrive needs credentials)")
+    storage_parser.add_argument('--repeat', type=int, default=5)
+    storage_parser.set_defaults(func=benchmark_storage)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,10 @@ Processes PDFs and creates Parquet files directly
 """
 
 from src.app.pdf_processor import PDFProcessor
-import pandas as pd
+from src.app.text_artifacts import artifact_path, save_text_artifact
+import pyarrow.parquet as pq
 import os
+import time
 
 # Your PDF files (adjust names as needed)
 pdf_files = [
@@ -15,82 +17,121 @@ pdf_files = [
     # "rag.pdf",
 ]
 
-# Initialize processor
-processor = PDFProcessor(chunk_size=500, overlap=50)
-
-print("=" * 60)
-print("DIRECT PDF PROCESSING")
-print("=" * 60)
-
-results = []
-
-for pdf_file in pdf_files:
-    print(f"\n{'='*60}")
-    print(f"Processing: {pdf_file}")
-    print('='*60)
-    
-    # Check if file exists
-    if not os.path.exists(pdf_file):
-        print(f"❌ File not found: {pdf_file}")
-        print(f"   Looking in: {os.getcwd()}")
-        continue
-    
-    try:
-        # Process the PDF
-        result = processor.process_pdf(pdf_file)
-        
+
+def main():
+    """Process pdf_files in parallel, writing Parquet and text artifacts"""
+
+    # Initialize processor (re-runs reuse cached extractions)
+    processor = PDFProcessor(chunk_size=500, overlap=50, cache_dir=".pdf_cache")
+
+    # One worker process per CPU core
+    workers = os.cpu_count() or 1
+
+    print("=" * 60)
+    print("DIRECT PDF PROCESSING")
+    print("=" * 60)
+
+    # Check files exist before handing them to the worker pool
+    existing_files = []
+    for pdf_file in pdf_files:
+        if not os.path.exists(pdf_file):
+            print(f"\n❌ File not found: {pdf_file}")
+            print(f"   Looking in: {os.getcwd()}")
+            continue
+        existing_files.append(pdf_file)
+
+    results = []
+    errors = []
+    start_time = time.perf_counter()
+
+    # Documents are processed in parallel and reported as they finish
+    for outcome in processor.process_many(existing_files, workers=workers):
+        pdf_file = outcome['path']
+
+        print(f"\n{'='*60}")
+        print(f"Processed: {pdf_file} ({outcome['elapsed']:.2f}s)")
+        print('='*60)
+
+        if outcome['error']:
+            print(f"\n❌ ERROR processing {pdf_file}")
+            print(f"   {outcome['error']}")
+            errors.append(outcome)
+            continue
+
+        result = outcome['result']
+
         # Show metadata
         print(f"\n📄 METADATA:")
         print(f"   Title: {result['metadata'].get('title', 'N/A')}")
         print(f"   Pages: {result['metadata']['page_count']}")
         print(f"   Words: {result['metadata']['word_count']}")
         print(f"   Chunks: {result['metadata']['chunk_count']}")
-        
+
         # Show text preview
         print(f"\n📝 TEXT PREVIEW (first 300 chars):")
         print(f"   {result['full_text'][:300]}...")
-        
+
         # Create Parquet file
         output_name = pdf_file.replace('.pdf', '_chunks.parquet')
-        chunks_df = pd.DataFrame(result['chunks'])
-        chunks_df.to_parquet(output_name, index=False)
-        
+        pq.write_table(result['chunks'].to_arrow(), output_name)
+
+        # Cleaned text next to the Parquet file, for rechunking without the PDF
+        text_name = artifact_path(output_name)
+        save_text_artifact(text_name, result)
+
         print(f"\n✅ SUCCESS!")
         print(f"   Parquet saved: {output_name}")
+        print(f"   Text saved: {text_name}")
         print(f"   Chunks created: {len(result['chunks'])}")
-        
+
         # Save result
         results.append({
             'filename': pdf_file,
             'pages': result['metadata']['page_count'],
             'words': result['metadata']['word_count'],
             'chunks': result['metadata']['chunk_count'],
-            'parquet_file': output_name
+            'parquet_file': output_name,
+            'seconds': outcome['elapsed']
         })
-        
-    except Exception as e:
-        print(f"\n❌ ERROR processing {pdf_file}")
-        print(f"   {str(e)}")
-        import traceback
-        traceback.print_exc()
-
-# Summary
-print("\n" + "=" * 60)
-print("PROCESSING COMPLETE")
-print("=" * 60)
-
-if results:
-    print("\n📊 SUMMARY:")
-    for r in results:
-        print(f"\n✓ {r['filename']}")
-        print(f"  Pages: {r['pages']} | Words: {r['words']} | Chunks: {r['chunks']}")
-        print(f"  Output: {r['parquet_file']}")
-    
-    print(f"\n🎉 Successfully processed {len(results)} PDF(s)!")
-    print("\n📁 Parquet files ready for LLM/RAG system!")
-else:
-    print("\n⚠️  No PDFs were processed successfully")
-    print("\nTroubleshooting:")
-    print("1. Make sure PDFs are in the same folder as this script")
-    print("2. Check PDF filenames in the script match your actual files")
-    print("3. Verify PyPDF2 is installed: pip install PyPDF2")
+
+    elapsed = time.perf_counter() - start_time
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("PROCESSING COMPLETE")
+    print("=" * 60)
+
+    if results:
+        print("\n📊 SUMMARY:")
+        for r in results:
+            print(f"\n✓ {r['filename']}")
+            print(f"  Pages: {r['pages']} | Words: {r['words']} | Chunks: {r['chunks']} | Time: {r['seconds']:.2f}s")
+            print(f"  Output: {r['parquet_file']}")
+
+        total_pages = sum(r['pages'] for r in results)
+        print(f"\n⏱️  THROUGHPUT ({workers} worker(s)):")
+        print(f"   Wall time: {elapsed:.2f}s")
+        print(f"   Pages/sec: {total_pages / elapsed:.1f}")
+        print(f"   Documents/sec: {len(results) / elapsed:.2f}")
+
+        cache_stats = processor.cache.stats()
+        print(f"\n💾 Cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es)")
+
+        print(f"\n🎉 Successfully processed {len(results)} PDF(s)!")
+        print("\n📁 Parquet files ready for LLM/RAG system!")
+    else:
+        print("\n⚠️  No PDFs were processed successfully")
+        print("\nTroubleshooting:")
+        print("1. Make sure PDFs are in the same folder as this script")
+        print("2. Check PDF filenames in the script match your actual files")
+        print("3. Verify PyPDF2 is installed: pip install PyPDF2")
+
+    if errors:
+        print(f"\n⚠️  {len(errors)} PDF(s) failed:")
+        for outcome in errors:
+            print(f"   {outcome['path']}: {outcome['error']}")
+
+
+# The worker pool re-imports this module in spawn/forkserver children
+if __name__ == "__main__":
+    main()
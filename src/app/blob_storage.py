@@ -0,0 +1,178 @@
+"""
+Blob Storage Module
+Interface shared by the pipeline's storage backends, selected by name
+"""
+
+import os
+from typing import Dict, List, Optional
+
+
+# Environment variable naming the backend when none is passed explicitly
+STORAGE_ENV_VAR = 'PDF_STORAGE_BACKEND'
+DEFAULT_STORAGE = 'gdrive'
+STORAGE_BACKENDS = ('gdrive', 'local')
+
+# Root directory of the local backend
+LOCAL_ROOT_ENV_VAR = 'PDF_LOCAL_STORAGE_ROOT'
+DEFAULT_LOCAL_ROOT = 'local_storage'
+
+# Folders a document moves through, plus the outputs folder
+PIPELINE_FOLDERS = ['upload', 'staging', 'processing', 'processed', 'parquet']
+
+
+class BlobStorage:
+    """
+    Base class for pipeline storage backends
+
+    Files live in named folders and keep their ID when moved between
+    them, so a document's upload ID identifies it at every stage.
+    """
+
+    # Shown in pipeline progress messages
+    label = ''
+
+    def upload_file(self, file_path: str, folder_name: str, filename: Optional[str] = None) -> Dict:
+        """
+        Upload a file to a folder
+
+        Args:
+            file_path: Local path to file
+            folder_name: Name of folder
+            filename: Name to store it under (defaults to original filename)
+
+        Returns:
+            dict with file info (id, name, size, created_time)
+        """
+        raise NotImplementedError
+
+    def download_file(self, file_id: str, destination_path: str) -> bool:
+        """
+        Download a file
+
+        Args:
+            file_id: ID returned by upload_file
+            destination_path: Where to save the file locally
+
+        Returns:
+            True if successful, False otherwise
+        """
+        raise NotImplementedError
+
+    def move_file(self, file_id: str, source_folder: str, target_folder: str) -> Dict:
+        """
+        Move a file from one folder to another
+
+        Args:
+            file_id: ID returned by upload_file
+            source_folder: Source folder name
+            target_folder: Target folder name
+
+        Returns:
+            Updated file info
+        """
+        raise NotImplementedError
+
+    def list_files_in_folder(self, folder_name: str) -> List[Dict]:
+        """
+        List all files in a folder
+
+        Args:
+            folder_name: Name of folder
+
+        Returns:
+            List of file dicts (id, name, size, createdTime)
+        """
+        raise NotImplementedError
+
+    def setup_pipeline_folders(self) -> Dict[str, str]:
+        """
+        Create all pipeline folders
+
+        Returns:
+            dict mapping folder names to IDs
+        """
+        raise NotImplementedError
+
+    def batch(self) -> 'StorageBatch':
+        """
+        Start a queue of moves executed together
+
+        Returns:
+            StorageBatch bound to this storage
+        """
+        return StorageBatch(self)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}>"
+
+
+class StorageBatch:
+    """
+    Queue of moves run one at a time, with per-item results
+
+    Backends with a bulk API send the queue as one request instead (see
+    DriveBatch).
+    """
+
+    def __init__(self, storage: BlobStorage):
+        self.storage = storage
+        self.calls = []
+
+    def __len__(self):
+        return len(self.calls)
+
+    def move_file(self, file_id: str, source_folder: str, target_folder: str):
+        """Queue a move; its result is the updated file info"""
+        self.calls.append(('move_file', file_id, source_folder, target_folder))
+
+    def execute(self) -> List[Dict]:
+        """
+        Run every queued call and empty the queue
+
+        Returns:
+            List with one dict per queued call, in queue order: 'result'
+            (as the unbatched method would return it) and 'error' (the
+            exception the call raised, or None)
+        """
+        calls, self.calls = self.calls, []
+
+        results = []
+        for kind, *args in calls:
+            try:
+                results.append({'result': getattr(self.storage, kind)(*args), 'error': None})
+            except OSError as e:
+                results.append({'result': None, 'error': e})
+
+        return results
+
+
+def get_storage(name: Optional[str] = None, **options) -> BlobStorage:
+    """
+    Create a storage backend by name
+
+    Args:
+        name: 'gdrive' or 'local' (None = $PDF_STORAGE_BACKEND, falling
+            back to Google Drive)
+        **options: Passed to the backend's constructor; the local root
+            defaults to $PDF_LOCAL_STORAGE_ROOT
+
+    Returns:
+        Storage instance
+
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    name = name or os.environ.get(STORAGE_ENV_VAR) or DEFAULT_STORAGE
+
+    if name == 'gdrive':
+        # Google's client libraries are only needed for this backend
+        from src.app.gdrive_storage import GoogleDriveStorage
+        return GoogleDriveStorage(**options)
+
+    if name == 'local':
+        from src.app.local_storage import LocalStorage
+        options.setdefault('root', os.environ.get(LOCAL_ROOT_ENV_VAR) or DEFAULT_LOCAL_ROOT)
+        return LocalStorage(**options)
+
+    raise ValueError(f"Unknown storage backend: {name} "
+                     f"(expected one of {', '.join(STORAGE_BACKENDS)})")
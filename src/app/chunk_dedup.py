@@ -0,0 +1,240 @@
+"""
+Chunk Deduplication Module
+Near-duplicate chunk detection with MinHash and locality-sensitive hashing
+"""
+
+import hashlib
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Largest prime below 2**32: (a * h + b) stays within uint64 for 32-bit a, b, h
+_MERSENNE_PRIME = np.uint64(4294967291)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+# Metadata keys written by deduplicate()
+DUPLICATE_STAT_KEYS = ('duplicate_chunk_count', 'duplicate_chunks_within_doc',
+                       'duplicate_chunks_cross_doc')
+
+
+class ChunkDeduplicator:
+    """
+    Flags or drops chunks that nearly duplicate earlier chunks
+
+    Each chunk is reduced to a MinHash signature over word shingles,
+    computed with vectorized NumPy permutations. Signatures are split
+    into LSH bands and stored in a SQLite index, so candidates are found
+    across the whole corpus without pairwise comparison; candidates are
+    confirmed by their estimated Jaccard similarity.
+    """
+
+    def __init__(self, index_path: str = ':memory:', num_perm: int = 128,
+                 bands: int = 16, threshold: float = 0.8, shingle_size: int = 3,
+                 seed: int = 42):
+        """
+        Initialize the deduplicator
+
+        Args:
+            index_path: SQLite file for the persistent LSH index
+                (':memory:' keeps it for this process only)
+            num_perm: MinHash permutations per signature
+            bands: LSH bands (must divide num_perm)
+            threshold: Estimated Jaccard similarity at which a chunk
+                counts as a duplicate
+            shingle_size: Words per shingle
+            seed: Seed for the permutation coefficients (must stay fixed
+                for a persistent index)
+        """
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+        # One connection shared by request threads, serialized by the lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(index_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                doc_id TEXT NOT NULL,
+                chunk_id INTEGER NOT NULL,
+                signature BLOB NOT NULL,
+                PRIMARY KEY (doc_id, chunk_id)
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                bucket BLOB NOT NULL,
+                doc_id TEXT NOT NULL,
+                chunk_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_buckets_bucket ON buckets (bucket);
+            CREATE INDEX IF NOT EXISTS idx_buckets_doc ON buckets (doc_id);
+        """)
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Compute MinHash signatures
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            Array of shape (len(texts), num_perm), dtype uint32
+        """
+        result = np.full((len(texts), self.num_perm), 0xFFFFFFFF, dtype=np.uint32)
+
+        for row, text in enumerate(texts):
+            shingles = self._shingle_hashes(text)
+            if len(shingles):
+                # (num_perm, shingles) permuted hashes, min over shingles
+                permuted = (np.outer(self._a, shingles) + self._b[:, None]) % _MERSENNE_PRIME
+                result[row] = permuted.min(axis=1)
+
+        return result
+
+    def deduplicate(self, doc_id: str, chunks: List, drop: bool = False) -> Tuple[List, Dict]:
+        """
+        Find chunks that nearly duplicate earlier chunks in this document
+        or anywhere in the indexed corpus, and index the rest
+
+        Re-running a document replaces its previous index entries, so a
+        document never matches itself.
+
+        Args:
+            doc_id: Stable document identifier (e.g. content hash)
+            chunks: Chunks from PDFProcessor
+            drop: Remove duplicates instead of flagging them; when
+                flagging, every chunk gets duplicate_of set to None or to
+                the "doc_id:chunk_id" it duplicates
+
+        Returns:
+            Tuple of (chunks, stats) where stats has duplicate_chunk_count,
+            duplicate_chunks_within_doc and duplicate_chunks_cross_doc
+        """
+        signatures = self.signatures([chunk['text'] for chunk in chunks])
+
+        with self._lock:
+            return self._deduplicate(doc_id, chunks, signatures, drop)
+
+    def _deduplicate(self, doc_id: str, chunks: List, signatures: np.ndarray,
+                     drop: bool) -> Tuple[List, Dict]:
+        """Match and index one document's chunks (caller holds the lock)"""
+        self._forget(doc_id)
+
+        kept = []
+        within_doc = 0
+        cross_doc = 0
+
+        for chunk, signature in zip(chunks, signatures):
+            buckets = self._buckets(signature)
+            match = self._find_match(buckets, signature)
+
+            if match:
+                if match[0] == doc_id:
+                    within_doc += 1
+                else:
+                    cross_doc += 1
+                if not drop:
+                    chunk.duplicate_of = f"{match[0]}:{match[1]}"
+                    kept.append(chunk)
+                continue
+
+            # Only originals are indexed; duplicates would just add noise
+            self._insert(doc_id, chunk['chunk_id'], buckets, signature)
+            if not drop:
+                chunk.duplicate_of = None
+            kept.append(chunk)
+
+        self.conn.commit()
+
+        return kept, {
+            'duplicate_chunk_count': within_doc + cross_doc,
+            'duplicate_chunks_within_doc': within_doc,
+            'duplicate_chunks_cross_doc': cross_doc
+        }
+
+    def forget(self, doc_id: str) -> None:
+        """
+        Remove a document's chunks from the index
+
+        Args:
+            doc_id: Document identifier
+        """
+        with self._lock:
+            self._forget(doc_id)
+            self.conn.commit()
+
+    def _forget(self, doc_id: str) -> None:
+        """Delete a document's index rows (caller holds the lock)"""
+        self.conn.execute("DELETE FROM buckets WHERE doc_id = ?", (doc_id,))
+        self.conn.execute("DELETE FROM signatures WHERE doc_id = ?", (doc_id,))
+
+    def close(self) -> None:
+        """Close the index"""
+        self.conn.close()
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """Stable 32-bit hashes of the word shingles in a text"""
+        words = text.lower().split()
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+
+        # Hash each word once (crc32 is stable across processes), then
+        # combine neighbouring word hashes into shingle hashes in NumPy
+        word_hashes = np.fromiter((zlib.crc32(word.encode('utf-8')) for word in words),
+                                  dtype=np.uint64, count=len(words))
+        size = min(self.shingle_size, len(words))
+        shingles = word_hashes[:len(words) - size + 1].copy()
+        for offset in range(1, size):
+            shingles = (shingles * np.uint64(1000003)) ^ word_hashes[offset:len(words) - size + 1 + offset]
+
+        return np.unique(shingles & _MASK32)
+
+    def _buckets(self, signature: np.ndarray) -> List[bytes]:
+        """LSH bucket keys, one per band"""
+        return [
+            hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(),
+                            digest_size=8, person=band.to_bytes(2, 'little')).digest()
+            for band in range(self.bands)
+        ]
+
+    def _find_match(self, buckets: List[bytes], signature: np.ndarray) -> Optional[Tuple[str, int]]:
+        """Best indexed chunk at or above the similarity threshold"""
+        placeholders = ','.join('?' * len(buckets))
+        candidates = self.conn.execute(
+            f"SELECT DISTINCT s.doc_id, s.chunk_id, s.signature FROM buckets b "
+            f"JOIN signatures s ON s.doc_id = b.doc_id AND s.chunk_id = b.chunk_id "
+            f"WHERE b.bucket IN ({placeholders})",
+            buckets
+        ).fetchall()
+
+        best = None
+        best_similarity = self.threshold
+        for doc_id, chunk_id, blob in candidates:
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = (doc_id, chunk_id), similarity
+
+        return best
+
+    def _insert(self, doc_id: str, chunk_id: int, buckets: List[bytes],
+                signature: np.ndarray) -> None:
+        """Add a chunk to the index"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO signatures (doc_id, chunk_id, signature) VALUES (?, ?, ?)",
+            (doc_id, chunk_id, signature.tobytes())
+        )
+        self.conn.executemany(
+            "INSERT INTO buckets (bucket, doc_id, chunk_id) VALUES (?, ?, ?)",
+            [(bucket, doc_id, chunk_id) for bucket in buckets]
+        )
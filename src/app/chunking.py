@@ -0,0 +1,643 @@
+"""
+Chunk Representation Module
+Offset-indexed chunks over cleaned document text
+"""
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+
+
+_WORD_RE = re.compile(r'\S+')
+
+# End of a sentence: terminal punctuation, optional closing quotes/brackets,
+# whitespace, then something that looks like the start of a new sentence
+_SENTENCE_BREAK_RE = re.compile(
+    r'[.!?][\"\'\u201d\u2019)\]]*\s+(?=[\"\'\u201c\u2018(\[]?[A-Z0-9])'
+)
+
+CHUNK_STRATEGIES = ('words', 'sentences', 'tokens')
+
+
+def word_windows(word_count: int, chunk_size: int, overlap: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the (start_word, end_word) range of every overlapping chunk
+
+    Args:
+        word_count: Number of words in the text
+        chunk_size: Number of words per chunk
+        overlap: Number of words to overlap between chunks
+
+    Yields:
+        Tuples of (start_word, end_word), end exclusive
+    """
+    # Guard against overlap >= chunk_size, which would never advance
+    step = max(1, chunk_size - overlap)
+
+    for start in range(0, word_count, step):
+        yield start, min(start + chunk_size, word_count)
+
+
+def sentence_windows(index: 'WordIndex', chunk_size: int, overlap: int,
+                     min_fill: float = 0.5) -> Iterator[Tuple[int, int]]:
+    """
+    Yield chunk ranges that start and end on sentence boundaries
+
+    Boundaries are found once (see sentence_boundaries); each cut point
+    is then picked by bisection, so the whole pass is O(n log n). A
+    chunk ends at the last boundary that keeps it within chunk_size
+    words; if that would leave it less than min_fill full (one very long
+    sentence) it is cut at chunk_size words instead. The next chunk
+    starts at the first boundary among the last overlap words of the
+    previous one, so chunks never share more than overlap words; when
+    there is none it keeps a plain overlap of exactly overlap words.
+
+    Args:
+        index: Word offsets of the text to chunk
+        chunk_size: Maximum number of words per chunk
+        overlap: Target number of words to overlap between chunks
+        min_fill: Smallest fraction of chunk_size a boundary cut may leave
+
+    Yields:
+        Tuples of (start_word, end_word), end exclusive
+    """
+    boundaries = sentence_boundaries(index)
+    word_count = len(index)
+    min_words = max(1, int(chunk_size * min_fill))
+    start = 0
+
+    while start < word_count:
+        limit = start + chunk_size
+        hard_cut = False
+        if limit >= word_count:
+            end = word_count
+        else:
+            boundary = boundaries[bisect_right(boundaries, limit) - 1]
+            hard_cut = boundary < start + min_words
+            end = limit if hard_cut else boundary
+
+        yield start, end
+
+        if end >= word_count:
+            break
+
+        # Restart at the first sentence boundary in [end - overlap, end),
+        # else at end - overlap itself
+        target = max(end - overlap, start + 1)
+        position = bisect_left(boundaries, target)
+        if position < len(boundaries) and boundaries[position] < end:
+            start = boundaries[position]
+        else:
+            start = target
+
+
+def token_windows(word_tokens: Sequence[int], budget: int,
+                  overlap: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield chunk ranges packed as close as possible to a token budget
+
+    Token counts are summed once into a prefix array; each chunk then
+    takes the most words whose tokens fit the budget (found by
+    bisection), so the pass is O(n log n). A single word larger than
+    the budget still forms a chunk on its own.
+
+    Args:
+        word_tokens: Token count of each word
+        budget: Maximum number of tokens per chunk
+        overlap: Maximum number of tokens shared by consecutive chunks
+
+    Yields:
+        Tuples of (start_word, end_word), end exclusive
+    """
+    prefix = array('q', [0])
+    for count in word_tokens:
+        prefix.append(prefix[-1] + count)
+    word_count = len(word_tokens)
+    start = 0
+
+    while start < word_count:
+        end = bisect_right(prefix, prefix[start] + budget) - 1
+        end = min(max(end, start + 1), word_count)
+
+        yield start, end
+
+        if end >= word_count:
+            break
+
+        # Earliest start whose tokens up to end fit in the overlap
+        start = max(bisect_left(prefix, prefix[end] - overlap), start + 1)
+
+
+def sentence_boundaries(index: 'WordIndex') -> array:
+    """
+    Find the word indices at which sentences and pages begin
+
+    One regex pass over the text finds sentence breaks; page starts are
+    merged in as boundaries too (paragraph breaks do not survive
+    cleaning, but page breaks do).
+
+    Args:
+        index: Word offsets of the text
+
+    Returns:
+        Sorted array of word indices, always starting with 0
+    """
+    breaks = (match.end() for match in _SENTENCE_BREAK_RE.finditer(index.text))
+    boundaries = array('q', [0])
+    lo = 0
+
+    for char_offset in heapq.merge(breaks, index.page_starts):
+        lo = bisect_left(index.starts, char_offset, lo)
+        if lo >= len(index):
+            break
+        if lo > boundaries[-1]:
+            boundaries.append(lo)
+
+    return boundaries
+
+
+class Chunk(Mapping):
+    """
+    A chunk stored as character offsets into its source text
+
+    Reads like the chunk dictionaries used throughout the pipeline
+    (chunk['text'], dict(chunk), ...), but the text is only sliced out
+    of the source when it is actually read. The 'token_count' and
+    'duplicate_of' keys are present only once token counting or
+    deduplication has set them.
+    """
+
+    __slots__ = ('chunk_id', 'start_word', 'end_word', 'start_char', 'end_char',
+                 'start_page', 'end_page', 'token_count', 'duplicate_of',
+                 '_source', '_base')
+
+    KEYS = ('chunk_id', 'text', 'word_count', 'start_word', 'end_word',
+            'start_char', 'end_char', 'start_page', 'end_page')
+    OPTIONAL_KEYS = ('token_count', 'duplicate_of')
+
+    def __init__(self, chunk_id: int, start_word: int, end_word: int,
+                 start_char: int, end_char: int, start_page: int, end_page: int,
+                 source: str, base: int = 0):
+        """
+        Create a chunk
+
+        Args:
+            chunk_id: Sequential chunk number
+            start_word: Index of the first word (inclusive)
+            end_word: Index after the last word (exclusive)
+            start_char: Character offset of the chunk in the document text
+            end_char: Character offset after the chunk in the document text
+            start_page: Page number (1-based) of the first word
+            end_page: Page number (1-based) of the last word
+            source: Text the offsets point into
+            base: Document offset of source[0] (0 when source is the full text)
+        """
+        self.chunk_id = chunk_id
+        self.start_word = start_word
+        self.end_word = end_word
+        self.start_char = start_char
+        self.end_char = end_char
+        self.start_page = start_page
+        self.end_page = end_page
+        self._source = source
+        self._base = base
+
+    @property
+    def text(self) -> str:
+        """Chunk text, sliced from the source on access"""
+        return self._source[self.start_char - self._base:self.end_char - self._base]
+
+    @property
+    def word_count(self) -> int:
+        """Number of words in the chunk"""
+        return self.end_word - self.start_word
+
+    def __getitem__(self, key):
+        if key not in self.KEYS and key not in self.OPTIONAL_KEYS:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        yield from self.KEYS
+        for key in self.OPTIONAL_KEYS:
+            if hasattr(self, key):
+                yield key
+
+    def __len__(self):
+        return len(self.KEYS) + sum(hasattr(self, key) for key in self.OPTIONAL_KEYS)
+
+    def __repr__(self):
+        return (f"<Chunk(id={self.chunk_id}, words={self.start_word}-{self.end_word}, "
+                f"pages={self.start_page}-{self.end_page})>")
+
+
+class WordIndex:
+    """
+    Character offsets of every word in a text, computed once
+
+    Offsets and page boundaries are kept in typed arrays rather than
+    lists of word strings, so chunking never copies the words themselves.
+    """
+
+    def __init__(self, text: str, page_starts: Optional[Iterable[int]] = None):
+        """
+        Index a cleaned text
+
+        Args:
+            text: Cleaned document text
+            page_starts: Character offset where each page begins in text
+                (defaults to a single page)
+        """
+        self.text = text
+        self.starts = array('q')
+        self.ends = array('q')
+        self.page_starts = array('q', page_starts if page_starts is not None else [0])
+
+        for match in _WORD_RE.finditer(text):
+            start, end = match.span()
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def page_of(self, char_offset: int) -> int:
+        """
+        Map a character offset to its page number
+
+        Args:
+            char_offset: Offset into the indexed text
+
+        Returns:
+            Page number (1-based)
+        """
+        return max(1, bisect_right(self.page_starts, char_offset))
+
+    def span(self, start_word: int, end_word: int) -> Tuple[int, int, int, int, int, int]:
+        """
+        Offsets of a word range
+
+        Args:
+            start_word: Index of the first word (inclusive)
+            end_word: Index after the last word (exclusive)
+
+        Returns:
+            Tuple of (start_word, end_word, start_char, end_char,
+            start_page, end_page)
+        """
+        start_char = self.starts[start_word]
+        end_char = self.ends[end_word - 1]
+
+        return (start_word, end_word, start_char, end_char,
+                self.page_of(start_char), self.page_of(end_char - 1))
+
+    def chunk(self, chunk_id: int, start_word: int, end_word: int) -> Chunk:
+        """
+        Build a chunk over a word range
+
+        Args:
+            chunk_id: Sequential chunk number
+            start_word: Index of the first word (inclusive)
+            end_word: Index after the last word (exclusive)
+
+        Returns:
+            Chunk pointing into the indexed text
+        """
+        return Chunk(chunk_id, *self.span(start_word, end_word), self.text)
+
+    def batch(self, windows: Iterable[Tuple[int, int]]) -> 'ChunkBatch':
+        """
+        Build the chunks of a document as one columnar batch
+
+        Args:
+            windows: (start_word, end_word) ranges, numbered in order
+
+        Returns:
+            ChunkBatch holding the chunk texts and offsets
+        """
+        return ChunkBatch.from_spans(self.text, (self.span(start, end) for start, end in windows))
+
+
+# Offset columns of a batch, in the order of Chunk.KEYS (text comes second)
+_SPAN_COLUMNS = ('start_word', 'end_word', 'start_char', 'end_char', 'start_page', 'end_page')
+_INT_COLUMNS = ('chunk_id', 'word_count') + _SPAN_COLUMNS
+
+# Arrow string arrays take 32-bit offsets; larger text buffers need large_string
+_MAX_STRING_BYTES = 2 ** 31 - 1
+
+
+class ChunkBatch:
+    """
+    The chunks of a document stored column by column
+
+    Ids, word counts and offsets live in typed arrays and the chunk
+    texts in one contiguous UTF-8 buffer with an offset array, so a
+    batch costs a few bytes per chunk plus its text instead of one
+    Python object graph per chunk. to_arrow() wraps these buffers in a
+    pyarrow.Table without copying them.
+
+    Indexing or iterating yields ChunkRow views that read like the chunk
+    dictionaries used throughout the pipeline (chunk['text'],
+    dict(chunk), chunk.start_word, ...); slicing yields a new batch. The
+    'token_count' and 'duplicate_of' columns are present only once
+    token counting or deduplication has set them.
+    """
+
+    def __init__(self, columns: Dict[str, array], text_offsets: array, text_data: bytes,
+                 duplicate_of: Optional[List[Optional[str]]] = None):
+        """
+        Wrap existing column buffers
+
+        Args:
+            columns: 'q' arrays for chunk_id, word_count and the offset
+                columns, plus token_count if counted
+            text_offsets: Byte offset of each chunk text in text_data,
+                followed by the end of the last one ('i' or 'q' array)
+            text_data: UTF-8 encoded chunk texts, back to back
+            duplicate_of: Per-chunk duplicate reference, if deduplicated
+        """
+        self._columns = columns
+        self._offsets = text_offsets
+        self._data = text_data
+        self._duplicate_of = duplicate_of
+
+    @classmethod
+    def from_spans(cls, text: str, spans: Iterable[Sequence[int]]) -> 'ChunkBatch':
+        """
+        Build a batch from offset spans into a document text
+
+        Args:
+            text: Document text the character offsets point into
+            spans: (start_word, end_word, start_char, end_char,
+                start_page, end_page) of each chunk, numbered in order
+
+        Returns:
+            ChunkBatch with the chunk texts copied into one buffer
+        """
+        columns = {name: array('q') for name in _INT_COLUMNS}
+        span_columns = [columns[name] for name in _SPAN_COLUMNS]
+
+        for chunk_id, span in enumerate(spans):
+            columns['chunk_id'].append(chunk_id)
+            columns['word_count'].append(span[1] - span[0])
+            for column, value in zip(span_columns, span):
+                column.append(value)
+
+        # ASCII text has byte offsets equal to character offsets, so the
+        # chunks are sliced from one encoding of the text
+        bounds = zip(columns['start_char'], columns['end_char'])
+        if text.isascii():
+            encoded = memoryview(text.encode('ascii'))
+            pieces = [encoded[start:end] for start, end in bounds]
+        else:
+            pieces = [text[start:end].encode('utf-8') for start, end in bounds]
+
+        return cls._from_pieces(columns, pieces)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Mapping]) -> 'ChunkBatch':
+        """
+        Build a batch from chunk mappings (Chunk objects or plain dicts)
+
+        Args:
+            chunks: Chunks with at least the Chunk.KEYS keys
+
+        Returns:
+            ChunkBatch holding copies of the chunks
+        """
+        columns = {name: array('q') for name in _INT_COLUMNS}
+        pieces = []
+        optional = {key: [] for key in Chunk.OPTIONAL_KEYS}
+        present = set()
+
+        for chunk in chunks:
+            for name, column in columns.items():
+                column.append(chunk[name])
+            pieces.append(chunk['text'].encode('utf-8'))
+            for key, values in optional.items():
+                if key in chunk:
+                    present.add(key)
+                values.append(chunk.get(key))
+
+        batch = cls._from_pieces(columns, pieces)
+        for key in Chunk.OPTIONAL_KEYS:
+            if key in present:
+                values = optional[key]
+                batch.set_column(key, values if key == 'duplicate_of'
+                                 else (value or 0 for value in values))
+        return batch
+
+    @classmethod
+    def _from_pieces(cls, columns: Dict[str, array], pieces: List) -> 'ChunkBatch':
+        """Join encoded chunk texts into one buffer with offsets"""
+        lengths = [len(piece) for piece in pieces]
+        total = sum(lengths)
+        offsets = array('i' if total <= _MAX_STRING_BYTES else 'q', [0])
+        offsets.extend(accumulate(lengths))
+        return cls(columns, offsets, b''.join(pieces))
+
+    @property
+    def column_names(self) -> List[str]:
+        """Keys of every chunk, in Chunk.KEYS order"""
+        names = ['chunk_id', 'text', 'word_count', *_SPAN_COLUMNS]
+        if 'token_count' in self._columns:
+            names.append('token_count')
+        if self._duplicate_of is not None:
+            names.append('duplicate_of')
+        return names
+
+    def column(self, name: str) -> Sequence:
+        """
+        One column of the batch
+
+        Args:
+            name: Any key in column_names
+
+        Returns:
+            The column's typed array (a list for text and duplicate_of)
+        """
+        if name == 'text':
+            return self.texts()
+        if name == 'duplicate_of' and self._duplicate_of is not None:
+            return self._duplicate_of
+        if name not in self._columns:
+            raise KeyError(name)
+        return self._columns[name]
+
+    def set_column(self, name: str, values: Iterable) -> None:
+        """
+        Add or replace an optional column
+
+        Args:
+            name: 'token_count' or 'duplicate_of'
+            values: One value per chunk
+        """
+        values = list(values) if name == 'duplicate_of' else array('q', values)
+        if len(values) != len(self):
+            raise ValueError(f"{name} needs {len(self)} values, got {len(values)}")
+        if name == 'duplicate_of':
+            self._duplicate_of = values
+        elif name == 'token_count':
+            self._columns[name] = values
+        else:
+            raise KeyError(f"Not an optional chunk column: {name}")
+
+    def text(self, row: int) -> str:
+        """Text of one chunk, decoded from the buffer"""
+        return self._data[self._offsets[row]:self._offsets[row + 1]].decode('utf-8')
+
+    def texts(self) -> List[str]:
+        """Every chunk text, decoded from the buffer"""
+        data, offsets = self._data, self._offsets
+        return [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+    def value(self, key: str, row: int):
+        """
+        One chunk's value for a key
+
+        Args:
+            key: Any key in column_names
+            row: Position of the chunk in the batch
+
+        Returns:
+            The value
+        """
+        if key == 'text':
+            return self.text(row)
+        if key == 'duplicate_of' and self._duplicate_of is not None:
+            return self._duplicate_of[row]
+        if key not in self._columns:
+            raise KeyError(key)
+        return self._columns[key][row]
+
+    def take(self, rows: Iterable[int]) -> 'ChunkBatch':
+        """
+        Copy a subset of the chunks into a new batch (chunk ids are kept)
+
+        Args:
+            rows: Positions of the chunks to keep, in output order
+
+        Returns:
+            New ChunkBatch
+        """
+        rows = list(rows)
+        columns = {name: array('q', (column[row] for row in rows))
+                   for name, column in self._columns.items()}
+        data = memoryview(self._data)
+        pieces = [data[self._offsets[row]:self._offsets[row + 1]] for row in rows]
+
+        batch = self._from_pieces(columns, pieces)
+        if self._duplicate_of is not None:
+            batch._duplicate_of = [self._duplicate_of[row] for row in rows]
+        return batch
+
+    def to_arrow(self) -> pa.Table:
+        """
+        Wrap the batch in a pyarrow.Table
+
+        Integer columns and the text buffer are shared with the batch,
+        not copied; only duplicate_of (short strings) is converted.
+
+        Returns:
+            Table with one column per key, in column_names order
+        """
+        count = len(self)
+        text_type = pa.string() if self._offsets.itemsize == 4 else pa.large_string()
+        arrays = []
+
+        for name in self.column_names:
+            if name == 'text':
+                arrays.append(pa.Array.from_buffers(
+                    text_type, count,
+                    [None, pa.py_buffer(self._offsets), pa.py_buffer(self._data)]))
+            elif name == 'duplicate_of':
+                arrays.append(pa.array(self._duplicate_of, pa.string()))
+            else:
+                arrays.append(pa.Array.from_buffers(
+                    pa.int64(), count, [None, pa.py_buffer(self._columns[name])]))
+
+        return pa.Table.from_arrays(arrays, names=self.column_names)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers"""
+        return (len(self._data)
+                + self._offsets.itemsize * len(self._offsets)
+                + sum(column.itemsize * len(column) for column in self._columns.values()))
+
+    def __len__(self):
+        return len(self._columns['chunk_id'])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return ChunkRow(self, index)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield ChunkRow(self, row)
+
+    def __repr__(self):
+        return f"<ChunkBatch(chunks={len(self)}, text_bytes={len(self._data)})>"
+
+
+class ChunkRow(Mapping):
+    """
+    One chunk of a ChunkBatch, read like a chunk dictionary
+
+    Values are read from the batch on access. Setting token_count or
+    duplicate_of writes through to the batch's column.
+    """
+
+    __slots__ = ('batch', 'row')
+
+    def __init__(self, batch: ChunkBatch, row: int):
+        object.__setattr__(self, 'batch', batch)
+        object.__setattr__(self, 'row', row)
+
+    def __getitem__(self, key):
+        return self.batch.value(key, self.row)
+
+    def __getattr__(self, name):
+        if name in ChunkRow.__slots__:
+            raise AttributeError(name)
+        try:
+            return self.batch.value(name, self.row)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        if name not in Chunk.OPTIONAL_KEYS:
+            raise AttributeError(f"Chunk field {name} is read-only")
+        if name in self.batch.column_names:
+            self.batch.column(name)[self.row] = value
+        else:
+            values = [None] * len(self.batch) if name == 'duplicate_of' else [0] * len(self.batch)
+            values[self.row] = value
+            self.batch.set_column(name, values)
+
+    def __reduce__(self):
+        return ChunkRow, (self.batch, self.row)
+
+    def __iter__(self):
+        return iter(self.batch.column_names)
+
+    def __len__(self):
+        return len(self.batch.column_names)
+
+    def __repr__(self):
+        return (f"<ChunkRow(id={self['chunk_id']}, words={self['start_word']}-{self['end_word']}, "
+                f"pages={self['start_page']}-{self['end_page']})>")
@@ -0,0 +1,399 @@
+"""
+Corpus Dataset Module
+One hive-partitioned Parquet dataset for the chunks of the whole corpus
+
+Usage (from the repository root):
+
+    python -m src.app.corpus_dataset info corpus/
+    python -m src.app.corpus_dataset compact corpus/ --target-mb 128
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+import uuid
+import zlib
+from datetime import date
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.app.chunking import ChunkBatch
+from src.app.parquet_creator import DEFAULT_ROW_GROUP_ROWS, chunk_table
+
+
+# Partition columns, in directory order; both are derived on append
+PARTITION_SCHEMA = pa.schema([
+    pa.field('ingest_date', pa.string()),
+    pa.field('doc_bucket', pa.int32())
+])
+
+DEFAULT_BUCKET_COUNT = 16
+DEFAULT_TARGET_FILE_BYTES = 128 * 1024 * 1024
+
+# Dataset-wide schema (the union of every file's), kept by the writers;
+# names starting with '_' or '.' are skipped by dataset discovery
+COMMON_METADATA_FILE = '_common_metadata'
+COMPACTION_JOURNAL_FILE = '_compaction.json'
+
+# Held (flock) by every append and compaction, across threads and processes
+WRITER_LOCK_FILE = '_writer.lock'
+
+# Rows in a compacted file are ordered by document, then chunk
+SORT_COLUMNS = ('doc_document_id', 'chunk_id')
+
+
+def document_bucket(document_id: Union[int, str], bucket_count: int = DEFAULT_BUCKET_COUNT) -> int:
+    """
+    Stable bucket of a document id
+
+    Args:
+        document_id: Database id or any string id (e.g. a content hash)
+        bucket_count: Number of buckets
+
+    Returns:
+        Bucket number in [0, bucket_count)
+    """
+    if isinstance(document_id, int):
+        return document_id % bucket_count
+    return zlib.crc32(str(document_id).encode('utf-8')) % bucket_count
+
+
+class CorpusDataset:
+    """
+    Appends document chunks to a partitioned dataset and reads it back
+
+    Files live under root/ingest_date=YYYY-MM-DD/doc_bucket=NN/, one
+    file per appended document until compact() merges each partition's
+    small files into right-sized ones. Readers go through
+    pyarrow.dataset, so filters on the partition columns skip whole
+    directories and filters on other columns skip row groups.
+
+    Appends and compaction take an exclusive lock on a file in the
+    dataset root, so concurrent writers (e.g. pipeline requests and a
+    compaction job) run one at a time; readers may run at any time.
+    """
+
+    def __init__(self, root: str, bucket_count: int = DEFAULT_BUCKET_COUNT):
+        """
+        Initialize the dataset (the directory is created on first append)
+
+        Args:
+            root: Dataset directory
+            bucket_count: Number of document-id buckets per ingest date
+        """
+        self.root = root
+        self.bucket_count = bucket_count
+        self.partitioning = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+
+    def append(self, chunks: Union[ChunkBatch, Iterable[Mapping]], metadata: Dict,
+               ingest_date: Optional[date] = None) -> str:
+        """
+        Add one document's chunks as a new file in its partition
+
+        Args:
+            chunks: Chunks from PDFProcessor
+            metadata: Document metadata (as for ParquetCreator); must
+                include document_id, which picks the bucket
+            ingest_date: Partition date (defaults to today)
+
+        Returns:
+            Path of the new file
+        """
+        if metadata.get('document_id') is None:
+            raise ValueError("Corpus dataset appends need metadata['document_id']")
+        if not isinstance(chunks, ChunkBatch):
+            chunks = ChunkBatch.from_chunks(chunks)
+
+        directory = self.partition_path(ingest_date or date.today(),
+                                        document_bucket(metadata['document_id'],
+                                                        self.bucket_count))
+        table = chunk_table(chunks, metadata)
+
+        # Compaction clears temporary files and the schema update is a
+        # read-modify-write, so both need the dataset to themselves
+        with self.writer_lock():
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+            self._write_file(table, path, DEFAULT_ROW_GROUP_ROWS)
+            self._update_schema([pq.read_schema(path)])
+
+        return path
+
+    @contextlib.contextmanager
+    def writer_lock(self):
+        """
+        Hold the dataset's exclusive writer lock
+
+        An flock on root/_writer.lock; each call opens its own file, so
+        threads of one process exclude each other as well.
+
+        Raises:
+            RuntimeError: On platforms without fcntl (Windows); reading
+                the dataset works everywhere
+        """
+        # POSIX only; imported here so the module (and the pipeline that
+        # imports it) still loads on Windows
+        try:
+            import fcntl
+        except ImportError:
+            raise RuntimeError("Writing a corpus dataset needs fcntl file locks (POSIX only)") from None
+
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, WRITER_LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def partition_path(self, ingest_date: date, bucket: int) -> str:
+        """
+        Directory of one partition
+
+        Args:
+            ingest_date: Partition date
+            bucket: Document-id bucket
+
+        Returns:
+            Directory path
+        """
+        return os.path.join(self.root, f"ingest_date={ingest_date.isoformat()}",
+                            f"doc_bucket={bucket}")
+
+    def dataset(self) -> ds.Dataset:
+        """
+        The corpus as a pyarrow dataset, with the partition columns
+
+        Returns:
+            pyarrow.dataset.Dataset over every data file
+        """
+        return ds.dataset(self.root, format='parquet', partitioning=self.partitioning,
+                          schema=self.schema())
+
+    def schema(self) -> pa.Schema:
+        """
+        Schema of the whole dataset, including the partition columns
+
+        Returns:
+            pyarrow.Schema (from the common metadata file when present)
+        """
+        common_path = os.path.join(self.root, COMMON_METADATA_FILE)
+        if os.path.exists(common_path):
+            file_schema = pq.read_schema(common_path)
+        else:
+            file_schema = pa.unify_schemas([pq.read_schema(path) for path in self.data_files()])
+        return pa.unify_schemas([file_schema, PARTITION_SCHEMA])
+
+    def scan(self, columns: Optional[List[str]] = None, filters: Optional[List] = None) -> pa.Table:
+        """
+        Read chunks, pruning partitions and row groups by the filters
+
+        Args:
+            columns: Columns to read (None = all, including partition columns)
+            filters: Row filters in pyarrow DNF form, e.g.
+                [('ingest_date', '>=', '2026-01-01'), ('doc_bucket', '=', 3)]
+
+        Returns:
+            Matching rows as a pyarrow.Table
+        """
+        expression = pq.filters_to_expression(filters) if filters else None
+        return self.dataset().to_table(columns=columns, filter=expression)
+
+    def data_files(self, directory: Optional[str] = None) -> List[str]:
+        """
+        Data files of the dataset or of one partition directory
+
+        Args:
+            directory: Partition directory (None = the whole dataset)
+
+        Returns:
+            Sorted file paths
+        """
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(directory or self.root)
+            for name in names if name.endswith('.parquet') and not name.startswith(('.', '_'))
+        )
+
+    def compact(self, target_file_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+                row_group_rows: int = DEFAULT_ROW_GROUP_ROWS) -> Dict:
+        """
+        Merge each partition's small files into right-sized sorted files
+
+        Files at or above half the target size are left alone. The
+        merged rows are sorted by document and chunk, so row groups
+        cover narrow document ranges and filter well. Every partition is
+        replaced through a journal, so an interrupted compaction is
+        finished by the next one instead of leaving duplicate rows.
+
+        Args:
+            target_file_bytes: Approximate size of each output file
+            row_group_rows: Rows per row group in output files
+
+        Returns:
+            Dict with partitions, files_before and files_after
+        """
+        stats = {'partitions': 0, 'files_before': 0, 'files_after': 0}
+        schema = None
+
+        with self.writer_lock():
+            for directory in self._partition_directories():
+                self._recover(directory)
+
+                small = [path for path in self.data_files(directory)
+                         if os.path.getsize(path) < target_file_bytes // 2]
+                if len(small) < 2:
+                    continue
+
+                schema = schema or self._file_schema()
+                outputs = self._merge(small, schema, target_file_bytes, row_group_rows, directory)
+                self._replace(directory, small, outputs)
+
+                stats['partitions'] += 1
+                stats['files_before'] += len(small)
+                stats['files_after'] += len(outputs)
+
+        return stats
+
+    def _merge(self, paths: List[str], schema: pa.Schema, target_file_bytes: int,
+               row_group_rows: int, directory: str) -> List[str]:
+        """Write the rows of paths, sorted, into hidden temporary files"""
+        table = ds.dataset(paths, format='parquet', schema=schema).to_table()
+        sort_keys = [(name, 'ascending') for name in SORT_COLUMNS if name in table.column_names]
+        table = table.sort_by(sort_keys)
+
+        input_bytes = sum(os.path.getsize(path) for path in paths)
+        rows_per_file = max(1, int(table.num_rows * target_file_bytes / max(1, input_bytes)))
+
+        outputs = []
+        for offset in range(0, table.num_rows, rows_per_file):
+            temp_path = os.path.join(directory, f".part-{uuid.uuid4().hex}.parquet.tmp")
+            self._write_file(table.slice(offset, rows_per_file), temp_path, row_group_rows,
+                             replace=False)
+            outputs.append(temp_path)
+        return outputs
+
+    def _replace(self, directory: str, inputs: List[str], temp_outputs: List[str]) -> None:
+        """Swap merged files in for their inputs, journaled for crash recovery"""
+        journal_path = os.path.join(directory, COMPACTION_JOURNAL_FILE)
+        journal = {
+            'inputs': [os.path.basename(path) for path in inputs],
+            'outputs': [os.path.basename(path) for path in temp_outputs]
+        }
+        with open(journal_path + '.tmp', 'w') as f:
+            json.dump(journal, f)
+        os.replace(journal_path + '.tmp', journal_path)
+
+        self._recover(directory)
+
+    def _recover(self, directory: str) -> None:
+        """Finish a journaled compaction and clear abandoned temporary files"""
+        journal_path = os.path.join(directory, COMPACTION_JOURNAL_FILE)
+        journal = None
+        if os.path.exists(journal_path):
+            with open(journal_path) as f:
+                journal = json.load(f)
+
+        if journal:
+            # The journal is only written once every output is complete
+            for name in journal['outputs']:
+                temp_path = os.path.join(directory, name)
+                if os.path.exists(temp_path):
+                    os.replace(temp_path, os.path.join(directory, name[1:-len('.tmp')]))
+            for name in journal['inputs']:
+                path = os.path.join(directory, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            os.remove(journal_path)
+
+        for name in os.listdir(directory):
+            if name.startswith('.part-') and name.endswith('.tmp'):
+                os.remove(os.path.join(directory, name))
+
+    def _partition_directories(self) -> List[str]:
+        """Leaf directories that hold data files"""
+        return sorted({os.path.dirname(path) for path in self.data_files()} | {
+            root for root, _, names in os.walk(self.root) if COMPACTION_JOURNAL_FILE in names
+        })
+
+    def _file_schema(self) -> pa.Schema:
+        """Dataset schema without the partition columns"""
+        schema = self.schema()
+        for name in PARTITION_SCHEMA.names:
+            schema = schema.remove(schema.get_field_index(name))
+        return schema
+
+    def _write_file(self, table: pa.Table, path: str, row_group_rows: int,
+                    replace: bool = True) -> None:
+        """Write a table to path, through a hidden temporary file if replace"""
+        if not replace:
+            pq.write_table(table, path, row_group_size=row_group_rows)
+            return
+
+        directory, name = os.path.split(path)
+        temp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+        try:
+            pq.write_table(table, temp_path, row_group_size=row_group_rows)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _update_schema(self, schemas: List[pa.Schema]) -> None:
+        """Merge file schemas into the common metadata file (hold writer_lock)"""
+        common_path = os.path.join(self.root, COMMON_METADATA_FILE)
+        if os.path.exists(common_path):
+            schemas = [pq.read_schema(common_path)] + schemas
+
+        # Per-document key-value metadata does not describe the dataset
+        schema = pa.unify_schemas([schema.remove_metadata() for schema in schemas])
+
+        temp_path = f"{common_path}.{os.getpid()}.tmp"
+        pq.write_metadata(schema, temp_path)
+        os.replace(temp_path, common_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or compact the corpus chunk dataset")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    info_parser = subparsers.add_parser('info', help="Files, rows and partitions")
+    info_parser.add_argument('root', help="Dataset directory")
+
+    compact_parser = subparsers.add_parser('compact', help="Merge small files per partition")
+    compact_parser.add_argument('root', help="Dataset directory")
+    compact_parser.add_argument('--target-mb', type=int, default=128,
+                                help="Approximate size of each compacted file")
+    compact_parser.add_argument('--row-group-rows', type=int, default=DEFAULT_ROW_GROUP_ROWS)
+    args = parser.parse_args()
+
+    corpus = CorpusDataset(args.root)
+
+    print("=" * 60)
+    print("CORPUS DATASET")
+    print("=" * 60)
+
+    if args.command == 'info':
+        files = corpus.data_files()
+        partitions = {os.path.dirname(path) for path in files}
+        size = sum(os.path.getsize(path) for path in files)
+        rows = corpus.dataset().count_rows() if files else 0
+        print(f"\n📁 {args.root}: {rows} chunks in {len(files)} file(s), "
+              f"{len(partitions)} partition(s), {size / 1024 / 1024:.1f} MB")
+        return
+
+    start = time.perf_counter()
+    stats = corpus.compact(args.target_mb * 1024 * 1024, args.row_group_rows)
+    elapsed = time.perf_counter() - start
+    print(f"\n🎉 Compacted {stats['partitions']} partition(s): "
+          f"{stats['files_before']} → {stats['files_after']} file(s) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
+from sqlalchemy import text
 from src.app.database import Base, engine
 from src.app.models import Document
 
 # Create all tables in the database based on the defined models 
 Base.metadata.create_all(bind=engine)
 
+# create_all() skips existing tables, so add columns introduced since
+with engine.begin() as conn:
+    conn.execute(text("ALTER TABLE documents ADD COLUMN IF NOT EXISTS needs_ocr BOOLEAN DEFAULT FALSE"))
+
 print("✓ Tables created successfully!")
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+Extraction Backends Module
+Pluggable page text extractors, selected by name
+"""
+
+import importlib.util
+import io
+import os
+from typing import Any, Dict, List, Optional, Type
+
+
+# Environment variable naming the backend when none is passed explicitly
+BACKEND_ENV_VAR = 'PDF_EXTRACTION_BACKEND'
+DEFAULT_BACKEND = 'pypdf2'
+
+_BACKENDS: Dict[str, Type['ExtractionBackend']] = {}
+
+
+class ExtractionBackend:
+    """
+    Base class for page text extractors
+
+    A backend opens a document from bytes and extracts the text of one
+    page at a time, so callers can extract in parallel, enforce per-page
+    limits and recover from a failing page. Backends hold no state
+    between documents and can be pickled into worker processes.
+    """
+
+    # Registry name, and the module that must be importable to use it
+    name = ''
+    module = ''
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """True if the backend's library is installed"""
+        return importlib.util.find_spec(cls.module) is not None
+
+    def open(self, pdf_bytes: bytes) -> Any:
+        """
+        Open a document
+
+        Args:
+            pdf_bytes: PDF file as bytes
+
+        Returns:
+            Backend-specific document handle
+        """
+        raise NotImplementedError
+
+    def page_count(self, document: Any) -> int:
+        """Number of pages in an open document"""
+        raise NotImplementedError
+
+    def page_text(self, document: Any, page_index: int) -> str:
+        """Raw text of one page (0-based index)"""
+        raise NotImplementedError
+
+    def close(self, document: Any) -> None:
+        """Release an open document"""
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(name={self.name!r})>"
+
+
+def register_backend(backend_class: Type[ExtractionBackend]) -> Type[ExtractionBackend]:
+    """
+    Add a backend to the registry (usable as a class decorator)
+
+    Args:
+        backend_class: ExtractionBackend subclass with a unique name
+
+    Returns:
+        The class, unchanged
+    """
+    _BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+
+def registered_backends() -> List[str]:
+    """Names of all registered backends, installed or not"""
+    return list(_BACKENDS)
+
+
+def available_backends() -> List[str]:
+    """Names of the registered backends whose library is installed"""
+    return [name for name, backend_class in _BACKENDS.items() if backend_class.is_available()]
+
+
+def get_backend(name: Optional[str] = None) -> ExtractionBackend:
+    """
+    Create a backend by name
+
+    Args:
+        name: Registered backend name (None = $PDF_EXTRACTION_BACKEND,
+            falling back to the PyPDF2 backend)
+
+    Returns:
+        Backend instance
+
+    Raises:
+        ValueError: If the name is not registered
+        ImportError: If the backend's library is not installed
+    """
+    name = name or os.environ.get(BACKEND_ENV_VAR) or DEFAULT_BACKEND
+
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown extraction backend: {name} "
+                         f"(expected one of {', '.join(_BACKENDS)})")
+
+    backend_class = _BACKENDS[name]
+    if not backend_class.is_available():
+        raise ImportError(f"Extraction backend '{name}' needs the "
+                          f"'{backend_class.module}' package")
+
+    return backend_class()
+
+
+@register_backend
+class PyPDF2Backend(ExtractionBackend):
+    """PyPDF2 (pure Python, the default)"""
+
+    name = 'pypdf2'
+    module = 'PyPDF2'
+
+    def open(self, pdf_bytes: bytes):
+        import PyPDF2
+        return PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+
+    def page_count(self, document) -> int:
+        return len(document.pages)
+
+    def page_text(self, document, page_index: int) -> str:
+        return document.pages[page_index].extract_text()
+
+
+@register_backend
+class PypdfBackend(PyPDF2Backend):
+    """pypdf (pure Python, the maintained successor of PyPDF2)"""
+
+    name = 'pypdf'
+    module = 'pypdf'
+
+    def open(self, pdf_bytes: bytes):
+        import pypdf
+        return pypdf.PdfReader(io.BytesIO(pdf_bytes))
+
+
+@register_backend
+class PyMuPDFBackend(ExtractionBackend):
+    """PyMuPDF (MuPDF bindings, C)"""
+
+    name = 'pymupdf'
+    module = 'pymupdf'
+
+    def open(self, pdf_bytes: bytes):
+        import pymupdf
+        return pymupdf.open(stream=pdf_bytes, filetype='pdf')
+
+    def page_count(self, document) -> int:
+        return len(document)
+
+    def page_text(self, document, page_index: int) -> str:
+        return document[page_index].get_text()
+
+    def close(self, document) -> None:
+        document.close()
+
+
+@register_backend
+class PdfiumBackend(ExtractionBackend):
+    """pypdfium2 (PDFium bindings, C++)"""
+
+    name = 'pypdfium2'
+    module = 'pypdfium2'
+
+    def open(self, pdf_bytes: bytes):
+        import pypdfium2
+        return pypdfium2.PdfDocument(pdf_bytes)
+
+    def page_count(self, document) -> int:
+        return len(document)
+
+    def page_text(self, document, page_index: int) -> str:
+        page = document[page_index]
+        text_page = page.get_textpage()
+        try:
+            return text_page.get_text_range()
+        finally:
+            text_page.close()
+            page.close()
+
+    def close(self, document) -> None:
+        document.close()
+
+
+@register_backend
+class PdfminerBackend(ExtractionBackend):
+    """pdfminer.six (pure Python, layout analysis)"""
+
+    name = 'pdfminer'
+    module = 'pdfminer'
+
+    def open(self, pdf_bytes: bytes):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        document = PDFDocument(PDFParser(io.BytesIO(pdf_bytes)))
+        return list(PDFPage.create_pages(document))
+
+    def page_count(self, document) -> int:
+        return len(document)
+
+    def page_text(self, document, page_index: int) -> str:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+
+        resources = PDFResourceManager()
+        output = io.StringIO()
+        device = TextConverter(resources, output, laparams=LAParams())
+        try:
+            PDFPageInterpreter(resources, device).process_page(document[page_index])
+        finally:
+            device.close()
+        return output.getvalue()
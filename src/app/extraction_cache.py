@@ -0,0 +1,164 @@
+"""
+Extraction Cache Module
+Content-addressed on-disk cache of processed PDFs
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from typing import Dict, Optional
+
+
+# Bump when the stored entry layout or the chunking of a setting changes,
+# so stale entries are ignored
+CACHE_FORMAT_VERSION = 4
+
+
+class ExtractionCache:
+    """
+    Persistent cache of cleaned text, metadata and chunk spans
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the processor
+    settings that affect the output, stored as zlib-compressed JSON, and
+    evicted least-recently-used first once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding cache entries (created if missing)
+            max_bytes: Total size cap for all entries on disk
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, pdf_bytes: bytes, settings: Dict) -> str:
+        """
+        Build the cache key for a document
+
+        Args:
+            pdf_bytes: PDF file as bytes
+            settings: Processor settings that affect the output
+
+        Returns:
+            Hex digest identifying the document and settings
+        """
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        settings_json = json.dumps(settings, sort_keys=True)
+
+        return hashlib.sha256(
+            f"{CACHE_FORMAT_VERSION}:{digest}:{settings_json}".encode('utf-8')
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up an entry
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Stored entry, or None on a miss
+        """
+        path = self._entry_path(key)
+
+        try:
+            with open(path, 'rb') as file:
+                entry = json.loads(zlib.decompress(file.read()))
+        except (OSError, ValueError, zlib.error):
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict) -> None:
+        """
+        Store an entry, then evict old entries if over the size cap
+
+        Args:
+            key: Cache key from make_key
+            entry: JSON-serializable entry
+        """
+        data = zlib.compress(json.dumps(entry, default=str).encode('utf-8'), 6)
+
+        # Write to a temp file and rename so readers never see partial entries
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, self._entry_path(key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self._evict()
+
+    def stats(self) -> Dict:
+        """
+        Get counters for monitoring
+
+        Returns:
+            Dict with hits, misses, evictions, entries and bytes on disk
+        """
+        entries = self._list_entries()
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes
+        }
+
+    def _entry_path(self, key: str) -> str:
+        """Path of the file holding an entry"""
+        return os.path.join(self.cache_dir, f"{key}.json.z")
+
+    def _list_entries(self):
+        """List (path, size, last_used) for every entry on disk"""
+        entries = []
+
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json.z'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+
+        return entries
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under max_bytes"""
+        entries = self._list_entries()
+        total = sum(size for _, size, _ in entries)
+
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
@@ -0,0 +1,267 @@
+"""
+Extraction Sandbox Module
+Runs page extraction in worker processes with time and memory limits
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from src.app.extraction_backends import ExtractionBackend, get_backend
+
+
+# How often the parent checks deadlines and worker memory while waiting
+_POLL_INTERVAL = 0.05
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _sandbox_worker(conn) -> None:
+    """
+    Worker loop: extract pages for each document sent by the parent
+
+    Messages in: (pdf_bytes, start_page, backend, textless) or None to exit.
+    Messages out: ('page', page_index, text), ('page_error', page_index,
+    reason) and ('done',) after the last page.
+    """
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+
+        pdf_bytes, start_page, backend, textless = job
+        try:
+            document = backend.open(pdf_bytes)
+            page_count = backend.page_count(document)
+        except Exception as e:
+            conn.send(('page_error', start_page, f"error: {e}"))
+            conn.send(('done',))
+            continue
+
+        for page_index in range(start_page, page_count):
+            if page_index in textless:
+                conn.send(('page', page_index, ''))
+                continue
+            try:
+                conn.send(('page', page_index, backend.page_text(document, page_index)))
+            except MemoryError:
+                conn.send(('page_error', page_index, 'memory'))
+            except Exception as e:
+                conn.send(('page_error', page_index, f"error: {e}"))
+
+        backend.close(document)
+        conn.send(('done',))
+
+
+class _Worker:
+    """One sandbox process and its pipe"""
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_sandbox_worker, args=(child_conn,),
+                                               daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.documents = 0
+
+    def rss_bytes(self) -> Optional[int]:
+        """Resident memory of the worker (Linux /proc), or None if unknown"""
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as statm:
+                return int(statm.read().split()[1]) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def kill(self) -> None:
+        """Stop the worker immediately"""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        """Ask the worker to exit cleanly"""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SandboxedExtractor:
+    """
+    Extracts page text in recycled worker processes under resource limits
+
+    A page that runs past page_timeout, or pushes the worker over
+    max_rss_mb, has its worker killed; the page is recorded as skipped
+    and a fresh worker resumes from the next page. Once document_timeout
+    is reached the remaining pages are skipped. Workers are retired after
+    max_docs_per_worker documents to cap slow memory growth.
+    """
+
+    def __init__(self, page_timeout: float = 30.0, document_timeout: float = 300.0,
+                 max_rss_mb: int = 1024, max_docs_per_worker: int = 50):
+        """
+        Initialize the sandbox
+
+        Args:
+            page_timeout: Wall-clock seconds allowed per page
+            document_timeout: Wall-clock seconds allowed per document
+            max_rss_mb: Resident memory allowed per worker, in MB
+            max_docs_per_worker: Documents a worker handles before it is replaced
+        """
+        self.page_timeout = page_timeout
+        self.document_timeout = document_timeout
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.max_docs_per_worker = max_docs_per_worker
+
+        # Idle workers, shared by threads (e.g. concurrent Flask requests)
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+
+    def iter_pages(self, pdf_bytes: bytes, page_count: int,
+                   skipped: Optional[List[Dict]] = None,
+                   backend: Optional[ExtractionBackend] = None,
+                   textless: frozenset = frozenset()) -> Iterator[str]:
+        """
+        Extract the text of every page, in order
+
+        Args:
+            pdf_bytes: PDF file as bytes
+            page_count: Number of pages in the document
+            skipped: Optional list that receives {'page', 'reason'} for
+                each page that could not be extracted (pages are 1-based)
+            backend: Extraction backend the workers use (None = default)
+            textless: Page indices to yield as '' without extraction
+
+        Yields:
+            Text of each page ('' for skipped pages)
+        """
+        if skipped is None:
+            skipped = []
+        backend = backend or get_backend()
+
+        worker = self._checkout()
+        worker.conn.send((pdf_bytes, 0, backend, textless))
+        deadline = time.monotonic() + self.document_timeout
+        next_page = 0
+        # Only a worker that has sent 'done' is idle and safe to reuse
+        finished = False
+
+        try:
+            while next_page < page_count:
+                message, reason = self._wait(worker, deadline)
+
+                if message is None:
+                    # Kill the stuck worker, skip the page, resume on a fresh one
+                    worker.kill()
+                    if reason == 'document_timeout':
+                        for page_index in range(next_page, page_count):
+                            skipped.append({'page': page_index + 1, 'reason': reason})
+                            yield ''
+                        worker = None
+                        return
+
+                    skipped.append({'page': next_page + 1, 'reason': reason})
+                    yield ''
+                    next_page += 1
+
+                    worker = _Worker()
+                    if next_page < page_count:
+                        worker.conn.send((pdf_bytes, next_page, backend, textless))
+                    continue
+
+                if message[0] == 'done':
+                    finished = True
+                    # Worker saw fewer pages than expected
+                    for page_index in range(next_page, page_count):
+                        skipped.append({'page': page_index + 1, 'reason': 'missing'})
+                        yield ''
+                    return
+
+                if message[0] == 'page':
+                    yield message[2]
+                else:
+                    skipped.append({'page': message[1] + 1, 'reason': message[2]})
+                    yield ''
+                next_page = message[1] + 1
+
+            # Drain the end-of-document marker so the worker can be reused
+            message, _ = self._wait(worker, deadline)
+            finished = message is not None and message[0] == 'done'
+
+        finally:
+            # A generator closed early leaves the worker sending pages of
+            # this document; the next checkout would read them as its own
+            if worker is not None:
+                if finished:
+                    self._checkin(worker)
+                else:
+                    worker.kill()
+
+    def __getstate__(self):
+        # Copies sent to other processes start their own workers
+        state = self.__dict__.copy()
+        state['_idle'] = []
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Stop all idle workers"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+    def _wait(self, worker: _Worker, deadline: float):
+        """
+        Wait for the next message from a worker while enforcing limits
+
+        Returns:
+            Tuple of (message, None), or (None, reason) when the page ran
+            out of time or memory, or the worker died
+        """
+        page_deadline = time.monotonic() + self.page_timeout
+
+        while True:
+            if worker.conn.poll(_POLL_INTERVAL):
+                try:
+                    return worker.conn.recv(), None
+                except (EOFError, OSError):
+                    return None, 'crashed'
+
+            now = time.monotonic()
+            if now >= deadline:
+                return None, 'document_timeout'
+            if now >= page_deadline:
+                return None, 'timeout'
+
+            rss = worker.rss_bytes()
+            if rss is not None and rss > self.max_rss_bytes:
+                return None, 'memory'
+            if not worker.process.is_alive() and not worker.conn.poll():
+                return None, 'crashed'
+
+    def _checkout(self) -> _Worker:
+        """Take an idle worker or start a new one"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker()
+
+    def _checkin(self, worker: _Worker) -> None:
+        """Return a worker to the idle list, or retire it"""
+        worker.documents += 1
+        if worker.documents >= self.max_docs_per_worker:
+            worker.stop()
+            return
+        with self._lock:
+            self._idle.append(worker)
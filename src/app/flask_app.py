@@ -39,7 +39,9 @@ def home():
             'GET /documents': 'List all documents',
             'GET /documents/<id>': 'Get specific document',
             'POST /upload': 'Upload and process PDF',
-            'GET /documents/<id>/status': 'Check processing status'
+            'POST /upload/batch': 'Upload and process several PDFs together',
+            'GET /documents/<id>/status': 'Check processing status',
+            'GET /cache/stats': 'Extraction cache hit/miss counters'
         }
     })
 
@@ -63,6 +65,7 @@ def list_documents():
                 'page_count': doc.page_count,
                 'word_count': doc.word_count,
                 'chunk_count': doc.chunk_count,
+                'needs_ocr': doc.needs_ocr,
                 'current_folder': doc.current_folder,
                 'created_at': doc.created_at.isoformat() if doc.created_at else None,
                 'processed_at': doc.processed_at.isoformat() if doc.processed_at else None
@@ -108,6 +111,7 @@ def get_document(doc_id):
                 'page_count': doc.page_count,
                 'word_count': doc.word_count,
                 'chunk_count': doc.chunk_count,
+                'needs_ocr': doc.needs_ocr,
                 'current_folder': doc.current_folder,
                 'gdrive_upload_id': doc.gdrive_upload_id,
                 'gdrive_processed_id': doc.gdrive_processed_id,
@@ -167,6 +171,23 @@ def get_document_status(doc_id):
     finally:
         db.close()
 
+@app.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get extraction cache counters for monitoring"""
+    cache = pipeline.processor.cache
+    
+    if not cache:
+        return jsonify({
+            'success': True,
+            'enabled': False
+        })
+    
+    return jsonify({
+        'success': True,
+        'enabled': True,
+        'cache': cache.stats()
+    })
+
 @app.route('/upload', methods=['POST'])
 def upload_document():
     """
@@ -234,6 +255,7 @@ def upload_document():
                 'page_count': doc.page_count,
                 'word_count': doc.word_count,
                 'chunk_count': doc.chunk_count,
+                'needs_ocr': doc.needs_ocr,
                 'current_folder': doc.current_folder,
                 'created_at': doc.created_at.isoformat() if doc.created_at else None,
                 'processed_at': doc.processed_at.isoformat() if doc.processed_at else None
@@ -247,6 +269,84 @@ def upload_document():
             'error': f'Processing failed: {str(e)}'
         }), 500
 
+@app.route('/upload/batch', methods=['POST'])
+def upload_documents():
+    """
+    Upload and process several documents in one pipeline run
+    
+    Their folder moves share one storage batch request per stage, and a
+    document that fails does not stop the others.
+    
+    Expects: multipart/form-data with one or more 'files' fields
+    Returns: Details and processing status of every document
+    """
+    files = request.files.getlist('files')
+    logger.info(f"Batch upload request received ({len(files)} file(s))")
+    
+    if not files or any(file.filename == '' for file in files):
+        logger.warning("Batch upload failed: No files provided")
+        return jsonify({
+            'success': False,
+            'error': 'No files provided'
+        }), 400
+    
+    # Check file extensions
+    allowed_extensions = {'.pdf', '.txt'}
+    for file in files:
+        file_ext = os.path.splitext(file.filename)[1].lower()
+        if file_ext not in allowed_extensions:
+            logger.warning(f"Batch upload failed: Invalid file type {file_ext}")
+            return jsonify({
+                'success': False,
+                'error': f'Invalid file type in {file.filename}. Allowed: {", ".join(allowed_extensions)}'
+            }), 400
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # Save uploaded files temporarily (numbered, so equal names don't collide)
+        temp_paths = []
+        for i, file in enumerate(files):
+            temp_path = os.path.join(temp_dir, f"{i}_{file.filename}")
+            file.save(temp_path)
+            temp_paths.append(temp_path)
+        
+        # Process through pipeline
+        logger.info(f"Starting pipeline for {len(files)} file(s)")
+        docs = pipeline.process_documents(temp_paths, [file.filename for file in files])
+        
+        failed = [doc.filename for doc in docs if doc.status != "processed"]
+        if failed:
+            logger.warning(f"Batch processing failed for: {', '.join(failed)}")
+        
+        return jsonify({
+            'success': not failed,
+            'count': len(docs),
+            'documents': [{
+                'id': doc.id,
+                'filename': doc.filename,
+                'status': doc.status,
+                'file_size': doc.file_size,
+                'page_count': doc.page_count,
+                'word_count': doc.word_count,
+                'chunk_count': doc.chunk_count,
+                'needs_ocr': doc.needs_ocr,
+                'current_folder': doc.current_folder,
+                'created_at': doc.created_at.isoformat() if doc.created_at else None,
+                'processed_at': doc.processed_at.isoformat() if doc.processed_at else None
+            } for doc in docs]
+        }), 201
+        
+    except Exception as e:
+        logger.error(f"Batch processing failed: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Processing failed: {str(e)}'
+        }), 500
+        
+    finally:
+        shutil.rmtree(temp_dir)
+        logger.info(f"Temporary files cleaned up")
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🚀 Starting PDF Pipeline API")
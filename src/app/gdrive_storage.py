@@ -2,26 +2,48 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest, MediaFileUpload, MediaIoBaseDownload
+from src.app.blob_storage import PIPELINE_FOLDERS, BlobStorage, StorageBatch
+import httplib2
 import os
 import io
 
 SCOOP = ['https://www.googleapis.com/auth/drive.file']
 
-class GoogleDriveStorage:
+# Drive's batch endpoint takes at most 100 calls per request
+DRIVE_BATCH_URI = 'https://www.googleapis.com/batch/drive/v3'
+MAX_BATCH_SIZE = 100
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+class GoogleDriveStorage(BlobStorage):
     """
     Manages file storage in Google Drive
     Simulates blob storage operations (upload, download, move between folders)
     """
+    
+    label = 'Google Drive'
 
-    def __init__(self, credentials_files='credentials.json', token_path='token.json'):
-        """Initialize Google Drive storage manager"""
+    def __init__(self, credentials_files='credentials.json', token_path='token.json',
+                 service=None, batch_uri=DRIVE_BATCH_URI):
+        """
+        Initialize Google Drive storage manager
+        
+        Args:
+            credentials_files: OAuth client secrets file
+            token_path: Where the OAuth token is cached
+            service: Prebuilt Drive v3 service (skips authentication)
+            batch_uri: Endpoint batch() requests are posted to
+        """
         self.credential_files = credentials_files
         self.token_path = token_path
-        self.service = None
+        self.service = service
+        self.batch_uri = batch_uri
         self.folder_ids = {}
 
-        self.authenticate()
+        if self.service is None:
+            self.authenticate()
 
     def authenticate(self):
         """Authenticate and create the Google Drive service"""
@@ -53,7 +75,7 @@ class GoogleDriveStorage:
         """Create a folder in Google Drive"""
         file_metadata = {
             'name': folder_name,
-            'mimeType': 'application/vnd.google-apps.folder'
+            'mimeType': FOLDER_MIME_TYPE
         }
         
         if parent_id:
@@ -67,15 +89,19 @@ class GoogleDriveStorage:
         print(f"✓ Created folder: {folder_name} (ID: {folder['id']})")
         return folder['id']
     
-    def find_folder(self, folder_name):
-        """Find a folder by name"""
-        query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
+    def find_folder_request(self, folder_name):
+        """Build (without sending) the lookup behind find_folder"""
+        query = f"name='{folder_name}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
         
-        results = self.service.files().list(
+        return self.service.files().list(
             q=query,
             spaces='drive',
             fields='files(id, name)'
-        ).execute()
+        )
+    
+    def find_folder(self, folder_name):
+        """Find a folder by name"""
+        results = self.find_folder_request(folder_name).execute()
         
         files = results.get('files', [])
         
@@ -100,6 +126,40 @@ class GoogleDriveStorage:
         self.folder_ids[folder_name] = folder_id
         return folder_id
     
+    def get_or_create_folders(self, folder_names):
+        """
+        Get several folder IDs, looking up uncached ones in one batch
+        
+        Args:
+            folder_names: Names of folders in Drive
+            
+        Returns:
+            dict mapping folder names to IDs
+        """
+        missing = list(dict.fromkeys(name for name in folder_names if name not in self.folder_ids))
+        
+        if missing:
+            batch = self.batch()
+            for folder_name in missing:
+                batch.find_folder(folder_name)
+            
+            for folder_name, item in zip(missing, batch.execute()):
+                if item['error']:
+                    raise item['error']
+                # Create if not found
+                self.folder_ids[folder_name] = item['result'] or self.create_folder(folder_name)
+        
+        return {name: self.folder_ids[name] for name in folder_names}
+    
+    def batch(self):
+        """
+        Start a queue of moves and lookups sent as Drive batch requests
+        
+        Returns:
+            DriveBatch bound to this storage
+        """
+        return DriveBatch(self)
+    
     def upload_file(self, file_path, folder_name, filename=None):
         """
         Upload a file to Google Drive folder
@@ -187,21 +247,25 @@ class GoogleDriveStorage:
         Returns:
             Updated file info
         """
+        file = self.move_file_request(file_id, source_folder, target_folder).execute()
+        
+        print(f"✓ Moved file {file_id} from {source_folder}/ to {target_folder}/")
+        
+        return file
+    
+    def move_file_request(self, file_id, source_folder, target_folder):
+        """Build (without sending) the update behind move_file"""
         # Get folder IDs
         source_id = self.get_or_create_folder(source_folder)
         target_id = self.get_or_create_folder(target_folder)
         
         # Move file (remove from source, add to target)
-        file = self.service.files().update(
+        return self.service.files().update(
             fileId=file_id,
             addParents=target_id,
             removeParents=source_id,
             fields='id, name, parents'
-        ).execute()
-        
-        print(f"✓ Moved file {file_id} from {source_folder}/ to {target_folder}/")
-        
-        return file
+        )
     
     def list_files_in_folder(self, folder_name):
         """
@@ -238,11 +302,83 @@ class GoogleDriveStorage:
         """
         print("\n📁 Setting up pipeline folders...")
         
-        folders = ['upload', 'staging', 'processing', 'processed', 'parquet']
-        
-        folder_ids = {}
-        for folder in folders:
-            folder_ids[folder] = self.get_or_create_folder(folder)
+        # One batched lookup instead of a round trip per folder
+        folder_ids = self.get_or_create_folders(PIPELINE_FOLDERS)
         
         print("✓ All pipeline folders ready!")
-        return folder_ids
\ No newline at end of file
+        return folder_ids
+
+
+class DriveBatch(StorageBatch):
+    """
+    Queue of Drive moves and folder lookups sent as batch HTTP requests
+    
+    Each queued call becomes one part of a multipart/mixed request, so N
+    calls cost one round trip (per MAX_BATCH_SIZE calls) instead of N.
+    Drive may run the parts of a batch in any order, so never queue two
+    moves of the same file together.
+    """
+    
+    def find_folder(self, folder_name):
+        """Queue a folder lookup; its result is the folder ID or None"""
+        self.calls.append(('find_folder', folder_name))
+    
+    def execute(self):
+        """
+        Send every queued call and empty the queue
+        
+        Folder IDs the moves need come from the cache, or from one extra
+        batched lookup for those not cached yet.
+        
+        Returns:
+            List with one dict per queued call, in queue order: 'result'
+            (as the unbatched method would return it) and 'error' (the
+            call's HttpError, or None)
+        """
+        calls, self.calls = self.calls, []
+        
+        folder_names = [name for call in calls if call[0] == 'move_file' for name in call[2:]]
+        if folder_names:
+            self.storage.get_or_create_folders(folder_names)
+        
+        results = [None] * len(calls)
+        
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            if exception is not None:
+                results[index] = {'result': None, 'error': exception}
+            elif calls[index][0] == 'find_folder':
+                files = response.get('files', [])
+                results[index] = {'result': files[0]['id'] if files else None, 'error': None}
+            else:
+                results[index] = {'result': response, 'error': None}
+        
+        for start in range(0, len(calls), MAX_BATCH_SIZE):
+            end = min(start + MAX_BATCH_SIZE, len(calls))
+            batch = BatchHttpRequest(callback=callback, batch_uri=self.storage.batch_uri)
+            for index in range(start, end):
+                kind, *args = calls[index]
+                if kind == 'find_folder':
+                    request = self.storage.find_folder_request(*args)
+                else:
+                    request = self.storage.move_file_request(*args)
+                batch.add(request, request_id=str(index))
+            
+            # A reply missing a part (KeyError) or a failed batch request
+            # leaves calls without a callback; each gets an error instead
+            try:
+                batch.execute()
+                failure = "Drive sent no response"
+            except (KeyError, HttpError, httplib2.HttpLib2Error, OSError) as e:
+                failure = f"Drive batch request failed: {e!r}"
+            for index in range(start, end):
+                if results[index] is None:
+                    results[index] = {'result': None,
+                                      'error': RuntimeError(f"{failure} (call {index})")}
+        
+        batches = -(-len(calls) // MAX_BATCH_SIZE)
+        failed = sum(1 for item in results if item['error'])
+        print(f"✓ Sent {len(calls)} Drive call(s) in {batches} batch request(s)"
+              + (f", {failed} failed" if failed else ""))
+        
+        return results
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Header/Footer Module
+Removes running headers, footers and page numbers before cleaning
+"""
+
+import re
+from collections import Counter
+from typing import Iterable, Iterator, List, Set, Tuple
+
+
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def normalize_line(line: str) -> str:
+    """
+    Normalize a line so headers that differ only by page number compare equal
+
+    Args:
+        line: Raw line of page text
+
+    Returns:
+        Lower-cased line with whitespace collapsed and digit runs replaced by '#'
+    """
+    return _DIGITS_RE.sub('#', ' '.join(line.split()).lower())
+
+
+class HeaderFooterStripper:
+    """
+    Detects lines repeated at the top or bottom of many pages
+
+    The first and last few non-empty lines of each page are normalized
+    and counted per edge position; a line that shows up in the same
+    position on enough pages is page furniture and is removed. Both the
+    counting and the stripping are linear in the number of pages.
+    """
+
+    def __init__(self, edge_lines: int = 2, min_ratio: float = 0.5, min_pages: int = 3):
+        """
+        Initialize the stripper
+
+        Args:
+            edge_lines: Lines examined at the top and at the bottom of each page
+            min_ratio: Fraction of pages a line must repeat on
+            min_pages: Minimum number of pages a line must repeat on
+        """
+        self.edge_lines = edge_lines
+        self.min_ratio = min_ratio
+        self.min_pages = min_pages
+        self.furniture: Set[Tuple[str, int, str]] = set()
+        self.lines_removed = 0
+
+    def learn(self, page_texts: List[str]) -> None:
+        """
+        Find repeated edge lines across a set of pages
+
+        Args:
+            page_texts: Raw text of each page
+        """
+        counts = Counter()
+        for page_text in page_texts:
+            counts.update(set(self._edge_keys(page_text)))
+
+        threshold = max(self.min_pages, self.min_ratio * len(page_texts))
+        self.furniture = {key for key, count in counts.items() if count >= threshold}
+
+    def strip(self, page_text: str) -> str:
+        """
+        Remove learned header/footer lines from one page
+
+        Args:
+            page_text: Raw page text
+
+        Returns:
+            Page text without its repeated edge lines
+        """
+        if not self.furniture or not page_text:
+            return page_text
+
+        lines = page_text.split('\n')
+        content = [i for i, line in enumerate(lines) if line.strip()]
+        removed = set()
+
+        # Peel furniture lines off each edge until a content line is hit
+        for edge, positions in (('top', content), ('bottom', content[::-1])):
+            for depth, i in enumerate(positions[:self.edge_lines]):
+                if (edge, depth, normalize_line(lines[i])) not in self.furniture:
+                    break
+                removed.add(i)
+
+        if not removed:
+            return page_text
+
+        self.lines_removed += len(removed)
+        return '\n'.join(line for i, line in enumerate(lines) if i not in removed)
+
+    def strip_pages(self, pages: Iterable[str], sample_pages: int = 32) -> Iterator[str]:
+        """
+        Stream pages with headers and footers removed
+
+        The first sample_pages pages are buffered to learn the repeated
+        lines, so memory stays bounded on long documents.
+
+        Args:
+            pages: Raw page texts
+            sample_pages: Pages used to learn the repeated lines
+
+        Yields:
+            Page texts with furniture removed
+        """
+        pages = iter(pages)
+        sample = []
+        for page_text in pages:
+            sample.append(page_text)
+            if len(sample) >= sample_pages:
+                break
+
+        self.learn(sample)
+
+        for page_text in sample:
+            yield self.strip(page_text)
+        for page_text in pages:
+            yield self.strip(page_text)
+
+    def _edge_keys(self, page_text: str) -> Iterator[Tuple[str, int, str]]:
+        """(edge, depth, normalized line) for the edge lines of a page"""
+        lines = [line for line in page_text.split('\n') if line.strip()]
+
+        for depth, line in enumerate(lines[:self.edge_lines]):
+            yield 'top', depth, normalize_line(line)
+        for depth, line in enumerate(lines[::-1][:self.edge_lines]):
+            yield 'bottom', depth, normalize_line(line)
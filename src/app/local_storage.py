@@ -0,0 +1,185 @@
+"""
+Local Storage Module
+Pipeline storage in a local directory, for single-node deployments and CI
+"""
+
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from src.app.blob_storage import PIPELINE_FOLDERS, BlobStorage
+
+
+class LocalStorage(BlobStorage):
+    """
+    Stores pipeline files as <root>/<folder>/<id>_<name>
+
+    Every folder sits under one root, so a move is normally a single
+    rename: atomic, and no data is copied. A folder mounted from another
+    filesystem falls back to copy-and-delete. Uploads are copied to a
+    hidden temporary name and renamed into place, so listings never see
+    a partial file.
+    """
+
+    label = 'local storage'
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory holding the folders (created if missing)
+        """
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def folder_path(self, folder_name: str) -> str:
+        """Directory of a folder, created on first use"""
+        path = os.path.join(self.root, folder_name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _file_path(self, folder_name: str, file_id: str) -> Optional[str]:
+        """Path of a file in a folder, or None if it is not there"""
+        prefix = f"{file_id}_"
+        with os.scandir(self.folder_path(folder_name)) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix):
+                    return entry.path
+        return None
+
+    def _file_info(self, path: str) -> Dict:
+        """Drive-style file dict for a stored file"""
+        file_id, _, name = os.path.basename(path).partition('_')
+        stat = os.stat(path)
+        return {
+            'id': file_id,
+            'name': name,
+            'size': str(stat.st_size),
+            'createdTime': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+        }
+
+    def upload_file(self, file_path: str, folder_name: str, filename: Optional[str] = None) -> Dict:
+        """
+        Copy a file into a folder under a new ID
+
+        Args:
+            file_path: Local path to file
+            folder_name: Name of folder
+            filename: Name to store it under (defaults to original filename)
+
+        Returns:
+            dict with file info (id, name, size, created_time)
+        """
+        # Use original filename if not specified
+        if not filename:
+            filename = os.path.basename(file_path)
+
+        file_id = uuid.uuid4().hex
+        folder = self.folder_path(folder_name)
+        path = os.path.join(folder, f"{file_id}_{filename}")
+        temp_path = os.path.join(folder, f".{file_id}.tmp")
+        try:
+            shutil.copyfile(file_path, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        print(f"✓ Uploaded: {filename} to {folder_name}/ (ID: {file_id})")
+
+        info = self._file_info(path)
+        return {
+            'id': file_id,
+            'name': filename,
+            'size': info['size'],
+            'created_time': info['createdTime']
+        }
+
+    def download_file(self, file_id: str, destination_path: str) -> bool:
+        """
+        Copy a stored file out, from whichever folder holds it
+
+        Args:
+            file_id: ID returned by upload_file
+            destination_path: Where to save the file
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            for folder_name in os.listdir(self.root):
+                if not os.path.isdir(os.path.join(self.root, folder_name)):
+                    continue
+                path = self._file_path(folder_name, file_id)
+                if path:
+                    shutil.copyfile(path, destination_path)
+                    print(f"✓ Downloaded file ID {file_id} to {destination_path}")
+                    return True
+
+            print(f"✗ Download failed: no file with ID {file_id}")
+            return False
+
+        except OSError as e:
+            print(f"✗ Download failed: {e}")
+            return False
+
+    def move_file(self, file_id: str, source_folder: str, target_folder: str) -> Dict:
+        """
+        Move a file from one folder to another, keeping its ID
+
+        Args:
+            file_id: ID returned by upload_file
+            source_folder: Source folder name
+            target_folder: Target folder name
+
+        Returns:
+            Updated file info (id, name, parents)
+
+        Raises:
+            FileNotFoundError: If the file is not in source_folder
+        """
+        path = self._file_path(source_folder, file_id)
+        if path is None:
+            raise FileNotFoundError(f"No file with ID {file_id} in {source_folder}/")
+
+        # A rename within one filesystem, copy-and-delete across them
+        target_path = os.path.join(self.folder_path(target_folder), os.path.basename(path))
+        shutil.move(path, target_path)
+
+        print(f"✓ Moved file {file_id} from {source_folder}/ to {target_folder}/")
+
+        info = self._file_info(target_path)
+        return {'id': file_id, 'name': info['name'], 'parents': [target_folder]}
+
+    def list_files_in_folder(self, folder_name: str) -> List[Dict]:
+        """
+        List all files in a folder (in-progress uploads are hidden)
+
+        Args:
+            folder_name: Name of folder
+
+        Returns:
+            List of file dicts (id, name, size, createdTime)
+        """
+        with os.scandir(self.folder_path(folder_name)) as entries:
+            files = [self._file_info(entry.path) for entry in entries
+                     if entry.is_file() and not entry.name.startswith('.')]
+
+        print(f"✓ Found {len(files)} file(s) in {folder_name}/")
+
+        return files
+
+    def setup_pipeline_folders(self) -> Dict[str, str]:
+        """
+        Create all pipeline folders
+
+        Returns:
+            dict mapping folder names to their directories
+        """
+        print("\n📁 Setting up pipeline folders...")
+
+        folder_ids = {folder: self.folder_path(folder) for folder in PIPELINE_FOLDERS}
+
+        print(f"✓ All pipeline folders ready in {self.root}")
+        return folder_ids
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
 from sqlalchemy.sql import func
 from src.app.database import Base
 
@@ -24,6 +24,7 @@ class Document(Base):
     page_count = Column(Integer)
     word_count = Column(Integer)
     chunk_count = Column(Integer)
+    needs_ocr = Column(Boolean, default=False)  # Has image-only (scanned) pages
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
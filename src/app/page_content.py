@@ -0,0 +1,94 @@
+"""
+Page Content Module
+Cheap pre-check for pages that have no text to extract
+"""
+
+import re
+from typing import Iterable, Tuple
+
+
+PAGE_TEXT = 'text'
+PAGE_IMAGE_ONLY = 'image_only'
+PAGE_EMPTY = 'empty'
+
+# BT (begin text object) starts every run of text-showing operators;
+# BI starts an inline image. Operators are delimited by whitespace or
+# PDF delimiters, so a neighbouring letter or digit means another token.
+_TEXT_OBJECT_RE = re.compile(rb'(?<![A-Za-z0-9])BT(?![A-Za-z0-9])')
+_INLINE_IMAGE_RE = re.compile(rb'(?<![A-Za-z0-9])BI(?![A-Za-z0-9])')
+
+# Nesting limit for form XObjects (forms may reference each other)
+_MAX_FORM_DEPTH = 8
+
+
+def classify_page(page) -> str:
+    """
+    Decide whether a page can contain extractable text
+
+    Only the page's resource dictionaries and raw (decompressed) content
+    streams are read; no content operators are parsed. A page can only
+    show text if it, or a form XObject it draws, has a BT operator. Any
+    error counts as text, so unusual pages still go through extraction.
+
+    Args:
+        page: PyPDF2 page object
+
+    Returns:
+        PAGE_TEXT, PAGE_IMAGE_ONLY (images but no text, e.g. a scan) or
+        PAGE_EMPTY
+    """
+    try:
+        has_text, has_images = _scan(page, _content_streams(page.get('/Contents')), 0, set())
+    except Exception:
+        return PAGE_TEXT
+
+    if has_text:
+        return PAGE_TEXT
+    return PAGE_IMAGE_ONLY if has_images else PAGE_EMPTY
+
+
+def _scan(node, streams: Iterable, depth: int, seen: set) -> Tuple[bool, bool]:
+    """(has_text, has_images) for a page or form XObject and the forms it uses"""
+    resources = _resolve(node.get('/Resources')) or {}
+    has_images = False
+    forms = []
+
+    xobjects = _resolve(resources.get('/XObject')) or {}
+    for reference in xobjects.values():
+        xobject = _resolve(reference)
+        subtype = xobject.get('/Subtype')
+        if subtype == '/Image':
+            has_images = True
+        elif subtype == '/Form' and id(xobject) not in seen:
+            seen.add(id(xobject))
+            forms.append(xobject)
+
+    for data in streams:
+        if _TEXT_OBJECT_RE.search(data):
+            return True, has_images
+        if not has_images and _INLINE_IMAGE_RE.search(data):
+            has_images = True
+
+    if depth < _MAX_FORM_DEPTH:
+        for form in forms:
+            form_text, form_images = _scan(form, [form.get_data()], depth + 1, seen)
+            has_images = has_images or form_images
+            if form_text:
+                return True, has_images
+
+    return False, has_images
+
+
+def _content_streams(contents) -> Iterable[bytes]:
+    """Decompressed data of a page's /Contents (a stream or an array of streams)"""
+    contents = _resolve(contents)
+    if contents is None:
+        return []
+    if isinstance(contents, list):
+        return (_resolve(stream).get_data() for stream in contents)
+    return [contents.get_data()]
+
+
+def _resolve(value):
+    """Follow an indirect reference (None stays None)"""
+    return value.get_object() if hasattr(value, 'get_object') else value
@@ -1,19 +1,430 @@
-import pandas as pd
+import json
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
 import os
-from typing import List, Dict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Union
+
+from src.app.chunking import ChunkBatch
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Row group limits for streamed writes: whichever is reached first
+DEFAULT_ROW_GROUP_ROWS = 1024
+DEFAULT_ROW_GROUP_BYTES = 64 * 1024 * 1024
+
+# Approximate bytes per buffered row besides its text (integer columns)
+_ROW_OVERHEAD = 8 * 8
+
+# Columns every chunk file has, in ChunkBatch.column_names order
+CHUNK_FIELDS = [
+    pa.field('chunk_id', pa.int64(), nullable=False),
+    pa.field('text', pa.string(), nullable=False),
+    pa.field('word_count', pa.int64(), nullable=False),
+    pa.field('start_word', pa.int64(), nullable=False),
+    pa.field('end_word', pa.int64(), nullable=False),
+    pa.field('start_char', pa.int64(), nullable=False),
+    pa.field('end_char', pa.int64(), nullable=False),
+    pa.field('start_page', pa.int64(), nullable=False),
+    pa.field('end_page', pa.int64(), nullable=False)
+]
+
+# Columns present only once token counting or deduplication has run
+OPTIONAL_CHUNK_FIELDS = {
+    'token_count': pa.field('token_count', pa.int64(), nullable=False),
+    'duplicate_of': pa.field('duplicate_of', pa.string())
+}
+
+# Key-value file metadata entry holding the document metadata as JSON
+DOCUMENT_METADATA_KEY = b'pdf_pipeline.document'
+
+# Output formats of ParquetCreator: Parquet, and Arrow IPC (Feather v2)
+# files that workers can memory-map without decoding
+OUTPUT_FORMATS = ('parquet', 'feather')
+FEATHER_COMPRESSIONS = ('uncompressed', 'lz4')
+FEATHER_SUFFIX = '.arrow'
+
+
+# Parquet write settings; None leaves the pyarrow default in place
+PROFILE_DEFAULTS = {
+    'compression': 'snappy',        # 'none', 'snappy', 'lz4', 'zstd', 'gzip' or 'brotli'
+    'compression_level': None,      # codec-specific (zstd: 1-22)
+    'row_group_rows': None,         # rows per row group (None = pyarrow default)
+    'dictionary_text': True,        # dictionary-encode the chunk text column
+    'statistics': True,             # min/max statistics for row group pruning
+    'page_index': False             # column/offset indexes for page-level pruning
+}
+
+WRITE_PROFILES = {
+    # pyarrow's defaults, as written before profiles existed
+    'default': {},
+    # Cheapest encode: fast codec, no text dictionary, no statistics
+    'fast-write': {'compression': 'lz4', 'dictionary_text': False, 'statistics': False},
+    # Smallest upload: strong zstd over large row groups
+    'small-on-drive': {'compression': 'zstd', 'compression_level': 9,
+                       'row_group_rows': 64 * 1024},
+    # Selective reads: small row groups with statistics and a page index
+    'fast-scan': {'compression': 'lz4', 'row_group_rows': 1024, 'dictionary_text': False,
+                  'page_index': True}
+}
+
+
+def resolve_write_profile(profile: Union[str, Dict, None]) -> Dict:
+    """
+    Full settings of a Parquet write profile
+    
+    Args:
+        profile: Preset name (see WRITE_PROFILES), a dict of settings
+            (see PROFILE_DEFAULTS; a 'base' key names the preset it
+            extends) or None for 'default'
+        
+    Returns:
+        Dict with every PROFILE_DEFAULTS key
+        
+    Raises:
+        ValueError: On an unknown preset, setting or codec
+    """
+    overrides = dict(WRITE_PROFILES['default'] if profile is None else
+                     {'base': profile} if isinstance(profile, str) else profile)
+    base = overrides.pop('base', 'default')
+    if base not in WRITE_PROFILES:
+        raise ValueError(f"Unknown Parquet write profile '{base}'; "
+                         f"choose from {', '.join(WRITE_PROFILES)}")
+    
+    settings = {**PROFILE_DEFAULTS, **WRITE_PROFILES[base], **overrides}
+    unknown = set(settings) - set(PROFILE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown Parquet write settings: {', '.join(sorted(unknown))}")
+    
+    codec = settings['compression']
+    if codec != 'none' and not pa.Codec.is_available(codec):
+        raise ValueError(f"Compression '{codec}' is not available in this pyarrow build")
+    
+    return settings
+
+
+def parquet_writer_options(settings: Dict, column_names: Iterable[str]) -> Dict:
+    """
+    ParquetWriter / write_table keyword arguments for resolved settings
+    
+    Args:
+        settings: Output of resolve_write_profile
+        column_names: Columns of the table being written
+        
+    Returns:
+        Keyword arguments (row group size is passed separately)
+    """
+    return {
+        'compression': settings['compression'],
+        'compression_level': settings['compression_level'],
+        'use_dictionary': (True if settings['dictionary_text']
+                           else [name for name in column_names if name != 'text']),
+        'write_statistics': settings['statistics'],
+        'write_page_index': settings['page_index']
+    }
+
+
+def feather_path(parquet_path: str) -> str:
+    """
+    Path of the Arrow IPC file written alongside (or instead of) a Parquet file
+    
+    Args:
+        parquet_path: Chunk Parquet path (e.g. paper.parquet)
+        
+    Returns:
+        Arrow IPC path (e.g. paper.arrow)
+    """
+    stem = parquet_path[:-len('.parquet')] if parquet_path.endswith('.parquet') else parquet_path
+    return stem + FEATHER_SUFFIX
+
+
+def _constant_type(value) -> pa.DataType:
+    """Arrow type of a doc_ column: dictionary-encoded unless null or nested"""
+    value_type = pa.scalar(value).type
+    if pa.types.is_null(value_type) or pa.types.is_nested(value_type):
+        return value_type
+    return pa.dictionary(pa.int32(), value_type)
+
+
+def _constant_column(value, data_type: pa.DataType, length: int) -> pa.Array:
+    """A column repeating one value, stored once in a dictionary where possible"""
+    if pa.types.is_dictionary(data_type):
+        return pa.DictionaryArray.from_arrays(
+            pa.repeat(pa.scalar(0, pa.int32()), length),
+            pa.array([value], data_type.value_type))
+    if pa.types.is_null(data_type):
+        return pa.nulls(length)
+    return pa.repeat(pa.scalar(value, data_type), length)
+
+
+def chunk_schema(column_names: Iterable[str], metadata: Optional[Dict] = None,
+                 text_type: pa.DataType = pa.string()) -> pa.Schema:
+    """
+    Explicit schema of a chunk Parquet file
+    
+    Document metadata becomes one dictionary-encoded doc_{key} column per
+    entry (a single dictionary value, so each row costs only a run-length
+    encoded index) and is also stored as JSON in the file's key-value
+    metadata, where it can be read from the footer alone.
+    
+    Args:
+        column_names: Chunk columns present (ChunkBatch.column_names)
+        metadata: Optional document metadata
+        text_type: Arrow type of the text column (large_string for
+            batches over 2 GB)
+        
+    Returns:
+        pyarrow.Schema
+    """
+    present = set(column_names)
+    fields = [field.with_type(text_type) if field.name == 'text' else field
+              for field in CHUNK_FIELDS]
+    fields += [field for name, field in OPTIONAL_CHUNK_FIELDS.items() if name in present]
+    fields += [pa.field(f'doc_{key}', _constant_type(value))
+               for key, value in (metadata or {}).items()]
+    
+    schema = pa.schema(fields)
+    if metadata:
+        schema = schema.with_metadata(
+            {DOCUMENT_METADATA_KEY: json.dumps(metadata, default=str).encode('utf-8')})
+    return schema
+
+
+def chunk_table(batch: ChunkBatch, metadata: Optional[Dict] = None) -> pa.Table:
+    """
+    Arrow table of a chunk Parquet file, built without pandas
+    
+    Args:
+        batch: Chunks from PDFProcessor (its buffers are not copied)
+        metadata: Optional document metadata (see chunk_schema)
+        
+    Returns:
+        Table with the chunk_schema schema
+    """
+    table = batch.to_arrow()
+    schema = chunk_schema(table.column_names, metadata, table.schema.field('text').type)
+    
+    columns = table.columns + [
+        _constant_column(value, schema.field(f'doc_{key}').type, table.num_rows)
+        for key, value in (metadata or {}).items()
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class StreamingParquetWriter:
+    """
+    Write chunks to a Parquet file one row group at a time
+    
+    Chunks are buffered until row_group_rows rows or row_group_bytes
+    bytes of text have arrived, then written as one row group, so memory
+    is bounded by the row group size rather than the document length.
+    Fits directly behind PDFProcessor.iter_chunks:
+    
+        with StreamingParquetWriter(path, metadata) as writer:
+            for chunk in processor.iter_chunks(processor.iter_pages(pdf)):
+                writer.write(chunk)
+    
+    If the block raises, the partial file is removed.
+    """
+    
+    def __init__(self, output_path: str, metadata: Dict = None,
+                 row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+                 row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+                 write_profile: Union[str, Dict, None] = None):
+        """
+        Initialize the writer (the file is created on the first flush)
+        
+        Args:
+            output_path: Where to save the parquet file
+            metadata: Optional metadata to include as doc_ columns
+            row_group_rows: Maximum rows per row group
+            row_group_bytes: Flush once buffered chunks hold this many bytes
+            write_profile: Parquet write profile (see resolve_write_profile);
+                its row_group_rows is ignored in favour of the limits above
+        """
+        self.output_path = output_path
+        self.metadata = metadata
+        self.settings = resolve_write_profile(write_profile)
+        self.row_group_rows = max(1, row_group_rows)
+        self.row_group_bytes = max(1, row_group_bytes)
+        self.rows_written = 0
+        self.row_groups = 0
+        
+        self._pending: List[Mapping] = []
+        self._pending_bytes = 0
+        self._writer = None
+    
+    def write(self, chunk: Mapping) -> None:
+        """
+        Buffer one chunk, flushing a row group when a limit is reached
+        
+        Args:
+            chunk: Chunk mapping (Chunk, ChunkRow or dict)
+        """
+        self._pending.append(chunk)
+        
+        # Measured as UTF-8, as written; ASCII text needs no encoding
+        text = chunk['text']
+        text_bytes = len(text) if text.isascii() else len(text.encode('utf-8'))
+        self._pending_bytes += text_bytes + _ROW_OVERHEAD
+        
+        if (len(self._pending) >= self.row_group_rows
+                or self._pending_bytes >= self.row_group_bytes):
+            self.flush()
+    
+    def write_batch(self, batch: ChunkBatch) -> None:
+        """
+        Write a whole ChunkBatch without copying it chunk by chunk
+        
+        Args:
+            batch: Chunks from PDFProcessor
+        """
+        self.flush()
+        if not len(batch):
+            return
+        
+        row_bytes = batch.nbytes / len(batch)
+        rows = max(1, min(self.row_group_rows, int(self.row_group_bytes / row_bytes)))
+        self._write_table(batch, rows)
+    
+    def flush(self) -> None:
+        """Write the buffered chunks as one row group"""
+        if not self._pending:
+            return
+        
+        batch = ChunkBatch.from_chunks(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        self._write_table(batch, len(batch))
+    
+    def close(self) -> int:
+        """
+        Flush the remaining chunks and finish the file
+        
+        Returns:
+            Number of rows written
+        """
+        self.flush()
+        
+        if self._writer is None:
+            # No chunks at all: still write a valid, empty file
+            table = chunk_table(ChunkBatch.from_chunks([]), self.metadata)
+            pq.write_table(table, self.output_path,
+                           **parquet_writer_options(self.settings, table.column_names))
+        else:
+            self._writer.close()
+            self._writer = None
+        
+        return self.rows_written
+    
+    def _write_table(self, batch: ChunkBatch, row_group_rows: int) -> None:
+        """Write chunks as row groups of at most row_group_rows rows"""
+        table = chunk_table(batch, self.metadata)
+        
+        # Every row group follows the schema of the first
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self.output_path, table.schema,
+                **parquet_writer_options(self.settings, table.column_names))
+        elif table.schema != self._writer.schema:
+            table = table.cast(self._writer.schema)
+        
+        self._writer.write_table(table, row_group_size=row_group_rows)
+        self.rows_written += table.num_rows
+        self.row_groups += -(-table.num_rows // row_group_rows)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
 
 class ParquetCreator:
     """Create Parquet files from text chunks"""
     
-    def __init__(self):
-        pass
+    def __init__(self, output_formats: Iterable[str] = ('parquet',),
+                 feather_compression: str = 'uncompressed',
+                 write_profile: Union[str, Dict, None] = None):
+        """
+        Initialize the creator
+        
+        Args:
+            output_formats: Formats create_parquet writes: 'parquet',
+                'feather' (Arrow IPC, see feather_path) or both
+            feather_compression: 'uncompressed' (memory-mapped reads
+                copy nothing) or 'lz4' (smaller; decompressed on load)
+            write_profile: Parquet codec, row group and encoding settings:
+                'default', 'fast-write', 'small-on-drive', 'fast-scan' or
+                a dict (see resolve_write_profile)
+        """
+        self.write_profile = write_profile
+        self.settings = resolve_write_profile(write_profile)
+        self.output_formats = tuple(output_formats)
+        unknown = set(self.output_formats) - set(OUTPUT_FORMATS)
+        if unknown or not self.output_formats:
+            raise ValueError(f"Unknown output formats {sorted(unknown)}; "
+                             f"choose from {', '.join(OUTPUT_FORMATS)}")
+        if feather_compression not in FEATHER_COMPRESSIONS:
+            raise ValueError(f"Unknown Feather compression '{feather_compression}'; "
+                             f"choose from {', '.join(FEATHER_COMPRESSIONS)}")
+        self.feather_compression = feather_compression
+    
+    @classmethod
+    def from_env(cls) -> 'ParquetCreator':
+        """
+        Creator configured like the pipeline's
+        
+        Reads PDF_OUTPUT_FORMATS (e.g. "parquet,feather"),
+        PDF_FEATHER_COMPRESSION and PDF_PARQUET_PROFILE.
+        
+        Returns:
+            ParquetCreator
+        """
+        formats = os.environ.get('PDF_OUTPUT_FORMATS', 'parquet')
+        return cls(
+            output_formats=[name.strip() for name in formats.split(',') if name.strip()],
+            feather_compression=os.environ.get('PDF_FEATHER_COMPRESSION', 'uncompressed'),
+            write_profile=os.environ.get('PDF_PARQUET_PROFILE', 'default')
+        )
+    
+    def output_paths(self, output_path: str) -> List[str]:
+        """
+        Files create_parquet writes for an output path
+        
+        Args:
+            output_path: Parquet path passed to create_parquet
+            
+        Returns:
+            Paths, Parquet first
+        """
+        paths = []
+        if 'parquet' in self.output_formats:
+            paths.append(output_path)
+        if 'feather' in self.output_formats:
+            paths.append(feather_path(output_path))
+        return paths
     
-    def create_parquet(self, chunks: List[Dict], output_path: str, metadata: Dict = None) -> bool:
+    def create_parquet(self, chunks: Union[ChunkBatch, Iterable[Mapping]], output_path: str,
+                       metadata: Dict = None) -> bool:
         """
         Create a Parquet file from text chunks
         
+        With 'feather' among the output formats, the same table is also
+        (or only) written as Arrow IPC to feather_path(output_path).
+        
         Args:
-            chunks: List of chunk dictionaries
+            chunks: ChunkBatch from PDFProcessor (written without copying
+                its buffers), or any iterable of chunk dictionaries
             output_path: Where to save the parquet file
             metadata: Optional metadata to include
             
@@ -23,22 +434,68 @@ class ParquetCreator:
         print(f"\n📦 Creating Parquet file...")
         
         try:
-            # Convert chunks to DataFrame
-            df = pd.DataFrame(chunks)
+            # Columnar chunks convert to Arrow without a per-chunk dict
+            if not isinstance(chunks, ChunkBatch):
+                chunks = ChunkBatch.from_chunks(chunks)
             
-            # Add metadata columns if provided
-            if metadata:
-                for key, value in metadata.items():
-                    df[f'doc_{key}'] = value
+            # Explicit schema; metadata becomes dictionary-encoded doc_ columns
+            table = chunk_table(chunks, metadata)
             
-            # Save as Parquet
-            df.to_parquet(output_path, engine='pyarrow', index=False)
+            for path in self.output_paths(output_path):
+                if path == output_path:
+                    pq.write_table(table, path, row_group_size=self.settings['row_group_rows'],
+                                   **parquet_writer_options(self.settings, table.column_names))
+                else:
+                    feather.write_feather(table, path, compression=self.feather_compression)
+                
+                file_size = os.path.getsize(path)
+                
+                print(f"✓ {'Parquet' if path == output_path else 'Arrow IPC'} file created: {path}")
+                print(f"  Rows: {table.num_rows}")
+                print(f"  Columns: {table.column_names}")
+                print(f"  Size: {file_size} bytes")
+            
+            return True
+            
+        except Exception as e:
+            print(f"✗ Error creating Parquet: {e}")
+            return False
+    
+    def write_chunks(self, chunks: Union[ChunkBatch, Iterable[Mapping]], output_path: str,
+                     metadata: Dict = None, row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+                     row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES) -> bool:
+        """
+        Stream chunks into a Parquet file, one row group at a time
+        
+        Unlike create_parquet, the chunks are never all held at once, so
+        a generator such as PDFProcessor.iter_chunks keeps memory flat
+        regardless of document length.
+        
+        Args:
+            chunks: Chunk iterator (or a ChunkBatch)
+            output_path: Where to save the parquet file
+            metadata: Optional metadata to include
+            row_group_rows: Maximum rows per row group
+            row_group_bytes: Flush a row group once this many bytes are buffered
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        print(f"\n📦 Streaming Parquet file...")
+        
+        try:
+            with StreamingParquetWriter(output_path, metadata, row_group_rows,
+                                        row_group_bytes, self.write_profile) as writer:
+                if isinstance(chunks, ChunkBatch):
+                    writer.write_batch(chunks)
+                else:
+                    for chunk in chunks:
+                        writer.write(chunk)
             
             file_size = os.path.getsize(output_path)
             
             print(f"✓ Parquet file created: {output_path}")
-            print(f"  Rows: {len(df)}")
-            print(f"  Columns: {list(df.columns)}")
+            print(f"  Rows: {writer.rows_written} in {writer.row_groups} row group(s)")
             print(f"  Size: {file_size} bytes")
             
             return True
@@ -47,18 +504,28 @@ class ParquetCreator:
             print(f"✗ Error creating Parquet: {e}")
             return False
     
-    def read_parquet(self, parquet_path: str) -> pd.DataFrame:
+    def read_parquet(self, parquet_path: str, columns: Optional[List[str]] = None,
+                     filters: Optional[List] = None) -> 'pd.DataFrame':
         """
-        Read a Parquet file
+        Read a Parquet file, optionally only some columns and rows
+        
+        The file is memory-mapped. Only the requested columns are decoded,
+        and row groups whose min/max statistics rule out the filters are
+        skipped without being read.
         
         Args:
             parquet_path: Path to parquet file
+            columns: Columns to read (None = all)
+            filters: Row filters in pyarrow DNF form, e.g.
+                [('start_page', '>=', 5)] or [[...], [...]] for OR
             
         Returns:
             DataFrame with data
         """
         try:
-            df = pd.read_parquet(parquet_path, engine='pyarrow')
+            table = pq.read_table(parquet_path, columns=columns, filters=filters,
+                                  memory_map=True)
+            df = table.to_pandas()
             print(f"✓ Read Parquet file: {parquet_path}")
             print(f"  Rows: {len(df)}")
             return df
@@ -67,29 +534,65 @@ class ParquetCreator:
             print(f"✗ Error reading Parquet: {e}")
             return None
     
+    def read_feather(self, feather_path: str, columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        Memory-map an Arrow IPC file written by create_parquet
+        
+        Uncompressed files are not copied or decoded: the table's buffers
+        point straight into the mapped file, so pages are only read when
+        used and are shared between worker processes. LZ4 files are
+        decompressed into memory.
+        
+        Args:
+            feather_path: Path to the .arrow file
+            columns: Columns to keep (None = all)
+            
+        Returns:
+            pyarrow.Table backed by the mapped file
+        """
+        source = pa.memory_map(feather_path, 'r')
+        table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+    
     def get_parquet_info(self, parquet_path: str) -> Dict:
         """
-        Get information about a Parquet file
+        Get information about a Parquet file from its footer
+        
+        Row counts, schema and document metadata come from the footer;
+        only the first rows of the first row group are decoded, for the
+        sample row, so the cost does not grow with the file.
         
         Args:
             parquet_path: Path to parquet file
             
         Returns:
-            Dict with file info
+            Dict with file info (row_count, column_count, columns,
+            row_group_count, file_size, document, sample_row)
         """
         try:
-            df = pd.read_parquet(parquet_path, engine='pyarrow')
+            with pq.ParquetFile(parquet_path, memory_map=True) as parquet_file:
+                file_metadata = parquet_file.metadata
+                schema = parquet_file.schema_arrow
+                
+                sample_row = {}
+                if file_metadata.num_rows > 0:
+                    first = next(parquet_file.iter_batches(batch_size=1, row_groups=[0]))
+                    sample_row = first.to_pylist()[0]
+            
+            stored = (schema.metadata or {}).get(DOCUMENT_METADATA_KEY)
             
             info = {
-                'row_count': len(df),
-                'column_count': len(df.columns),
-                'columns': list(df.columns),
+                'row_count': file_metadata.num_rows,
+                'column_count': len(schema.names),
+                'columns': schema.names,
+                'row_group_count': file_metadata.num_row_groups,
                 'file_size': os.path.getsize(parquet_path),
-                'sample_row': df.iloc[0].to_dict() if len(df) > 0 else {}
+                'document': json.loads(stored) if stored else {},
+                'sample_row': sample_row
             }
             
             return info
             
         except Exception as e:
             print(f"✗ Error getting Parquet info: {e}")
-            return {}
\ No newline at end of file
+            return {}
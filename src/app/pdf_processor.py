@@ -4,25 +4,178 @@ Extracts text, metadata, and creates LLM-ready chunks from PDF files
 """
 
 import PyPDF2
-import re
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Tuple
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import copy
+import hashlib
 import io
+import os
+import time
+
+from src.app.chunking import (
+    CHUNK_STRATEGIES, Chunk, ChunkBatch, WordIndex, sentence_windows, token_windows,
+    word_windows, _WORD_RE
+)
+from src.app.chunk_dedup import DUPLICATE_STAT_KEYS, ChunkDeduplicator
+from src.app.extraction_backends import DEFAULT_BACKEND, ExtractionBackend, get_backend
+from src.app.extraction_cache import ExtractionCache
+from src.app.extraction_sandbox import SandboxedExtractor
+from src.app.header_footer import HeaderFooterStripper
+from src.app.page_content import PAGE_EMPTY, PAGE_IMAGE_ONLY, PAGE_TEXT, classify_page
+from src.app.token_counting import TokenCounter, counter_name, estimate_tokens
+
+
+# Characters removed outright during cleaning
+_CLEAN_DELETE_TABLE = str.maketrans('', '', '\x00')
+
+
+def clean_page_text(text: str) -> str:
+    """
+    Clean extracted text in a single pass
+    
+    Null bytes are deleted (only when present), then every run of
+    whitespace collapses to one space and the ends are trimmed. split()
+    and join() both run in C, which is several times faster than a
+    whitespace regex on the non-ASCII text academic PDFs produce.
+    
+    Args:
+        text: Raw extracted text
+        
+    Returns:
+        Cleaned text
+    """
+    if '\x00' in text:
+        text = text.translate(_CLEAN_DELETE_TABLE)
+    
+    return ' '.join(text.split())
+
+
+# Per-worker backend and document, opened once by _init_page_worker over the shared bytes
+_worker_backend = None
+_worker_document = None
+
+
+def _init_page_worker(pdf_bytes: bytes, backend: ExtractionBackend):
+    """Open a private copy of the document in each pool worker"""
+    global _worker_backend, _worker_document
+    _worker_backend = backend
+    _worker_document = backend.open(pdf_bytes)
+
+
+def _extract_page_range(start: int, end: int, textless: frozenset = frozenset()) -> List[str]:
+    """Extract the text of pages [start, end) in a pool worker"""
+    return ['' if i in textless else _worker_backend.page_text(_worker_document, i)
+            for i in range(start, end)]
+
+
+def _inspect_path(path: str) -> Dict:
+    """Inspect one PDF in a pool worker, capturing errors per file"""
+    try:
+        metadata = PDFProcessor().inspect(path)
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+    
+    metadata['path'] = path
+    return metadata
+
+
+def _process_path(processor: 'PDFProcessor', path: str) -> Dict:
+    """Process one whole document, capturing errors per file"""
+    start = time.perf_counter()
+    hits = processor.cache.hits if processor.cache else 0
+    
+    try:
+        result, error = processor.process_pdf(path), None
+    except Exception as e:
+        result, error = None, str(e)
+    
+    return {
+        'path': path,
+        'result': result,
+        'error': error,
+        'elapsed': time.perf_counter() - start,
+        'cache_hit': bool(processor.cache and processor.cache.hits > hits)
+    }
 
 
 class PDFProcessor:
     """Processes PDF files to extract text and metadata"""
     
-    def __init__(self, chunk_size: int = 500, overlap: int = 50):
+    def __init__(self, chunk_size: int = 500, overlap: int = 50,
+                 workers: int = 1, parallel_min_pages: int = 8,
+                 cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = 512 * 1024 * 1024,
+                 chunk_strategy: str = 'words',
+                 deduplicator: Optional[ChunkDeduplicator] = None,
+                 drop_duplicates: bool = False,
+                 strip_headers: bool = True,
+                 header_sample_pages: int = 32,
+                 sandbox: Optional[SandboxedExtractor] = None,
+                 backend: Optional[str] = None,
+                 skip_textless_pages: bool = True,
+                 token_counter: Optional[TokenCounter] = None):
         """
         Initialize PDF processor
         
         Args:
             chunk_size: Number of words per chunk for LLM processing
             overlap: Number of words to overlap between chunks
+            workers: Worker processes for page extraction (1 = serial,
+                None = one per CPU core)
+            parallel_min_pages: Documents shorter than this are always
+                extracted serially (pool start-up costs more than it saves)
+            cache_dir: Directory for the extraction cache (None = no cache)
+            cache_max_bytes: Size cap for the extraction cache
+            chunk_strategy: 'words' for fixed word windows, 'sentences'
+                to cut chunks on sentence boundaries (chunk_size is then
+                the maximum number of words per chunk), or 'tokens' to
+                pack chunks up to a token budget (chunk_size and overlap
+                are then counted in tokens)
+            deduplicator: Near-duplicate detector run on each document's
+                chunks after chunking (None = no deduplication)
+            drop_duplicates: Drop near-duplicate chunks instead of
+                flagging them with duplicate_of
+            strip_headers: Remove lines repeated at the top/bottom of
+                pages (running headers, footers, page numbers)
+            header_sample_pages: Leading pages used to learn which lines
+                repeat
+            sandbox: Runs page extraction in worker processes with time
+                and memory limits; pages over budget are skipped and listed
+                in metadata['skipped_pages'] (None = extract in-process)
+            backend: Name of the text extraction backend (None =
+                $PDF_EXTRACTION_BACKEND, else PyPDF2); page counts come
+                from the backend, document info from PyPDF2 (defaults
+                when another backend reads a file PyPDF2 cannot parse)
+            skip_textless_pages: Pre-check each page's content streams and
+                skip extraction on pages with no text operators (scans,
+                blank pages); they are listed in metadata
+            token_counter: Batched, offline token counter (texts -> counts)
+                used by the 'tokens' strategy (None = estimate_tokens);
+                when given, every chunk gets a token_count
         """
+        if chunk_strategy not in CHUNK_STRATEGIES:
+            raise ValueError(f"Unknown chunk strategy: {chunk_strategy} "
+                             f"(expected one of {', '.join(CHUNK_STRATEGIES)})")
+        
         self.chunk_size = chunk_size
         self.overlap = overlap
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.parallel_min_pages = parallel_min_pages
+        self.cache = ExtractionCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.chunk_strategy = chunk_strategy
+        self.deduplicator = deduplicator
+        self.drop_duplicates = drop_duplicates
+        self.strip_headers = strip_headers
+        self.header_sample_pages = header_sample_pages
+        self.sandbox = sandbox
+        self.backend = get_backend(backend)
+        self.skip_textless_pages = skip_textless_pages
+        self.token_counter = token_counter or estimate_tokens
+        self.count_tokens = chunk_strategy == 'tokens' or token_counter is not None
     
     def extract_text_from_pdf(self, pdf_file_path: str) -> Tuple[str, Dict]:
         """
@@ -36,27 +189,9 @@ class PDFProcessor:
         """
         try:
             with open(pdf_file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Extract metadata
-                metadata = self._extract_metadata(pdf_reader)
-                
-                # Extract text from all pages
-                full_text = ""
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
-                    full_text += page_text + "\n\n"
-                
-                # Clean the extracted text
-                full_text = self._clean_text(full_text)
-                
-                # Add text statistics to metadata
-                metadata['page_count'] = len(pdf_reader.pages)
-                metadata['word_count'] = len(full_text.split())
-                metadata['char_count'] = len(full_text)
-                
-                return full_text, metadata
+                pdf_bytes = file.read()
+            
+            return self._extract_text(pdf_bytes)
                 
         except Exception as e:
             raise Exception(f"Error extracting PDF: {str(e)}")
@@ -72,38 +207,399 @@ class PDFProcessor:
             Tuple of (full_text, metadata_dict)
         """
         try:
-            pdf_file = io.BytesIO(pdf_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            return self._extract_text(pdf_bytes)
+            
+        except Exception as e:
+            raise Exception(f"Error extracting PDF from bytes: {str(e)}")
+    
+    def inspect(self, pdf_source: Union[str, bytes]) -> Dict:
+        """
+        Read page count, document info and file size without extracting text
+        
+        Only the trailer, the info dictionary and the root of the page tree
+        are parsed; files are read through a seekable handle rather than
+        loaded whole, so this stays fast on very long documents.
+        
+        Args:
+            pdf_source: Path to a PDF file or the PDF as bytes
+            
+        Returns:
+            Dictionary of metadata plus page_count and file_size
+        """
+        try:
+            if isinstance(pdf_source, (bytes, bytearray)):
+                return self._inspect_stream(io.BytesIO(pdf_source), len(pdf_source))
+            
+            with open(pdf_source, 'rb') as file:
+                metadata = self._inspect_stream(file, os.path.getsize(pdf_source))
+            metadata['filename'] = os.path.basename(pdf_source)
+            return metadata
+            
+        except Exception as e:
+            raise Exception(f"Error inspecting PDF: {str(e)}")
+    
+    def inspect_many(self, pdf_sources: Union[str, Iterable[str]],
+                     workers: Optional[int] = None) -> List[Dict]:
+        """
+        Inspect a directory (or list) of PDFs in parallel
+        
+        Args:
+            pdf_sources: Directory to scan for .pdf files, a single PDF
+                path, or a list of paths
+            workers: Worker processes (None = one per CPU core)
+            
+        Returns:
+            List of inspect() results in input order; files that fail
+            get a dict with 'path' and 'error' instead
+        """
+        if isinstance(pdf_sources, str):
+            if os.path.isdir(pdf_sources):
+                pdf_sources = sorted(
+                    os.path.join(pdf_sources, name) for name in os.listdir(pdf_sources)
+                    if name.lower().endswith('.pdf')
+                )
+            else:
+                # A lone path, not an iterable of one-character paths
+                pdf_sources = [pdf_sources]
+        paths = list(pdf_sources)
+        
+        if not paths:
+            return []
+        
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        if workers <= 1:
+            return [_inspect_path(path) for path in paths]
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_inspect_path, paths, chunksize=8))
+    
+    def _inspect_stream(self, stream, file_size: int) -> Dict:
+        """
+        Read metadata and page count from an open PDF stream
+        
+        Args:
+            stream: Seekable binary stream over the PDF
+            file_size: Size of the PDF in bytes
             
-            # Extract metadata
-            metadata = self._extract_metadata(pdf_reader)
+        Returns:
+            Dictionary of metadata plus page_count and file_size
+        """
+        pdf_reader = PyPDF2.PdfReader(stream)
+        metadata = self._extract_metadata(pdf_reader)
+        
+        # /Count on the page tree root avoids walking every page node
+        try:
+            page_count = int(pdf_reader.trailer['/Root']['/Pages']['/Count'])
+        except Exception:
+            page_count = len(pdf_reader.pages)
+        
+        metadata['page_count'] = page_count
+        metadata['file_size'] = file_size
+        
+        return metadata
+    
+    def iter_pages(self, pdf_source: Union[str, bytes]) -> Iterator[str]:
+        """
+        Stream cleaned page text, one page at a time
+        
+        Empty pages are yielded as empty strings so the position in the
+        stream always matches the page number. Headers and footers are
+        stripped per page after buffering only the first
+        header_sample_pages pages, so with iter_chunks() this is the
+        bounded-memory path.
+        
+        Args:
+            pdf_source: Path to a PDF file or the PDF as bytes
             
-            # Extract text from all pages
-            full_text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                page_text = page.extract_text()
-                full_text += page_text + "\n\n"
+        Yields:
+            Cleaned text of each page, in page order
+        """
+        pdf_reader, pdf_bytes = self._open_pdf(pdf_source)
+        
+        yield from self._iter_clean_pages(pdf_reader, pdf_bytes)
+    
+    def _iter_clean_pages(self, pdf_reader: Optional[PyPDF2.PdfReader], pdf_bytes: bytes,
+                          stripper: Optional[HeaderFooterStripper] = None,
+                          skipped: Optional[List[Dict]] = None,
+                          page_kinds: Optional[List[str]] = None) -> Iterator[str]:
+        """
+        Extract pages, strip repeated headers/footers, then clean each page
+        
+        The backend's document is opened once here; its page count sets
+        how many pages are yielded.
+        
+        Args:
+            pdf_reader: PyPDF2 reader over the document, used to pre-check
+                pages (None if PyPDF2 could not parse it, see _open_reader)
+            pdf_bytes: PDF file as bytes
+            stripper: Header/footer stripper to use (one is created when
+                strip_headers is enabled and none is given)
+            skipped: Optional list that receives pages the sandbox skipped
+            page_kinds: Optional list that receives each page's kind (see
+                _classify_pages)
             
-            # Clean the extracted text
-            full_text = self._clean_text(full_text)
+        Yields:
+            Cleaned text of each page, in page order
+        """
+        document = self._open_document(pdf_reader, pdf_bytes)
+        try:
+            page_count = self.backend.page_count(document)
+            kinds = self._classify_pages(pdf_reader, page_count)
+            if page_kinds is not None:
+                page_kinds[:] = kinds
+            textless = frozenset(i for i, kind in enumerate(kinds) if kind != PAGE_TEXT)
             
-            # Add text statistics to metadata
-            metadata['page_count'] = len(pdf_reader.pages)
-            metadata['word_count'] = len(full_text.split())
-            metadata['char_count'] = len(full_text)
+            page_texts = self._iter_page_texts(document, pdf_bytes, page_count,
+                                               skipped, textless)
             
-            return full_text, metadata
+            # Headers/footers are found from line structure, so this must run
+            # before cleaning flattens each page to a single line
+            if self.strip_headers:
+                stripper = stripper or HeaderFooterStripper()
+                page_texts = stripper.strip_pages(page_texts, self.header_sample_pages)
             
-        except Exception as e:
-            raise Exception(f"Error extracting PDF from bytes: {str(e)}")
+            for page_text in page_texts:
+                yield self._clean_text(page_text)
+        finally:
+            if document is not pdf_reader:
+                self.backend.close(document)
     
-    def _extract_metadata(self, pdf_reader: PyPDF2.PdfReader) -> Dict:
+    def _open_pdf(self, pdf_source: Union[str, bytes]) -> Tuple[Optional[PyPDF2.PdfReader], bytes]:
+        """
+        Open a PDF from a path or from bytes
+        
+        Args:
+            pdf_source: Path to a PDF file or the PDF as bytes
+            
+        Returns:
+            Tuple of (pdf_reader, pdf_bytes); see _open_reader
+        """
+        pdf_bytes = self._read_pdf_bytes(pdf_source)
+        
+        return self._open_reader(pdf_bytes), pdf_bytes
+    
+    def _open_reader(self, pdf_bytes: bytes) -> Optional[PyPDF2.PdfReader]:
+        """
+        Open the PyPDF2 reader used for document info and page pre-checks
+        
+        With another extraction backend, a file PyPDF2 cannot parse is
+        still extracted (with default info and no pre-check), so None is
+        returned instead of raising.
+        
+        Args:
+            pdf_bytes: PDF file as bytes
+            
+        Returns:
+            PdfReader, or None if PyPDF2 failed and is not the backend
+        """
+        try:
+            return PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        except Exception:
+            if self.backend.name == DEFAULT_BACKEND:
+                raise
+            return None
+    
+    def _open_document(self, pdf_reader: Optional[PyPDF2.PdfReader], pdf_bytes: bytes):
+        """
+        Open the document with the extraction backend
+        
+        Args:
+            pdf_reader: PyPDF2 reader over the same bytes, or None
+            pdf_bytes: PDF file as bytes
+            
+        Returns:
+            Backend document handle (close with backend.close unless it
+            is pdf_reader)
+        """
+        # The default backend's document is a PdfReader; reuse this one
+        if self.backend.name == DEFAULT_BACKEND and pdf_reader is not None:
+            return pdf_reader
+        
+        return self.backend.open(pdf_bytes)
+    
+    def _read_pdf_bytes(self, pdf_source: Union[str, bytes]) -> bytes:
+        """
+        Read a PDF from a path, or pass bytes through
+        
+        Args:
+            pdf_source: Path to a PDF file or the PDF as bytes
+            
+        Returns:
+            PDF file as bytes
+        """
+        if isinstance(pdf_source, (bytes, bytearray)):
+            return bytes(pdf_source)
+        
+        with open(pdf_source, 'rb') as file:
+            return file.read()
+    
+    def _extract_text(self, pdf_bytes: bytes) -> Tuple[str, Dict]:
+        """
+        Shared extraction path for files and uploaded bytes
+        
+        Returns the joined text, so memory grows with the document.
+        
+        Args:
+            pdf_bytes: PDF file as bytes
+            
+        Returns:
+            Tuple of (full_text, metadata_dict)
+        """
+        pdf_reader, pdf_bytes = self._open_pdf(pdf_bytes)
+        
+        # Extract metadata
+        metadata = self._extract_metadata(pdf_reader)
+        
+        # Extract and clean text page by page
+        stripper = HeaderFooterStripper()
+        skipped = []
+        page_kinds = []
+        page_texts = list(self._iter_clean_pages(pdf_reader, pdf_bytes, stripper,
+                                                 skipped, page_kinds))
+        full_text, _ = self._join_pages(page_texts)
+        
+        # Add text statistics to metadata (one page text per backend page)
+        metadata['page_count'] = len(page_texts)
+        metadata['word_count'] = sum(len(page_text.split()) for page_text in page_texts)
+        metadata['char_count'] = len(full_text)
+        metadata['header_footer_lines_removed'] = stripper.lines_removed
+        metadata['skipped_pages'] = skipped
+        metadata.update(self._page_kind_metadata(page_kinds))
+        
+        return full_text, metadata
+    
+    def _join_pages(self, page_texts: List[str]) -> Tuple[str, array]:
+        """
+        Join cleaned pages into the document text
+        
+        Args:
+            page_texts: Cleaned text of each page
+            
+        Returns:
+            Tuple of (full_text, page_starts) where page_starts holds the
+            character offset at which each page begins
+        """
+        page_starts = array('q')
+        offset = 0
+        
+        for page_text in page_texts:
+            page_starts.append(offset)
+            if page_text:
+                offset += len(page_text) + 1
+        
+        full_text = ' '.join(page_text for page_text in page_texts if page_text)
+        
+        return full_text, page_starts
+    
+    def _classify_pages(self, pdf_reader: Optional[PyPDF2.PdfReader],
+                        page_count: int) -> List[str]:
+        """
+        Classify every page as text, image-only or empty
+        
+        Args:
+            pdf_reader: PyPDF2 reader over the document, or None
+            page_count: Number of pages the extraction backend reports
+            
+        Returns:
+            One of PAGE_TEXT, PAGE_IMAGE_ONLY or PAGE_EMPTY per page (all
+            PAGE_TEXT when skip_textless_pages is disabled, or when
+            PyPDF2 cannot read the same pages as the backend)
+        """
+        if not self.skip_textless_pages or pdf_reader is None:
+            return [PAGE_TEXT] * page_count
+        
+        # PyPDF2's pages only line up with the backend's if the counts agree
+        try:
+            pages = pdf_reader.pages
+            matched = len(pages) == page_count
+        except Exception:
+            matched = False
+        if not matched:
+            return [PAGE_TEXT] * page_count
+        
+        return [classify_page(page) for page in pages]
+    
+    def _page_kind_metadata(self, page_kinds: List[str]) -> Dict:
+        """
+        Summarize page classification for the document metadata
+        
+        Args:
+            page_kinds: Result of _classify_pages
+            
+        Returns:
+            Dict with image_only_pages and empty_pages (1-based page
+            numbers) and needs_ocr (True if any page is image-only)
+        """
+        image_only_pages = [i + 1 for i, kind in enumerate(page_kinds) if kind == PAGE_IMAGE_ONLY]
+        
+        return {
+            'image_only_pages': image_only_pages,
+            'empty_pages': [i + 1 for i, kind in enumerate(page_kinds) if kind == PAGE_EMPTY],
+            'needs_ocr': bool(image_only_pages)
+        }
+    
+    def _iter_page_texts(self, document, pdf_bytes: bytes, page_count: int,
+                         skipped: Optional[List[Dict]] = None,
+                         textless: frozenset = frozenset()) -> Iterator[str]:
+        """
+        Extract raw text for every page, in page order
+        
+        Uses the sandbox when one is configured. Otherwise uses a process
+        pool when parallel mode is enabled and the document is long
+        enough; each worker opens its own copy of the document over the
+        bytes and extracts a contiguous page range.
+        
+        Args:
+            document: Backend document handle (see _open_document)
+            pdf_bytes: PDF file as bytes (for sandbox and parallel mode)
+            page_count: Number of pages in the document
+            skipped: Optional list that receives {'page', 'reason'} for
+                pages the sandbox skipped
+            textless: Page indices known to have no text; they are yielded
+                as '' without extraction
+            
+        Yields:
+            Raw text of each page
+        """
+        if len(textless) == page_count:
+            yield from [''] * page_count
+            return
+        
+        if self.sandbox:
+            yield from self.sandbox.iter_pages(pdf_bytes, page_count, skipped,
+                                               self.backend, textless)
+            return
+        
+        if self.workers <= 1 or page_count < self.parallel_min_pages:
+            for page_index in range(page_count):
+                if page_index in textless:
+                    yield ''
+                else:
+                    yield self.backend.page_text(document, page_index)
+            return
+        
+        # Split pages into a few ranges per worker so slow pages balance out
+        workers = min(self.workers, page_count)
+        range_size = max(1, -(-page_count // (workers * 4)))
+        ranges = [(start, min(start + range_size, page_count))
+                  for start in range(0, page_count, range_size)]
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_page_worker,
+                                 initargs=(pdf_bytes, self.backend)) as pool:
+            futures = [pool.submit(_extract_page_range, start, end, textless)
+                       for start, end in ranges]
+            
+            # Reassemble in submission (page) order
+            for future in futures:
+                yield from future.result()
+    
+    def _extract_metadata(self, pdf_reader: Optional[PyPDF2.PdfReader]) -> Dict:
         """
         Extract metadata from PDF
         
         Args:
-            pdf_reader: PyPDF2 reader object
+            pdf_reader: PyPDF2 reader object (None gives the defaults)
             
         Returns:
             Dictionary of metadata
@@ -164,7 +660,7 @@ class PDFProcessor:
     
     def _clean_text(self, text: str) -> str:
         """
-        Clean extracted text
+        Clean extracted text (one page at a time on the streaming path)
         
         Args:
             text: Raw extracted text
@@ -172,93 +668,428 @@ class PDFProcessor:
         Returns:
             Cleaned text
         """
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters that might cause issues
-        text = text.replace('\x00', '')
-        
-        # Strip leading/trailing whitespace
-        text = text.strip()
-        
-        return text
+        return clean_page_text(text)
     
-    def chunk_text(self, text: str) -> List[Dict]:
+    def chunk_text(self, text: str, page_starts: Optional[Iterable[int]] = None) -> ChunkBatch:
         """
         Split text into overlapping chunks for LLM processing
         
+        Word offsets are computed once; chunks are stored column by
+        column (see ChunkBatch) with their character and page spans.
+        
         Args:
             text: Full text to chunk
+            page_starts: Character offset where each page begins in text
+                (defaults to a single page)
             
         Returns:
-            List of chunk dictionaries with text and metadata
-        """
-        words = text.split()
-        chunks = []
-        
-        if len(words) == 0:
-            return chunks
-        
-        # Create overlapping chunks
-        start = 0
-        chunk_id = 0
-        
-        while start < len(words):
-            # Get chunk of words
-            end = start + self.chunk_size
-            chunk_words = words[start:end]
-            chunk_text = ' '.join(chunk_words)
-            
-            # Create chunk dictionary
-            chunk = {
-                'chunk_id': chunk_id,
-                'text': chunk_text,
-                'word_count': len(chunk_words),
-                'start_word': start,
-                'end_word': min(end, len(words))
-            }
+            ChunkBatch of chunks with text and metadata
+        """
+        return self._chunk_index(WordIndex(text, page_starts))
+    
+    def _chunk_index(self, index: WordIndex) -> ChunkBatch:
+        """
+        Create overlapping chunks over an indexed text
+        
+        Args:
+            index: Word offsets of the text to chunk
+            
+        Returns:
+            ChunkBatch of chunks
+        """
+        if self.chunk_strategy == 'tokens':
+            return self._pack_tokens(index)
+        
+        if self.chunk_strategy == 'sentences':
+            windows = sentence_windows(index, self.chunk_size, self.overlap)
+        else:
+            windows = word_windows(len(index), self.chunk_size, self.overlap)
+        
+        return self._count_chunk_tokens(index.batch(windows))
+    
+    def _chunk_pages(self, pages: Iterable[str]) -> Tuple[str, array, ChunkBatch, Dict]:
+        """
+        Chunk cleaned pages with word windows as they stream in
+        
+        Chunk spans come from iter_chunks, so no word index of the
+        document is built; the pages are kept only to join full_text.
+        
+        Args:
+            pages: Iterable of cleaned page texts
             
-            chunks.append(chunk)
+        Returns:
+            Tuple of (full_text, page_starts, chunks, stats) where stats
+            holds the counts iter_chunks computed
+        """
+        page_texts = []
+        stats = {}
+        
+        def kept_pages():
+            for page_text in pages:
+                page_texts.append(page_text)
+                yield page_text
+        
+        spans = [(chunk.start_word, chunk.end_word, chunk.start_char, chunk.end_char,
+                  chunk.start_page, chunk.end_page)
+                 for chunk in self.iter_chunks(kept_pages(), stats)]
+        full_text, page_starts = self._join_pages(page_texts)
+        del page_texts
+        
+        chunks = self._count_chunk_tokens(ChunkBatch.from_spans(full_text, spans))
+        
+        return full_text, page_starts, chunks, stats
+    
+    def _count_chunk_tokens(self, chunks: ChunkBatch) -> ChunkBatch:
+        """Add a token_count column when tokens are counted"""
+        if self.count_tokens:
+            chunks.set_column('token_count', self.token_counter(chunks.texts()))
+        
+        return chunks
+    
+    def _pack_tokens(self, index: WordIndex) -> ChunkBatch:
+        """
+        Pack chunks up to chunk_size tokens
+        
+        Each distinct word is counted once, in a single batch, and chunks
+        are packed from the per-word counts. The chunk texts are then
+        counted in one more batch; a tokenizer that counts words in
+        context differently can overflow, in which case the budget is
+        scaled down by the worst overflow and the chunks repacked.
+        
+        Args:
+            index: Word offsets of the text to chunk
             
-            # Move to next chunk with overlap
-            start = end - self.overlap
-            chunk_id += 1
+        Returns:
+            ChunkBatch of chunks, each with a token_count
+        """
+        words = [index.text[start:end] for start, end in zip(index.starts, index.ends)]
+        distinct = list(dict.fromkeys(words))
+        counts = dict(zip(distinct, self.token_counter(distinct)))
+        word_tokens = [counts[word] for word in words]
+        del words, distinct, counts
+        
+        budget = self.chunk_size
+        for _ in range(3):
+            chunks = index.batch(token_windows(word_tokens, budget, self.overlap))
+            token_counts = self.token_counter(chunks.texts())
             
-            # Prevent infinite loop if overlap >= chunk_size
-            if start <= chunk_id * (self.chunk_size - self.overlap):
-                start = chunk_id * (self.chunk_size - self.overlap)
+            # Single words over the budget cannot be split further
+            worst = max((count / self.chunk_size for words, count
+                         in zip(chunks.column('word_count'), token_counts) if words > 1),
+                        default=0)
+            if worst <= 1 or budget <= 1:
+                break
+            budget = max(1, int(budget / worst))
+        
+        chunks.set_column('token_count', token_counts)
         
         return chunks
     
+    def iter_chunks(self, pages: Iterable[str], stats: Optional[Dict] = None) -> Iterator[Chunk]:
+        """
+        Stream overlapping chunks from page text as it arrives
+        
+        Only the words of the chunk currently being filled are kept, so
+        memory depends on chunk_size rather than document size. The
+        overlap window carries across page boundaries. Chunks are the
+        same as chunk_text() gives for the joined pages.
+        
+        Args:
+            pages: Iterable of cleaned page texts (e.g. from iter_pages)
+            stats: Optional dict updated in place with page_count,
+                word_count, char_count and chunk_count as chunks stream
+            
+        Returns:
+            Iterator of chunks with text and metadata
+            
+        Raises:
+            ValueError: If the chunk strategy is not 'words'; sentence
+                cuts and token packing need the whole document's index
+        """
+        if self.chunk_strategy != 'words':
+            raise ValueError(f"Chunk strategy {self.chunk_strategy!r} cannot stream; "
+                             f"use chunk_text() or process_pdf()")
+        
+        return self._iter_word_chunks(pages, {} if stats is None else stats)
+    
+    def _iter_word_chunks(self, pages: Iterable[str], stats: Dict) -> Iterator[Chunk]:
+        """
+        Generator behind iter_chunks (word windows)
+        
+        Args:
+            pages: Iterable of cleaned page texts
+            stats: Dict updated in place with the running counts
+            
+        Yields:
+            Chunks with text and metadata
+        """
+        step = max(1, self.chunk_size - self.overlap)
+        stats.update(page_count=0, word_count=0, char_count=0, chunk_count=0)
+        
+        # Words from the current chunk start onwards, with their offsets and pages
+        window = deque()
+        window_starts = deque()
+        window_pages = deque()
+        window_start = 0      # Word index of window[0]
+        skip = 0              # Words to drop when overlap is negative
+        
+        for page_text in pages:
+            stats['page_count'] += 1
+            if not page_text:
+                continue
+            
+            # Pages are joined with a single space in full_text
+            if stats['char_count']:
+                stats['char_count'] += 1
+            page_offset = stats['char_count']
+            stats['char_count'] += len(page_text)
+            
+            for match in _WORD_RE.finditer(page_text):
+                stats['word_count'] += 1
+                if skip:
+                    skip -= 1
+                    continue
+                
+                window.append(match.group())
+                window_starts.append(page_offset + match.start())
+                window_pages.append(stats['page_count'])
+                if len(window) < self.chunk_size:
+                    continue
+                
+                yield self._make_chunk(stats['chunk_count'], window, window_starts,
+                                       window_pages, window_start)
+                stats['chunk_count'] += 1
+                
+                # Move to next chunk with overlap
+                dropped = min(step, len(window))
+                for _ in range(dropped):
+                    window.popleft()
+                    window_starts.popleft()
+                    window_pages.popleft()
+                skip = step - dropped
+                window_start += step
+        
+        # Flush the tail: every remaining start position gets a chunk
+        while window_start < stats['word_count']:
+            yield self._make_chunk(stats['chunk_count'], window, window_starts,
+                                   window_pages, window_start)
+            stats['chunk_count'] += 1
+            
+            for _ in range(min(step, len(window))):
+                window.popleft()
+                window_starts.popleft()
+                window_pages.popleft()
+            window_start += step
+    
+    def _make_chunk(self, chunk_id: int, window: deque, window_starts: deque,
+                    window_pages: deque, start: int) -> Chunk:
+        """
+        Build a chunk from the current word window
+        
+        Args:
+            chunk_id: Sequential chunk number
+            window: Words from the chunk start onwards
+            window_starts: Character offset of each word in the window
+            window_pages: Page number of each word in the window
+            start: Word index of the first word in the window
+            
+        Returns:
+            Chunk whose source is its own (already joined) text
+        """
+        word_count = min(self.chunk_size, len(window))
+        text = ' '.join(islice(window, word_count))
+        start_char = window_starts[0]
+        
+        return Chunk(chunk_id, start, start + word_count, start_char,
+                     start_char + len(text), window_pages[0],
+                     window_pages[word_count - 1], text, base=start_char)
+    
     def process_pdf(self, pdf_path: str) -> Dict:
         """
         Complete PDF processing: extract text, metadata, and create chunks
         
+        With the default word windows, pages stream from iter_pages'
+        extraction straight into iter_chunks, and counts are kept as they
+        go. The result still holds the joined text (for the cache and
+        text artifacts) and every chunk, so it grows with the document;
+        the sentence and token strategies also index every word. Only
+        iter_pages() feeding iter_chunks() (or ParquetCreator.write_chunks)
+        is bounded by chunk_size.
+        
         Args:
             pdf_path: Path to PDF file
             
         Returns:
             Dictionary containing text, metadata, and chunks
         """
-        # Extract text and metadata
-        full_text, metadata = self.extract_text_from_pdf(pdf_path)
+        try:
+            return self._process(pdf_path)
+        except Exception as e:
+            raise Exception(f"Error extracting PDF: {str(e)}")
+    
+    def process_pdf_bytes(self, pdf_bytes: bytes) -> Dict:
+        """
+        Complete PDF processing from bytes: extract text, metadata, and create chunks
         
-        # Create chunks
-        chunks = self.chunk_text(full_text)
+        Returns the whole document, like process_pdf.
         
-        # Add chunk count to metadata
-        metadata['chunk_count'] = len(chunks)
+        Args:
+            pdf_bytes: PDF file as bytes
+            
+        Returns:
+            Dictionary containing text, metadata, and chunks
+        """
+        try:
+            return self._process(pdf_bytes)
+        except Exception as e:
+            raise Exception(f"Error extracting PDF from bytes: {str(e)}")
+    
+    def process_many(self, pdf_paths: Iterable[str], workers: Optional[int] = None,
+                     ordered: bool = False) -> Iterator[Dict]:
+        """
+        Process many documents in a process pool, one document per task
         
-        return {
+        A failing file does not abort the batch; its error is reported in
+        its outcome instead.
+        
+        Args:
+            pdf_paths: Paths to PDF files
+            workers: Worker processes (None = one per CPU core)
+            ordered: Yield in input order instead of completion order
+            
+        Yields:
+            Dicts with path, result (process_pdf output or None),
+            error (message or None), elapsed seconds and cache_hit
+        """
+        paths = list(pdf_paths)
+        if not paths:
+            return
+        
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        if workers <= 1:
+            for path in paths:
+                yield _process_path(self, path)
+            return
+        
+        # Documents are the unit of parallelism, so workers extract pages
+        # serially; deduplication needs the shared index, so it runs here
+        worker_processor = copy.copy(self)
+        worker_processor.workers = 1
+        worker_processor.deduplicator = None
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_process_path, worker_processor, path) for path in paths]
+            
+            for future in (futures if ordered else as_completed(futures)):
+                outcome = future.result()
+                
+                # Cache counters live in the workers; mirror them here
+                if self.cache and outcome['error'] is None:
+                    if outcome['cache_hit']:
+                        self.cache.hits += 1
+                    else:
+                        self.cache.misses += 1
+                
+                if self.deduplicator and outcome['result']:
+                    self.deduplicate(outcome['result'], outcome['result']['metadata']['sha256'])
+                
+                yield outcome
+    
+    def _process(self, pdf_source: Union[str, bytes]) -> Dict:
+        """
+        Extract, clean and chunk a document
+        
+        Pages are cleaned as they stream in. The joined text is indexed
+        once and chunked into a ChunkBatch, so each chunk knows which
+        pages it spans and chunk texts share one buffer.
+        
+        Args:
+            pdf_source: Path to a PDF file or the PDF as bytes
+            
+        Returns:
+            Dictionary containing text, metadata, and chunks
+        """
+        pdf_bytes = self._read_pdf_bytes(pdf_source)
+        result = self._extract_and_chunk(pdf_bytes)
+        
+        # Deduplication depends on the corpus seen so far, so it runs
+        # after (and is never stored in) the extraction cache
+        if self.deduplicator:
+            self.deduplicate(result, result['metadata']['sha256'])
+        
+        return result
+    
+    def rechunk(self, full_text: str, page_starts: Iterable[int], metadata: Dict) -> Dict:
+        """
+        Chunk previously cleaned text with the current chunk settings
+        
+        Skips extraction entirely, so chunk_size, overlap or the chunk
+        strategy can be changed without touching the source PDFs.
+        
+        Args:
+            full_text: Cleaned document text (result['full_text'])
+            page_starts: Page start offsets (result['page_starts'])
+            metadata: Document metadata from the original processing
+            
+        Returns:
+            Dictionary containing text, metadata, and chunks, like process_pdf
+        """
+        chunks = self.chunk_text(full_text, page_starts)
+        
+        # Duplicate counts refer to the old chunks
+        metadata = {key: value for key, value in metadata.items()
+                    if key not in DUPLICATE_STAT_KEYS}
+        metadata['chunk_count'] = len(chunks)
+        result = {
             'full_text': full_text,
+            'page_starts': list(page_starts),
             'metadata': metadata,
             'chunks': chunks,
             'processing_timestamp': datetime.now().isoformat()
         }
+        
+        if self.deduplicator:
+            self.deduplicate(result, metadata['sha256'])
+        
+        return result
     
-    def process_pdf_bytes(self, pdf_bytes: bytes) -> Dict:
+    def deduplicate(self, result: Dict, doc_id: str) -> None:
         """
-        Complete PDF processing from bytes: extract text, metadata, and create chunks
+        Flag or drop near-duplicate chunks and record the counts
+        
+        process_pdf and rechunk do this themselves; it is public for
+        callers that chunk elsewhere (e.g. in worker processes) and
+        deduplicate in one place, in document order. Does nothing
+        without a deduplicator.
+        
+        Args:
+            result: Processing result (process_pdf or rechunk output),
+                updated in place
+            doc_id: Content hash identifying the document in the index
+        """
+        if self.deduplicator is None:
+            return
+        
+        kept, duplicate_stats = self.deduplicator.deduplicate(
+            doc_id, result['chunks'], drop=self.drop_duplicates)
+        
+        # Flagging writes duplicate_of through to the batch; dropping
+        # keeps only the returned rows
+        chunks = result['chunks']
+        if self.drop_duplicates:
+            chunks = chunks.take(chunk.row for chunk in kept)
+        
+        result['chunks'] = chunks
+        result['metadata'].update(duplicate_stats)
+        result['metadata']['chunk_count'] = len(chunks)
+    
+    def _extract_and_chunk(self, pdf_bytes: bytes) -> Dict:
+        """
+        Extract and chunk a document, going through the cache if enabled
+        
+        Word windows are cut as pages stream in (see _chunk_pages); the
+        sentence and token strategies join the pages first and index
+        every word.
         
         Args:
             pdf_bytes: PDF file as bytes
@@ -266,21 +1097,125 @@ class PDFProcessor:
         Returns:
             Dictionary containing text, metadata, and chunks
         """
-        # Extract text and metadata
-        full_text, metadata = self.extract_text_from_bytes(pdf_bytes)
+        # A cache hit skips extraction entirely
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(pdf_bytes, self._cache_settings())
+            entry = self.cache.get(cache_key)
+            if entry:
+                return self._result_from_cache(entry)
+        
+        pdf_reader = self._open_reader(pdf_bytes)
+        metadata = self._extract_metadata(pdf_reader)
+        metadata['sha256'] = hashlib.sha256(pdf_bytes).hexdigest()
         
-        # Create chunks
-        chunks = self.chunk_text(full_text)
+        stripper = HeaderFooterStripper()
+        skipped = []
+        page_kinds = []
+        pages = self._iter_clean_pages(pdf_reader, pdf_bytes, stripper, skipped, page_kinds)
         
-        # Add chunk count to metadata
+        if self.chunk_strategy == 'words':
+            full_text, page_starts, chunks, stats = self._chunk_pages(pages)
+            word_count = stats['word_count']
+        else:
+            full_text, page_starts = self._join_pages(list(pages))
+            index = WordIndex(full_text, page_starts)
+            chunks = self._chunk_index(index)
+            word_count = len(index)
+            del index
+        
+        # Add text statistics and chunk count to metadata (page_starts has
+        # one entry per page the backend reported)
+        metadata['page_count'] = len(page_starts)
+        metadata['word_count'] = word_count
+        metadata['char_count'] = len(full_text)
+        metadata['header_footer_lines_removed'] = stripper.lines_removed
+        metadata['skipped_pages'] = skipped
+        metadata.update(self._page_kind_metadata(page_kinds))
         metadata['chunk_count'] = len(chunks)
         
+        # Timeouts depend on load, so partial extractions are not cached
+        if cache_key and not skipped:
+            self.cache.put(cache_key, self._cache_entry(full_text, page_starts, metadata, chunks))
+        
         return {
             'full_text': full_text,
+            'page_starts': list(page_starts),
             'metadata': metadata,
             'chunks': chunks,
             'processing_timestamp': datetime.now().isoformat()
         }
+    
+    def _cache_settings(self) -> Dict:
+        """
+        Settings that change processing output, used in the cache key
+        
+        Returns:
+            Dict of output-affecting settings
+        """
+        return {
+            'chunk_size': self.chunk_size,
+            'overlap': self.overlap,
+            'chunk_strategy': self.chunk_strategy,
+            'token_counter': counter_name(self.token_counter) if self.count_tokens else None,
+            'backend': self.backend.name,
+            'skip_textless_pages': self.skip_textless_pages,
+            'strip_headers': self.strip_headers,
+            'header_sample_pages': self.header_sample_pages
+        }
+    
+    def _cache_entry(self, full_text: str, page_starts: array, metadata: Dict,
+                     chunks: ChunkBatch) -> Dict:
+        """
+        Build the compact cache entry for a processed document
+        
+        Chunks are stored as offset spans rather than text, followed by
+        the token count when tokens are counted.
+        
+        Args:
+            full_text: Cleaned document text
+            page_starts: Character offset at which each page begins
+            metadata: Document metadata
+            chunks: Chunks over full_text
+            
+        Returns:
+            JSON-serializable cache entry
+        """
+        columns = [chunks.column(name) for name in ('start_word', 'end_word', 'start_char',
+                                                    'end_char', 'start_page', 'end_page')]
+        if self.count_tokens:
+            columns.append(chunks.column('token_count'))
+        
+        return {
+            'full_text': full_text,
+            'page_starts': list(page_starts),
+            'metadata': metadata,
+            'chunks': [list(span) for span in zip(*columns)]
+        }
+    
+    def _result_from_cache(self, entry: Dict) -> Dict:
+        """
+        Rebuild a processing result from a cache entry
+        
+        Args:
+            entry: Entry stored by _cache_entry
+            
+        Returns:
+            Dictionary containing text, metadata, and chunks
+        """
+        full_text = entry['full_text']
+        chunks = ChunkBatch.from_spans(full_text, (span[:6] for span in entry['chunks']))
+        
+        if self.count_tokens:
+            chunks.set_column('token_count', (span[6] for span in entry['chunks']))
+        
+        return {
+            'full_text': full_text,
+            'page_starts': entry['page_starts'],
+            'metadata': entry['metadata'],
+            'chunks': chunks,
+            'processing_timestamp': datetime.now().isoformat()
+        }
 
 
 # Example usage and testing
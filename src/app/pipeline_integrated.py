@@ -1,23 +1,66 @@
-from src.app.gdrive_storage import GoogleDriveStorage
+from src.app.blob_storage import get_storage
 from src.app.pdf_processor import PDFProcessor
+from src.app.chunk_dedup import ChunkDeduplicator
+from src.app.corpus_dataset import CorpusDataset
+from src.app.extraction_sandbox import SandboxedExtractor
 from src.app.parquet_creator import ParquetCreator
+from src.app.text_artifacts import artifact_path, save_text_artifact
 from src.app.database import SessionLocal
 from src.app.models import Document
 from datetime import datetime
 import os
+import sys
+
+# Document column holding the Drive ID in each folder a move targets,
+# and the status the document reaches there
+MOVE_STAGES = {
+    'staging': ('gdrive_staging_id', "staged"),
+    'processing': ('gdrive_processing_id', "processing"),
+    'processed': ('gdrive_processed_id', "processed"),
+}
 
 class PDFPipeline:
     """
     Complete PDF processing pipeline
-    Integrates: Google Drive + PDF Processing + PostgreSQL
+    Integrates: Google Drive (or local storage) + PDF Processing + PostgreSQL
     """
     
-    def __init__(self):
-        self.storage = GoogleDriveStorage()
-        self.processor = PDFProcessor()
-        self.parquet_creator = ParquetCreator()
+    def __init__(self, storage=None):
+        """
+        Args:
+            storage: Storage backend to use (None = get_storage(), chosen
+                by $PDF_STORAGE_BACKEND)
+        """
+        # PDF_STORAGE_BACKEND=local keeps every stage on disk under
+        # PDF_LOCAL_STORAGE_ROOT (moves are renames, not API calls)
+        self.storage = storage or get_storage()
+        self.processor = PDFProcessor(
+            chunk_size=int(os.environ.get('PDF_CHUNK_SIZE', '500')),
+            overlap=int(os.environ.get('PDF_CHUNK_OVERLAP', '50')),
+            # 'tokens' packs chunks to a PDF_CHUNK_SIZE token budget
+            chunk_strategy=os.environ.get('PDF_CHUNK_STRATEGY', 'words'),
+            cache_dir=os.environ.get('PDF_CACHE_DIR', '.pdf_cache'),
+            deduplicator=ChunkDeduplicator(
+                os.environ.get('CHUNK_INDEX_PATH', '.chunk_index.sqlite')
+            ),
+            # Malformed PDFs must not stall the upload request
+            sandbox=SandboxedExtractor(
+                page_timeout=float(os.environ.get('PDF_PAGE_TIMEOUT', '30')),
+                document_timeout=float(os.environ.get('PDF_DOCUMENT_TIMEOUT', '300')),
+                max_rss_mb=int(os.environ.get('PDF_WORKER_MAX_RSS_MB', '1024')),
+                max_docs_per_worker=int(os.environ.get('PDF_WORKER_MAX_DOCS', '50'))
+            )
+        )
+        # PDF_OUTPUT_FORMATS, PDF_FEATHER_COMPRESSION and PDF_PARQUET_PROFILE
+        # (fast-write, small-on-drive for uploaded files, or fast-scan)
+        self.parquet_creator = ParquetCreator.from_env()
+        
+        # Optional corpus-wide dataset that downstream scans read instead
+        # of one small file per document
+        corpus_root = os.environ.get('PDF_CORPUS_DATASET')
+        self.corpus = CorpusDataset(corpus_root) if corpus_root else None
         
-        # Setup folders in Google Drive
+        # Setup pipeline folders
         self.storage.setup_pipeline_folders()
     
     def process_document(self, pdf_path: str, filename: str = None):
@@ -31,156 +74,288 @@ class PDFPipeline:
         Returns:
             Document object from database
         """
+        return self.process_documents([pdf_path], [filename], raise_errors=True)[0]
+    
+    def process_folder(self, directory):
+        """
+        Sweep a local directory: run every PDF in it through the pipeline
+        
+        The documents go through process_documents together, so each
+        folder move is one batch request for all of them.
+        
+        Args:
+            directory: Directory holding the PDF files
+            
+        Returns:
+            List of Document objects from database, in filename order
+        """
+        pdf_paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith('.pdf')
+        )
+        if not pdf_paths:
+            print(f"No PDF files in {directory}")
+            return []
+        
+        return self.process_documents(pdf_paths)
+    
+    def process_documents(self, pdf_paths, filenames=None, raise_errors=False):
+        """
+        Run several documents through the pipeline together
+        
+        Each folder move (steps 3, 4 and 8) is sent for all documents as
+        one Drive batch request. A document whose move or processing
+        fails is marked failed and the rest carry on.
+        
+        Args:
+            pdf_paths: Local paths to PDF files
+            filenames: Names to use (defaults to original filenames)
+            raise_errors: Re-raise a document's processing error instead
+                of continuing with the others
+            
+        Returns:
+            List of Document objects from database, in input order
+        """
         print("\n" + "=" * 70)
-        print("🚀 STARTING FULL PIPELINE")
+        print(f"🚀 STARTING FULL PIPELINE ({len(pdf_paths)} document(s))")
         print("=" * 70)
         
-        # Use original filename if not specified
-        if not filename:
-            filename = os.path.basename(pdf_path)
-        
-        file_size = os.path.getsize(pdf_path)
+        # Use original filenames if not specified
+        filenames = [name or os.path.basename(path)
+                     for path, name in zip(pdf_paths, filenames or [None] * len(pdf_paths))]
         
         # Database session
         db = SessionLocal()
+        docs = []
+        outputs = {}
         
         try:
-            # Step 1: Create Document record
-            print("\n📝 Step 1: Creating document record in PostgreSQL...")
-            doc = Document(
-                filename=filename,
-                file_size=file_size,
-                status="uploading"
-            )
-            db.add(doc)
-            db.commit()
-            db.refresh(doc)
-            print(f"✓ Document created (ID: {doc.id})")
-            
-            # Step 2: Upload to Google Drive (upload folder)
-            print("\n☁️  Step 2: Uploading to Google Drive (upload/)...")
-            upload_result = self.storage.upload_file(pdf_path, 'upload', filename)
+            # Step 1: Create Document records
+            print("\n📝 Step 1: Creating document records in PostgreSQL...")
+            for pdf_path, filename in zip(pdf_paths, filenames):
+                doc = Document(
+                    filename=filename,
+                    file_size=os.path.getsize(pdf_path),
+                    status="uploading"
+                )
+                db.add(doc)
+                db.commit()
+                db.refresh(doc)
+                docs.append(doc)
+                print(f"✓ Document created (ID: {doc.id})")
             
-            doc.gdrive_upload_id = upload_result['id']
-            doc.current_folder = 'upload'
-            doc.status = "uploaded"
-            db.commit()
-            print(f"✓ Uploaded (File ID: {upload_result['id']})")
+            # Step 2: Upload to storage (upload folder)
+            print(f"\n☁️  Step 2: Uploading to {self.storage.label} (upload/)...")
+            for doc, pdf_path in zip(docs, pdf_paths):
+                upload_result = self.storage.upload_file(pdf_path, 'upload', doc.filename)
+                
+                doc.gdrive_upload_id = upload_result['id']
+                doc.current_folder = 'upload'
+                doc.status = "uploaded"
+                db.commit()
+                print(f"✓ Uploaded (File ID: {upload_result['id']})")
             
             # Step 3: Move to staging
             print("\n📦 Step 3: Moving to staging...")
-            self.storage.move_file(doc.gdrive_upload_id, 'upload', 'staging')
-            
-            doc.gdrive_staging_id = doc.gdrive_upload_id  # Same file, new location
-            doc.current_folder = 'staging'
-            doc.status = "staged"
-            db.commit()
-            print(f"✓ Moved to staging")
+            self.move_documents(db, docs, 'upload', 'staging')
             
             # Step 4: Move to processing
             print("\n⚙️  Step 4: Moving to processing...")
-            self.storage.move_file(doc.gdrive_staging_id, 'staging', 'processing')
-            
-            doc.gdrive_processing_id = doc.gdrive_staging_id
-            doc.current_folder = 'processing'
-            doc.status = "processing"
-            db.commit()
-            print(f"✓ Moved to processing")
-            
-            # Step 5: Process PDF
-            print("\n🔧 Step 5: Processing PDF...")
-            result = self.processor.process_pdf(pdf_path, chunk_size=500)
-            
-            if not result:
-                doc.status = "failed"
-                db.commit()
-                print("✗ Processing failed!")
-                return doc
-            
-            # Update document with processing results
-            doc.page_count = result['page_count']
-            doc.word_count = result['word_count']
-            doc.chunk_count = result['chunk_count']
-            db.commit()
-            
-            # Step 6: Create Parquet file
-            print("\n📊 Step 6: Creating Parquet file...")
-            parquet_filename = filename.replace('.pdf', '.parquet').replace('.txt', '.parquet')
-            parquet_path = f"temp_{parquet_filename}"
-            
-            metadata = {
-                'document_id': doc.id,
-                'filename': filename,
-                'page_count': result['page_count'],
-                'word_count': result['word_count']
-            }
-            
-            success = self.parquet_creator.create_parquet(
-                result['chunks'],
-                parquet_path,
-                metadata
-            )
-            
-            if not success:
-                doc.status = "failed"
-                db.commit()
-                print("✗ Parquet creation failed!")
-                return doc
-            
-            # Step 7: Upload Parquet to Google Drive
-            print("\n☁️  Step 7: Uploading Parquet to Google Drive (parquet/)...")
-            parquet_result = self.storage.upload_file(
-                parquet_path,
-                'parquet',
-                parquet_filename
-            )
-            print(f"✓ Parquet uploaded (File ID: {parquet_result['id']})")
-            
-            # Clean up local parquet file
-            if os.path.exists(parquet_path):
-                os.remove(parquet_path)
+            self.move_documents(db, docs, 'staging', 'processing')
             
-            # Step 8: Move original PDF to processed
-            print("\n✅ Step 8: Moving PDF to processed...")
-            self.storage.move_file(doc.gdrive_processing_id, 'processing', 'processed')
+            # Steps 5-7: Process, write outputs and upload them; a document
+            # that fails is left out of the step 8 move, the rest carry on
+            for doc, pdf_path in zip(docs, pdf_paths):
+                if doc.status == "processing":
+                    try:
+                        outputs[doc.id] = self.publish_document(db, doc, pdf_path)
+                    except Exception as e:
+                        db.rollback()
+                        doc.status = "failed"
+                        db.commit()
+                        print(f"✗ {doc.filename}: processing failed: {e}")
+                        if raise_errors:
+                            raise
             
-            doc.gdrive_processed_id = doc.gdrive_processing_id
-            doc.current_folder = 'processed'
-            doc.status = "processed"
-            doc.processed_at = datetime.now()
-            db.commit()
-            print(f"✓ Moved to processed")
+            # Step 8: Move original PDFs to processed
+            print("\n✅ Step 8: Moving PDFs to processed...")
+            self.move_documents(db, docs, 'processing', 'processed')
             
-            # Final summary
-            print("\n" + "=" * 70)
-            print("✅ PIPELINE COMPLETE!")
-            print("=" * 70)
-            print(f"Document ID: {doc.id}")
-            print(f"Filename: {doc.filename}")
-            print(f"Status: {doc.status}")
-            print(f"Pages: {doc.page_count}")
-            print(f"Words: {doc.word_count}")
-            print(f"Chunks: {doc.chunk_count}")
-            print(f"Upload ID: {doc.gdrive_upload_id}")
-            print(f"Processed ID: {doc.gdrive_processed_id}")
-            print(f"Parquet ID: {parquet_result['id']}")
-            print(f"Current folder: {doc.current_folder}")
-            print("\n📁 Check your Google Drive:")
-            print(f"  - processed/ folder: {filename}")
-            print(f"  - parquet/ folder: {parquet_filename}")
-            print("=" * 70)
+            for doc in docs:
+                self.print_summary(doc, outputs.get(doc.id))
             
-            return doc
+            return docs
             
         except Exception as e:
             print(f"\n✗ Pipeline error: {e}")
-            if doc:
-                doc.status = "failed"
-                db.commit()
+            for doc in docs:
+                if doc.status != "processed":
+                    doc.status = "failed"
+            db.commit()
             raise
             
         finally:
             db.close()
+    
+    def move_documents(self, db, docs, source_folder, target_folder):
+        """
+        Move every document still in source_folder with one batch request
+        
+        Args:
+            db: Database session
+            docs: Document objects (failed ones are skipped)
+            source_folder: Folder the files are in
+            target_folder: Folder to move them to
+        """
+        moving = [doc for doc in docs
+                  if doc.current_folder == source_folder and doc.status != "failed"]
+        if not moving:
+            return
+        
+        batch = self.storage.batch()
+        for doc in moving:
+            batch.move_file(doc.gdrive_upload_id, source_folder, target_folder)
+        
+        id_column, status = MOVE_STAGES[target_folder]
+        for doc, item in zip(moving, batch.execute()):
+            if item['error']:
+                doc.status = "failed"
+                print(f"✗ {doc.filename}: move to {target_folder}/ failed: {item['error']}")
+                continue
+            
+            setattr(doc, id_column, doc.gdrive_upload_id)  # Same file, new location
+            doc.current_folder = target_folder
+            doc.status = status
+            if target_folder == 'processed':
+                doc.processed_at = datetime.now()
+            print(f"✓ Moved {doc.filename} to {target_folder}")
+        
+        db.commit()
+    
+    def publish_document(self, db, doc, pdf_path):
+        """
+        Steps 5-7 for one document: process it, write its outputs and
+        upload them to the parquet/ folder
+        
+        Args:
+            db: Database session
+            doc: Document in the processing folder
+            pdf_path: Local path to PDF file
+            
+        Returns:
+            dict with the uploaded 'names' and 'ids', or None if it failed
+        """
+        filename = doc.filename
+        
+        # Step 5: Process PDF
+        print("\n🔧 Step 5: Processing PDF...")
+        result = self.processor.process_pdf(pdf_path)
+        
+        if not result:
+            doc.status = "failed"
+            db.commit()
+            print("✗ Processing failed!")
+            return None
+        
+        # Update document with processing results
+        doc.page_count = result['metadata']['page_count']
+        doc.word_count = result['metadata']['word_count']
+        doc.chunk_count = result['metadata']['chunk_count']
+        doc.needs_ocr = result['metadata']['needs_ocr']
+        db.commit()
+        
+        if doc.needs_ocr:
+            print(f"⚠️  Image-only page(s) need OCR: "
+                  f"{', '.join(map(str, result['metadata']['image_only_pages']))}")
+        
+        skipped_pages = result['metadata']['skipped_pages']
+        if skipped_pages:
+            print(f"⚠️  Skipped {len(skipped_pages)} page(s): "
+                  f"{', '.join(str(page['page']) for page in skipped_pages)}")
+        
+        # Step 6: Create Parquet file
+        print("\n📊 Step 6: Creating Parquet file...")
+        parquet_filename = filename.replace('.pdf', '.parquet').replace('.txt', '.parquet')
+        parquet_path = f"temp_{parquet_filename}"
+        
+        metadata = {
+            'document_id': doc.id,
+            'filename': filename,
+            'page_count': result['metadata']['page_count'],
+            'word_count': result['metadata']['word_count'],
+            'duplicate_chunk_count': result['metadata']['duplicate_chunk_count'],
+            'skipped_page_count': len(result['metadata']['skipped_pages'])
+        }
+        
+        success = self.parquet_creator.create_parquet(
+            result['chunks'],
+            parquet_path,
+            metadata
+        )
+        
+        if not success:
+            doc.status = "failed"
+            db.commit()
+            print("✗ Parquet creation failed!")
+            return None
+        
+        # Keep the cleaned text so the corpus can be rechunked without the PDFs
+        text_path = artifact_path(parquet_path)
+        text_filename = artifact_path(parquet_filename)
+        text_size = save_text_artifact(text_path, result, metadata)
+        print(f"✓ Text artifact created: {text_path} ({text_size} bytes)")
+        
+        if self.corpus:
+            corpus_path = self.corpus.append(result['chunks'], metadata)
+            print(f"✓ Appended to corpus dataset: {corpus_path}")
+        
+        # Step 7: Upload Parquet (and/or Arrow IPC) to storage
+        print(f"\n☁️  Step 7: Uploading Parquet to {self.storage.label} (parquet/)...")
+        output_paths = self.parquet_creator.output_paths(parquet_path)
+        output_ids = []
+        for output_path in output_paths:
+            output_result = self.storage.upload_file(
+                output_path,
+                'parquet',
+                output_path[len('temp_'):]
+            )
+            output_ids.append(output_result['id'])
+            print(f"✓ {output_path[len('temp_'):]} uploaded (File ID: {output_result['id']})")
+        
+        text_result = self.storage.upload_file(text_path, 'parquet', text_filename)
+        print(f"✓ Text artifact uploaded (File ID: {text_result['id']})")
+        
+        # Clean up local output and text files
+        for local_path in (*output_paths, text_path):
+            if os.path.exists(local_path):
+                os.remove(local_path)
+        
+        return {
+            'names': [output_path[len('temp_'):] for output_path in output_paths] + [text_filename],
+            'ids': output_ids + [text_result['id']]
+        }
+    
+    def print_summary(self, doc, outputs):
+        """Print the final state of one document"""
+        print("\n" + "=" * 70)
+        print("✅ PIPELINE COMPLETE!" if doc.status == "processed" else "✗ PIPELINE FAILED")
+        print("=" * 70)
+        print(f"Document ID: {doc.id}")
+        print(f"Filename: {doc.filename}")
+        print(f"Status: {doc.status}")
+        print(f"Pages: {doc.page_count}")
+        print(f"Words: {doc.word_count}")
+        print(f"Chunks: {doc.chunk_count}")
+        print(f"Upload ID: {doc.gdrive_upload_id}")
+        print(f"Processed ID: {doc.gdrive_processed_id}")
+        if outputs:
+            print(f"Output ID(s): {', '.join(outputs['ids'])}")
+        print(f"Current folder: {doc.current_folder}")
+        if doc.status == "processed":
+            print(f"\n📁 Check your {self.storage.label}:")
+            print(f"  - processed/ folder: {doc.filename}")
+            print(f"  - parquet/ folder: {', '.join(outputs['names'])}")
+        print("=" * 70)
 
 
 def test_full_pipeline():
@@ -242,4 +417,8 @@ def test_full_pipeline():
     print(f"Document {doc.id} processed successfully!")
 
 if __name__ == "__main__":
-    test_full_pipeline()
\ No newline at end of file
+    # python -m src.app.pipeline_integrated [directory of PDFs]
+    if len(sys.argv) > 1:
+        PDFPipeline().process_folder(sys.argv[1])
+    else:
+        test_full_pipeline()
\ No newline at end of file
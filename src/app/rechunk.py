@@ -0,0 +1,251 @@
+"""
+Rechunk Module
+Regenerates chunk Parquet files from stored text artifacts, without the PDFs
+
+Usage (from the repository root):
+
+    python -m src.app.rechunk corpus_dir --chunk-size 300 --overlap 30
+"""
+
+import argparse
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from src.app.chunk_dedup import ChunkDeduplicator
+from src.app.chunking import CHUNK_STRATEGIES
+from src.app.parquet_creator import ParquetCreator
+from src.app.pdf_processor import PDFProcessor
+from src.app.text_artifacts import is_artifact, load_text_artifact, parquet_path_for
+
+
+# Per-worker processor, set up once by _init_rechunk_worker
+_worker_processor = None
+
+
+def _init_rechunk_worker(processor: PDFProcessor):
+    """Give each worker its processor"""
+    global _worker_processor
+    _worker_processor = processor
+
+
+def _rechunk_text(processor: PDFProcessor, path: str) -> Dict:
+    """
+    Load an artifact and chunk its text, capturing errors per file
+
+    This is the part that runs in workers; nothing is written.
+
+    Returns:
+        Dict with path, result (PDFProcessor.rechunk output or None),
+        the artifact's metadata and document, error and elapsed seconds
+    """
+    start = time.perf_counter()
+    try:
+        artifact = load_text_artifact(path)
+        result = processor.rechunk(artifact['full_text'], artifact['page_starts'],
+                                   artifact['metadata'])
+        outcome = {'result': result, 'metadata': artifact['metadata'],
+                   'document': artifact['document'], 'error': None}
+    except Exception as e:
+        outcome = {'result': None, 'error': str(e)}
+
+    outcome.update(path=path, elapsed=time.perf_counter() - start)
+    return outcome
+
+
+def _rechunk_path(path: str) -> Dict:
+    """Chunk one artifact in a worker"""
+    return _rechunk_text(_worker_processor, path)
+
+
+def _finish_rechunk(outcome: Dict, parquet_creator: ParquetCreator,
+                    dedup_processor: Optional[PDFProcessor] = None) -> Dict:
+    """
+    Deduplicate and write one rechunked artifact
+
+    Args:
+        outcome: _rechunk_text() output
+        parquet_creator: Writes the chunk file(s)
+        dedup_processor: Processor whose deduplicator flags duplicates (None = skip)
+
+    Returns:
+        Dict with path, parquet_path, chunk_count (None on failure),
+        error (message or None) and elapsed seconds
+    """
+    start = time.perf_counter()
+    parquet_path = parquet_path_for(outcome['path'])
+    chunk_count, error = None, outcome['error']
+
+    if error is None:
+        try:
+            result = outcome['result']
+            if dedup_processor:
+                dedup_processor.deduplicate(result, result['metadata']['sha256'])
+
+            # Document columns that came from the document metadata are
+            # refreshed; ones the new result lacks are dropped
+            stale = set(outcome['metadata']) - set(result['metadata'])
+            document = {key: result['metadata'].get(key, value)
+                        for key, value in outcome['document'].items() if key not in stale}
+
+            if not parquet_creator.create_parquet(result['chunks'], parquet_path, document):
+                raise Exception(f"Could not write {parquet_path}")
+
+            chunk_count = len(result['chunks'])
+        except Exception as e:
+            error = str(e)
+
+    return {
+        'path': outcome['path'],
+        'parquet_path': parquet_path,
+        'chunk_count': chunk_count,
+        'error': error,
+        'elapsed': outcome['elapsed'] + time.perf_counter() - start
+    }
+
+
+def find_artifacts(directory: str) -> List[str]:
+    """
+    Find every text artifact under a directory
+
+    Args:
+        directory: Corpus directory (searched recursively)
+
+    Returns:
+        Sorted artifact paths
+    """
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names if is_artifact(name)
+    )
+
+
+def rechunk_artifact(processor: PDFProcessor, path: str,
+                     parquet_creator: Optional[ParquetCreator] = None) -> Dict:
+    """
+    Rebuild the chunk file(s) for one text artifact
+
+    Document columns that came from the document metadata are refreshed;
+    duplicate counts are dropped unless the processor deduplicates.
+
+    Args:
+        processor: Processor carrying the new chunk settings
+        path: Artifact path; the Parquet file next to it is overwritten
+        parquet_creator: Output formats and write profile (None = defaults)
+
+    Returns:
+        Dict with path, parquet_path, chunk_count (None on failure),
+        error (message or None) and elapsed seconds
+    """
+    # rechunk() deduplicates itself when the processor has a deduplicator
+    return _finish_rechunk(_rechunk_text(processor, path), parquet_creator or ParquetCreator())
+
+
+def rechunk_corpus(directory: str, processor: PDFProcessor, workers: Optional[int] = None,
+                   dedup_index: Optional[str] = None,
+                   parquet_creator: Optional[ParquetCreator] = None) -> Iterator[Dict]:
+    """
+    Rebuild the chunk files of a whole corpus in parallel
+
+    Workers only load and chunk. Deduplication needs the shared index, so
+    it runs here in input order, like PDFProcessor.process_many: one
+    SQLite writer, and the same chunks are kept as originals on every run.
+
+    Args:
+        directory: Directory holding text artifacts (searched recursively)
+        processor: Processor carrying the new chunk settings
+        workers: Worker processes (None = one per CPU core)
+        dedup_index: SQLite deduplication index to re-run deduplication
+            against (None = no deduplication)
+        parquet_creator: Output formats and write profile, e.g. the
+            pipeline's (None = defaults)
+
+    Yields:
+        rechunk_artifact() outcomes, in input order
+    """
+    paths = find_artifacts(directory)
+    if not paths:
+        return
+
+    parquet_creator = parquet_creator or ParquetCreator()
+
+    worker_processor = copy.copy(processor)
+    worker_processor.deduplicator = None
+    worker_processor.sandbox = None
+
+    dedup_processor = None
+    if dedup_index:
+        dedup_processor = copy.copy(worker_processor)
+        dedup_processor.deduplicator = ChunkDeduplicator(dedup_index)
+
+    try:
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        if workers <= 1:
+            for path in paths:
+                yield _finish_rechunk(_rechunk_text(worker_processor, path),
+                                      parquet_creator, dedup_processor)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_rechunk_worker,
+                                 initargs=(worker_processor,)) as pool:
+            futures = [pool.submit(_rechunk_path, path) for path in paths]
+            for future in futures:
+                yield _finish_rechunk(future.result(), parquet_creator, dedup_processor)
+    finally:
+        if dedup_processor:
+            dedup_processor.deduplicator.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Regenerate chunk Parquet files from cleaned-text artifacts")
+    parser.add_argument('directory', help="Directory holding *.text.json.zst artifacts")
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help="Words per chunk (tokens with --strategy tokens)")
+    parser.add_argument('--overlap', type=int, default=50,
+                        help="Words of overlap (tokens with --strategy tokens)")
+    parser.add_argument('--strategy', choices=CHUNK_STRATEGIES, default='words')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per CPU core)")
+    parser.add_argument('--dedup-index',
+                        help="SQLite deduplication index to re-run deduplication against")
+    args = parser.parse_args()
+
+    # Same output formats and write profile as the pipeline
+    parquet_creator = ParquetCreator.from_env()
+
+    processor = PDFProcessor(chunk_size=args.chunk_size, overlap=args.overlap,
+                             chunk_strategy=args.strategy)
+
+    print("=" * 60)
+    print("RECHUNK CORPUS")
+    print("=" * 60)
+    print(f"\n📁 {args.directory}: chunk_size={args.chunk_size}, "
+          f"overlap={args.overlap}, strategy={args.strategy}, "
+          f"formats={','.join(parquet_creator.output_formats)}, "
+          f"profile={parquet_creator.write_profile}")
+
+    start = time.perf_counter()
+    done, errors, chunks = 0, [], 0
+    for outcome in rechunk_corpus(args.directory, processor, args.workers, args.dedup_index,
+                                  parquet_creator):
+        if outcome['error']:
+            errors.append(outcome)
+            print(f"❌ {outcome['path']}: {outcome['error']}")
+            continue
+        done += 1
+        chunks += outcome['chunk_count']
+        print(f"✓ {outcome['parquet_path']}: {outcome['chunk_count']} chunks "
+              f"({outcome['elapsed']:.2f}s)")
+    elapsed = time.perf_counter() - start
+
+    print(f"\n🎉 Rechunked {done} document(s) into {chunks} chunks in {elapsed:.2f}s")
+    if errors:
+        print(f"⚠️  {len(errors)} artifact(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from src.app.chunk_dedup import ChunkDeduplicator
+from src.app.pdf_processor import PDFProcessor
+import random
+
+def make_text(seed, words=300):
+    """Generate reproducible pseudo-random text"""
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+def test_chunk_dedup():
+    """Test near-duplicate detection within and across documents"""
+    print("=" * 60)
+    print("Chunk Deduplication Test")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=300, overlap=0)
+    deduplicator = ChunkDeduplicator()
+    
+    boilerplate = make_text("license")
+    
+    # 1. First document: unique text, the boilerplate, then a lightly edited copy
+    print("\n1. Deduplicating first document...")
+    edited = boilerplate.split()
+    edited[10] = "changed"
+    doc_a = " ".join([make_text("a1"), boilerplate, " ".join(edited)])
+    chunks, stats = deduplicator.deduplicate("doc-a", processor.chunk_text(doc_a))
+    print(f"✓ {stats}")
+    
+    assert stats['duplicate_chunks_within_doc'] == 1
+    assert [chunk['duplicate_of'] for chunk in chunks] == [None, None, "doc-a:1"]
+    
+    # 2. Second document repeats the boilerplate
+    print("\n2. Deduplicating second document...")
+    doc_b = " ".join([boilerplate, make_text("b1")])
+    chunks, stats = deduplicator.deduplicate("doc-b", processor.chunk_text(doc_b), drop=True)
+    print(f"✓ {stats}")
+    
+    assert stats['duplicate_chunks_cross_doc'] == 1
+    assert [chunk['chunk_id'] for chunk in chunks] == [1]
+    
+    # 3. Re-running a document must not match its own earlier entries
+    print("\n3. Re-running first document...")
+    _, stats = deduplicator.deduplicate("doc-a", processor.chunk_text(doc_a))
+    print(f"✓ {stats}")
+    
+    assert stats['duplicate_chunk_count'] == 1
+    
+    print("\n" + "=" * 60)
+    print("✓ All deduplication tests passed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_chunk_dedup()
@@ -0,0 +1,309 @@
+from src.app.gdrive_storage import GoogleDriveStorage
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from googleapiclient.discovery import build
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.app import pipeline_integrated
+from src.app.database import Base
+from src.app.models import Document
+import PyPDF2
+import httplib2
+import json
+import os
+import re
+import tempfile
+import threading
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "1706.03762v7.pdf")
+
+class LoopbackHttp(httplib2.Http):
+    """
+    Http that talks plain HTTP to the fake
+    The client keeps https:// on media upload URLs when only the endpoint's host is overridden
+    """
+
+    def request(self, uri, *args, **kwargs):
+        return super().request(uri.replace('https://', 'http://', 1), *args, **kwargs)
+
+class FakeDrive:
+    """
+    In-memory stand-in for the Drive v3 HTTP endpoint
+    Serves files.list, files.create (with resumable media uploads),
+    files.update and /batch/drive/v3
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.next_id = 1
+        self.http_requests = []
+        # File IDs whose batch parts get no response part
+        self.unanswered = set()
+        # Resumable upload sessions: session ID -> file metadata
+        self.uploads = {}
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add(self, name, parents=(), folder=False):
+        """Create a file directly, returning its ID"""
+        file_id = f"id{self.next_id}"
+        self.next_id += 1
+        self.files[file_id] = {
+            'id': file_id,
+            'name': name,
+            'parents': list(parents),
+            'mimeType': 'application/vnd.google-apps.folder' if folder else 'text/plain'
+        }
+        return file_id
+
+    def call(self, method, target, body):
+        """Run one API call, returning (status, response dict)"""
+        url = urlsplit(target)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path.split('/drive/v3/', 1)[-1]
+
+        if method == 'GET' and path == 'files':
+            name = re.search(r"name='([^']*)'", params['q']).group(1)
+            matches = [{'id': f['id'], 'name': f['name']} for f in self.files.values()
+                       if f['name'] == name and f['mimeType'].endswith('folder')]
+            return 200, {'files': matches}
+
+        if method == 'POST' and path == 'files':
+            metadata = json.loads(body)
+            file_id = self.add(metadata['name'], metadata.get('parents', ()),
+                               metadata.get('mimeType', '').endswith('folder'))
+            return 200, {'id': file_id, 'name': metadata['name']}
+
+        if method == 'PATCH' and path.startswith('files/'):
+            file = self.files.get(path[len('files/'):])
+            if file is None:
+                return 404, {'error': {'code': 404, 'message': 'File not found'}}
+            file['parents'] = [parent for parent in file['parents']
+                               if parent != params.get('removeParents')]
+            file['parents'].append(params['addParents'])
+            return 200, {'id': file['id'], 'name': file['name'], 'parents': file['parents']}
+
+        return 400, {'error': {'code': 400, 'message': f"Unsupported {method} {path}"}}
+
+    def upload(self, method, target, body):
+        """
+        Run one step of a resumable upload, returning (status, response dict, headers)
+        The POST opens a session for the metadata; the PUT to it carries the bytes
+        """
+        if method == 'POST':
+            session = f"session{len(self.http_requests)}"
+            self.uploads[session] = json.loads(body)
+            return 200, {}, {'Location': f"{self.url}/upload/session/{session}"}
+
+        metadata = self.uploads.pop(urlsplit(target).path.rsplit('/', 1)[-1])
+        file_id = self.add(metadata['name'], metadata.get('parents', ()))
+        return 200, {'id': file_id, 'name': metadata['name'], 'size': str(len(body))}, {}
+
+    def batch(self, content_type, body):
+        """Answer a multipart/mixed batch the way Drive does"""
+        message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        boundary = 'batch_fake'
+        parts = []
+        for part in message.get_payload():
+            request = part.get_payload(decode=False)
+            head, _, part_body = request.partition('\r\n\r\n') if '\r\n\r\n' in request \
+                else request.partition('\n\n')
+            method, target, _ = head.splitlines()[0].split(' ', 2)
+            if any(f"/files/{file_id}?" in target for file_id in self.unanswered):
+                continue
+            status, response = self.call(method, target, part_body)
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'].strip('<>')}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(response)}\r\n"
+            )
+        payload = "".join(parts) + f"--{boundary}--\r\n"
+        return f"multipart/mixed; boundary={boundary}", payload.encode()
+
+    def handler(self):
+        drive = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def respond(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                drive.http_requests.append(self.path)
+                headers = {}
+                if self.path.startswith('/batch/'):
+                    content_type, payload = drive.batch(self.headers['Content-Type'], body)
+                    status = 200
+                elif self.path.startswith('/upload/'):
+                    status, response, headers = drive.upload(self.command, self.path, body)
+                    content_type, payload = 'application/json', json.dumps(response).encode()
+                else:
+                    status, response = drive.call(self.command, self.path, body)
+                    content_type, payload = 'application/json', json.dumps(response).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_PUT = respond
+
+        return Handler
+
+    def storage(self):
+        """GoogleDriveStorage pointed at this fake"""
+        service = build('drive', 'v3', http=LoopbackHttp(), static_discovery=True,
+                        client_options={'api_endpoint': f"{self.url}/drive/v3/"})
+        return GoogleDriveStorage(service=service, batch_uri=f"{self.url}/batch/drive/v3")
+
+def test_drive_batch():
+    """Test batched folder lookups and moves against a fake Drive endpoint"""
+    print("=" * 60)
+    print("Drive Batch Request Test")
+    print("=" * 60)
+
+    drive = FakeDrive()
+    try:
+        storage = drive.storage()
+        existing = {name: drive.add(name, folder=True) for name in ('upload', 'staging')}
+
+        # 1. Five folder lookups in one batch, then creates for the missing ones
+        print("\n1. Setting up pipeline folders...")
+        folder_ids = storage.setup_pipeline_folders()
+
+        assert folder_ids['upload'] == existing['upload']
+        assert set(folder_ids) == {'upload', 'staging', 'processing', 'processed', 'parquet'}
+        assert drive.http_requests[0] == '/batch/drive/v3'
+        assert len(drive.http_requests) == 4  # one batch + three creates
+
+        # 2. Moves of several files share one round trip, with per-item errors
+        print("\n2. Moving files in one batch...")
+        file_ids = [drive.add(f"doc{i}.pdf", [folder_ids['upload']]) for i in range(3)]
+        del drive.http_requests[:]
+
+        batch = storage.batch()
+        for file_id in file_ids:
+            batch.move_file(file_id, 'upload', 'staging')
+        batch.move_file('missing', 'upload', 'staging')
+        results = batch.execute()
+
+        assert drive.http_requests == ['/batch/drive/v3']
+        assert len(batch) == 0
+        assert [item['result']['id'] for item in results[:3]] == file_ids
+        assert all(drive.files[file_id]['parents'] == [folder_ids['staging']] for file_id in file_ids)
+        assert results[3]['result'] is None
+        assert results[3]['error'].resp.status == 404
+        print(f"✓ Per-item error: {results[3]['error'].resp.status}")
+
+        # 3. A part missing from Drive's reply is reported as an error
+        print("\n3. Batch reply missing a part...")
+        drive.unanswered.add(file_ids[1])
+        batch = storage.batch()
+        batch.move_file(file_ids[0], 'staging', 'upload')
+        batch.move_file(file_ids[1], 'staging', 'upload')
+        results = batch.execute()
+        drive.unanswered.clear()
+
+        assert len(results) == 2
+        assert all(item['result'] is None for item in results)
+        assert all(isinstance(item['error'], RuntimeError) for item in results)
+        print(f"✓ Unanswered call: {results[1]['error']}")
+
+        # 4. Unbatched calls still work against the same endpoint
+        print("\n4. Single move...")
+        moved = storage.move_file(file_ids[2], 'staging', 'processing')
+        assert moved['parents'] == [folder_ids['processing']]
+    finally:
+        drive.server.shutdown()
+        drive.server.server_close()
+
+    print("\n" + "=" * 60)
+    print("✓ All drive batch tests passed!")
+    print("=" * 60)
+
+def test_pipeline_batches():
+    """Test that the pipeline moves several documents with one batch per stage"""
+    print("=" * 60)
+    print("Pipeline Batch Test")
+    print("=" * 60)
+
+    drive = FakeDrive()
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_local = pipeline_integrated.SessionLocal
+    pipeline_integrated.SessionLocal = sessionmaker(bind=engine)
+    cwd = os.getcwd()
+    pipeline = None
+
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            # Outputs and caches are written to the working directory
+            os.chdir(root)
+
+            # 1. Three short PDFs and one that is not a PDF at all
+            print("\n1. Sweeping a folder of documents...")
+            pages = PyPDF2.PdfReader(SAMPLE_PDF).pages
+            for i in range(3):
+                writer = PyPDF2.PdfWriter()
+                writer.add_page(pages[i])
+                with open(f"doc{i}.pdf", 'wb') as f:
+                    writer.write(f)
+            with open("broken.pdf", 'w') as f:
+                f.write("not a PDF")
+
+            pipeline = pipeline_integrated.PDFPipeline(storage=drive.storage())
+            folder_ids = pipeline.storage.folder_ids
+            del drive.http_requests[:]
+
+            docs = pipeline.process_folder(root)
+
+            # Uploads go one by one; every move is batched, one request per stage
+            assert [doc.filename for doc in docs] == ['broken.pdf', 'doc0.pdf', 'doc1.pdf', 'doc2.pdf']
+            assert [doc.status for doc in docs] == ['failed', 'processed', 'processed', 'processed']
+            assert drive.http_requests.count('/batch/drive/v3') == 3
+            assert all(path.startswith(('/batch/', '/upload/')) for path in drive.http_requests)
+            assert drive.files[docs[0].gdrive_upload_id]['parents'] == [folder_ids['processing']]
+            assert all(drive.files[doc.gdrive_upload_id]['parents'] == [folder_ids['processed']]
+                       for doc in docs[1:])
+            print(f"✓ {len(docs)} documents, {len(drive.http_requests)} HTTP requests")
+
+            # 2. A failed move fails only its own document
+            print("\n2. Batched move with a missing file...")
+            db = pipeline_integrated.SessionLocal()
+            try:
+                docs = (db.query(Document).filter(Document.status == "processed")
+                        .order_by(Document.id).all())
+                del drive.files[docs[0].gdrive_upload_id]
+                del drive.http_requests[:]
+
+                pipeline.move_documents(db, docs, 'processed', 'staging')
+
+                assert drive.http_requests == ['/batch/drive/v3']
+                assert [doc.status for doc in docs] == ['failed', 'staged', 'staged']
+                assert [doc.current_folder for doc in docs] == ['processed', 'staging', 'staging']
+            finally:
+                db.close()
+    finally:
+        os.chdir(cwd)
+        pipeline_integrated.SessionLocal = session_local
+        if pipeline:
+            pipeline.processor.sandbox.close()
+        drive.server.shutdown()
+        drive.server.server_close()
+
+    print("\n" + "=" * 60)
+    print("✓ All pipeline batch tests passed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_drive_batch()
+    test_pipeline_batches()
@@ -0,0 +1,81 @@
+from src.app.blob_storage import get_storage
+from src.app.local_storage import LocalStorage
+import tempfile
+import os
+
+def test_local_storage():
+    """Test the LocalStorage backend through the storage interface"""
+    print("=" * 60)
+    print("LocalStorage Backend Test")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as root:
+        storage = get_storage('local', root=root)
+        assert isinstance(storage, LocalStorage)
+
+        # 1. Setup folders
+        print("\n1. Setting up pipeline folders...")
+        folder_ids = storage.setup_pipeline_folders()
+        assert all(os.path.isdir(path) for path in folder_ids.values())
+
+        # 2. Upload a file
+        print("\n2. Uploading to upload/ folder...")
+        source = os.path.join(root, 'source.txt')
+        with open(source, 'w') as f:
+            f.write("This is a test PDF for the pipeline!")
+        file_info = storage.upload_file(source, 'upload', 'test_document.txt')
+        file_id = file_info['id']
+
+        assert file_info['name'] == 'test_document.txt'
+        assert file_info['size'] == str(os.path.getsize(source))
+
+        # 3. Moves keep the file ID and the inode (a rename, not a copy)
+        print("\n3. Moving through pipeline stages...")
+        inode = os.stat(os.path.join(folder_ids['upload'], f"{file_id}_test_document.txt")).st_ino
+        for source_folder, target_folder in (('upload', 'staging'), ('staging', 'processing'),
+                                             ('processing', 'processed')):
+            moved = storage.move_file(file_id, source_folder, target_folder)
+            assert moved['id'] == file_id
+
+        assert [f['name'] for f in storage.list_files_in_folder('upload')] == []
+        processed = storage.list_files_in_folder('processed')
+        assert [(f['id'], f['name']) for f in processed] == [(file_id, 'test_document.txt')]
+        assert os.stat(os.path.join(folder_ids['processed'],
+                                    f"{file_id}_test_document.txt")).st_ino == inode
+
+        # 4. Batched moves report errors per item
+        print("\n4. Batched moves...")
+        batch = storage.batch()
+        batch.move_file(file_id, 'processed', 'staging')
+        batch.move_file('missing', 'processed', 'staging')
+        results = batch.execute()
+        assert results[0]['result']['parents'] == ['staging']
+        assert isinstance(results[1]['error'], FileNotFoundError)
+
+        # 5. Download
+        print("\n5. Downloading...")
+        destination = os.path.join(root, 'downloaded.txt')
+        assert storage.download_file(file_id, destination)
+        with open(destination) as f:
+            assert f.read() == "This is a test PDF for the pipeline!"
+        assert not storage.download_file('missing', destination)
+
+        # 6. A folder on another filesystem (here a symlink into /dev/shm)
+        # still takes moves, by copy-and-delete
+        print("\n6. Moving across filesystems...")
+        if os.path.isdir('/dev/shm') and os.stat('/dev/shm').st_dev != os.stat(root).st_dev:
+            with tempfile.TemporaryDirectory(dir='/dev/shm') as other:
+                os.symlink(other, os.path.join(root, 'archive'))
+                moved = storage.move_file(file_id, 'staging', 'archive')
+                assert moved['parents'] == ['archive']
+                assert [f['id'] for f in storage.list_files_in_folder('archive')] == [file_id]
+                assert storage.list_files_in_folder('staging') == []
+        else:
+            print("   (skipped: no second filesystem)")
+
+    print("\n" + "=" * 60)
+    print("✓ All local storage tests passed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    test_local_storage()
@@ -4,8 +4,35 @@ Run this to verify PDF processing works
 """
 
 import sys
+import io
+import json
 import os
-from pdf_processor import PDFProcessor
+import tempfile
+import time
+from datetime import date
+import PyPDF2
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pdf_processor import ChunkBatch, PDFProcessor
+from parquet_creator import (
+    DOCUMENT_METADATA_KEY, WRITE_PROFILES, ParquetCreator, StreamingParquetWriter, chunk_schema,
+    feather_path, resolve_write_profile
+)
+from header_footer import HeaderFooterStripper
+from extraction_sandbox import SandboxedExtractor
+from extraction_backends import (
+    BACKEND_ENV_VAR, ExtractionBackend, PyPDF2Backend, available_backends, get_backend
+)
+from corpus_dataset import COMPACTION_JOURNAL_FILE, CorpusDataset
+from rechunk import rechunk_corpus
+from text_artifacts import artifact_path, load_text_artifact, save_text_artifact
+from token_counting import estimate_tokens
+from view_parquet import iter_chunk_rows, view_parquet_file
+
+
+# Bundled arXiv papers at the repository root
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SAMPLE_PDF = os.path.join(REPO_ROOT, "1706.03762v7.pdf")
 
 
 def test_pdf_extraction():
@@ -125,6 +152,1072 @@ def test_text_chunking():
     return True
 
 
+def test_parallel_extraction():
+    """Parallel page extraction must match the serial path exactly"""
+    
+    print("\n" + "=" * 60)
+    print("PARALLEL EXTRACTION TEST")
+    print("=" * 60)
+    
+    serial = PDFProcessor()
+    parallel = PDFProcessor(workers=2, parallel_min_pages=1)
+    
+    serial_text, serial_metadata = serial.extract_text_from_pdf(SAMPLE_PDF)
+    parallel_text, parallel_metadata = parallel.extract_text_from_pdf(SAMPLE_PDF)
+    
+    print(f"  Pages: {serial_metadata['page_count']}")
+    print(f"  Words: {serial_metadata['word_count']}")
+    
+    assert parallel_text == serial_text
+    assert parallel_metadata == serial_metadata
+    
+    print("\n✓ Parallel extraction matches serial output!")
+
+
+def test_streaming_chunks():
+    """Streaming chunks must carry the overlap across page boundaries"""
+    
+    print("\n" + "=" * 60)
+    print("STREAMING CHUNKING TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=50, overlap=10)
+    
+    # Pages of uneven length, including an empty (e.g. scanned) page
+    pages = [
+        " ".join(f"p{page}w{i}" for i in range(length))
+        for page, length in enumerate([37, 0, 81, 12, 64])
+    ]
+    full_text, page_starts = processor._join_pages(pages)
+    
+    stats = {}
+    streamed = list(processor.iter_chunks(pages, stats))
+    expected = processor.chunk_text(full_text, page_starts)
+    
+    print(f"  Pages: {stats['page_count']}")
+    print(f"  Words: {stats['word_count']}")
+    print(f"  Chunks: {stats['chunk_count']}")
+    
+    assert streamed == list(expected)
+    assert stats['word_count'] == len(full_text.split())
+    assert stats['char_count'] == len(full_text)
+    assert stats['chunk_count'] == len(expected)
+    
+    # Sentence cuts and token packing need the whole text, so they refuse
+    # to stream rather than silently fall back to word windows
+    for strategy in ('sentences', 'tokens'):
+        try:
+            PDFProcessor(chunk_strategy=strategy).iter_chunks(pages)
+            assert False, f"{strategy} chunks streamed"
+        except ValueError:
+            pass
+    
+    print("\n✓ Streaming chunks match whole-text chunking!")
+
+
+def test_chunk_offsets():
+    """Chunks are offset slices of the source text and map back to pages"""
+    
+    print("\n" + "=" * 60)
+    print("CHUNK OFFSETS TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=20, overlap=5)
+    
+    pages = ["alpha " * 15, "", "beta " * 30, "gamma " * 10]
+    pages = [page.strip() for page in pages]
+    full_text, page_starts = processor._join_pages(pages)
+    
+    chunks = processor.chunk_text(full_text, page_starts)
+    words = full_text.split()
+    
+    for chunk in chunks:
+        print(f"  Chunk {chunk['chunk_id']}: words {chunk['start_word']}-{chunk['end_word']}, "
+              f"pages {chunk['start_page']}-{chunk['end_page']}")
+        assert chunk['text'] == full_text[chunk['start_char']:chunk['end_char']]
+        assert chunk['text'] == " ".join(words[chunk['start_word']:chunk['end_word']])
+    
+    # First chunk spans the first page into the third (page 2 is empty)
+    assert (chunks[0]['start_page'], chunks[0]['end_page']) == (1, 3)
+    assert chunks[-1]['end_page'] == 4
+    assert "text" in dict(chunks[0])
+    
+    print("\n✓ Chunk offsets and page spans are consistent!")
+
+
+def test_extraction_cache():
+    """A cache hit returns the same result without re-extracting"""
+    
+    print("\n" + "=" * 60)
+    print("EXTRACTION CACHE TEST")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        processor = PDFProcessor(cache_dir=cache_dir)
+        
+        first = processor.process_pdf(SAMPLE_PDF)
+        second = processor.process_pdf(SAMPLE_PDF)
+        stats = processor.cache.stats()
+        
+        print(f"  Hits: {stats['hits']}, Misses: {stats['misses']}")
+        print(f"  Entries: {stats['entries']} ({stats['bytes']} bytes)")
+        
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        assert second['full_text'] == first['full_text']
+        assert second['metadata'] == first['metadata']
+        assert [dict(chunk) for chunk in second['chunks']] == [dict(chunk) for chunk in first['chunks']]
+        
+        # Different settings must not share an entry
+        PDFProcessor(chunk_size=100, cache_dir=cache_dir).process_pdf(SAMPLE_PDF)
+        assert processor.cache.stats()['entries'] == 2
+        
+        # A tiny cap evicts everything but the newest entry
+        small = PDFProcessor(chunk_size=200, cache_dir=cache_dir,
+                             cache_max_bytes=int(stats['bytes'] * 1.5))
+        small.process_pdf(SAMPLE_PDF)
+        assert small.cache.stats()['entries'] == 1
+        assert small.cache.evictions == 2
+    
+    print("\n✓ Extraction cache works!")
+
+
+def test_inspect():
+    """Metadata-only inspection agrees with full extraction"""
+    
+    print("\n" + "=" * 60)
+    print("INSPECT TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor()
+    
+    info = processor.inspect(SAMPLE_PDF)
+    _, metadata = processor.extract_text_from_pdf(SAMPLE_PDF)
+    
+    print(f"  Pages: {info['page_count']}")
+    print(f"  Size: {info['file_size']} bytes")
+    
+    assert info['page_count'] == metadata['page_count']
+    assert info['file_size'] == os.path.getsize(SAMPLE_PDF)
+    assert info['producer'] == metadata['producer']
+    
+    # Batch form captures per-file errors instead of aborting
+    results = processor.inspect_many([SAMPLE_PDF, __file__], workers=1)
+    assert results[0]['page_count'] == info['page_count']
+    assert 'error' in results[1]
+    
+    # A single path is one file, not a sequence of characters
+    results = processor.inspect_many(SAMPLE_PDF, workers=1)
+    assert len(results) == 1
+    assert results[0]['page_count'] == info['page_count']
+    
+    print("\n✓ Inspection works!")
+
+
+def test_process_many():
+    """Batch processing yields every file and captures per-file errors"""
+    
+    print("\n" + "=" * 60)
+    print("BATCH PROCESSING TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor()
+    paths = [SAMPLE_PDF, "missing_document.pdf"]
+    
+    outcomes = list(processor.process_many(paths, workers=2, ordered=True))
+    
+    for outcome in outcomes:
+        status = outcome['error'] or f"{outcome['result']['metadata']['chunk_count']} chunks"
+        print(f"  {os.path.basename(outcome['path'])}: {status} ({outcome['elapsed']:.2f}s)")
+    
+    assert [outcome['path'] for outcome in outcomes] == paths
+    assert outcomes[0]['error'] is None
+    assert outcomes[0]['result']['full_text'] == processor.process_pdf(SAMPLE_PDF)['full_text']
+    assert outcomes[1]['result'] is None and outcomes[1]['error']
+    
+    print("\n✓ Batch processing works!")
+
+
+def test_sentence_chunking():
+    """Sentence strategy cuts on sentence ends and never exceeds chunk_size"""
+    
+    print("\n" + "=" * 60)
+    print("SENTENCE CHUNKING TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=40, overlap=8, chunk_strategy='sentences')
+    
+    sentences = [
+        " ".join(["word"] * length).capitalize() + "."
+        for length in [7, 12, 5, 18, 9, 14, 6, 11, 20, 8, 13, 10] * 3
+    ]
+    text = " ".join(sentences)
+    
+    chunks = processor.chunk_text(text)
+    
+    for chunk in chunks[:5]:
+        print(f"  Chunk {chunk['chunk_id']}: {chunk['word_count']} words, "
+              f"words {chunk['start_word']}-{chunk['end_word']}")
+    
+    words = text.split()
+    # Word indices at which a sentence starts
+    boundaries = [0] + [i + 1 for i, word in enumerate(words) if word.endswith(".")]
+    
+    assert chunks[0]['start_word'] == 0
+    assert chunks[-1]['end_word'] == len(words)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # The next chunk starts at the first sentence inside the overlap,
+        # or exactly overlap words back when no sentence starts there
+        end = previous['end_word']
+        inside = [b for b in boundaries if end - processor.overlap <= b < end]
+        expected_start = inside[0] if inside else end - processor.overlap
+        assert chunk['start_word'] == expected_start
+        assert 0 < end - chunk['start_word'] <= processor.overlap
+    assert any(previous['end_word'] - chunk['start_word'] == processor.overlap
+               for previous, chunk in zip(chunks, chunks[1:]))
+    for chunk in chunks:
+        assert chunk['word_count'] <= processor.chunk_size
+        assert chunk['text'].endswith(".")
+    
+    print(f"\n✓ {len(chunks)} sentence-aligned chunks created!")
+
+
+def test_header_footer_stripping():
+    """Repeated page headers, footers and page numbers are removed"""
+    
+    print("\n" + "=" * 60)
+    print("HEADER/FOOTER STRIPPING TEST")
+    print("=" * 60)
+    
+    topics = ["apples", "rivers", "engines", "music", "glaciers", "bridges"]
+    pages = [
+        f"Journal of Examples, Vol. 3\nBody text of page {n} talks about {topic}.\n"
+        f"The {topic} section ends here.\nPage {n} of 6"
+        for n, topic in enumerate(topics, 1)
+    ]
+    
+    stripper = HeaderFooterStripper()
+    stripped = list(stripper.strip_pages(pages))
+    
+    print(f"  Lines removed: {stripper.lines_removed}")
+    print(f"  First page: {stripped[0]!r}")
+    
+    assert stripper.lines_removed == 12
+    for n, page in enumerate(stripped, 1):
+        assert "Journal of Examples" not in page
+        assert f"Page {n} of 6" not in page
+        assert f"Body text of page {n}" in page
+    
+    # Page numbers are the last line of most pages in the sample paper
+    result = PDFProcessor().process_pdf(SAMPLE_PDF)
+    unstripped = PDFProcessor(strip_headers=False).process_pdf(SAMPLE_PDF)
+    print(f"  Sample PDF words: {unstripped['metadata']['word_count']} -> "
+          f"{result['metadata']['word_count']}")
+    assert result['metadata']['header_footer_lines_removed'] > 0
+    assert result['metadata']['word_count'] < unstripped['metadata']['word_count']
+    
+    print("\n✓ Header/footer stripping works!")
+
+
+def test_sandboxed_extraction():
+    """Pages over the time or memory budget are skipped, the rest returned"""
+    
+    print("\n" + "=" * 60)
+    print("SANDBOXED EXTRACTION TEST")
+    print("=" * 60)
+    
+    expected = PDFProcessor(strip_headers=False).process_pdf(SAMPLE_PDF)
+    
+    # Worker memory is read from /proc; without it only the time limit applies
+    measure_rss = os.path.exists("/proc/self/statm")
+    max_rss_mb = 1024
+    if measure_rss:
+        with open("/proc/self/statm") as statm:
+            parent_rss_mb = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 2**20
+        max_rss_mb = parent_rss_mb + 200
+    
+    # The backend goes to the workers with each document, so this works
+    # whatever the start method: page 3 hangs and page 6 balloons
+    sandbox = SandboxedExtractor(page_timeout=2, document_timeout=60,
+                                 max_rss_mb=max_rss_mb, max_docs_per_worker=2)
+    processor = PDFProcessor(strip_headers=False, sandbox=sandbox)
+    processor.backend = _MisbehavingBackend(hang_page=2, balloon_page=5 if measure_rss else None,
+                                            balloon_mb=max_rss_mb + 16)
+    
+    start = time.perf_counter()
+    result = processor.process_pdf(SAMPLE_PDF)
+    elapsed = time.perf_counter() - start
+    
+    print(f"  Skipped: {result['metadata']['skipped_pages']} ({elapsed:.1f}s)")
+    
+    skipped = [{'page': 3, 'reason': 'timeout'}]
+    if measure_rss:
+        skipped.append({'page': 6, 'reason': 'memory'})
+    else:
+        print("  (memory limit not checked: no /proc)")
+    assert result['metadata']['skipped_pages'] == skipped
+    assert elapsed < 20
+    assert result['metadata']['page_count'] == expected['metadata']['page_count']
+    assert "Introduction" in result['full_text']
+    assert "Attention Visualizations" in result['full_text']
+    assert "Figure 1: The Transformer" not in result['full_text']
+    
+    # With the plain backend the sandbox matches in-process extraction,
+    # and workers are retired after max_docs_per_worker documents
+    sandbox.close()
+    processor.backend = get_backend('pypdf2')
+    for _ in range(2):
+        clean = processor.process_pdf(SAMPLE_PDF)
+        assert clean['full_text'] == expected['full_text']
+        assert clean['metadata']['skipped_pages'] == []
+    assert len(sandbox._idle) == 0
+    sandbox.close()
+    
+    print("\n✓ Sandboxed extraction works!")
+
+
+class _MisbehavingBackend(PyPDF2Backend):
+    """PyPDF2 extraction with one page that hangs and one that balloons in memory"""
+    
+    name = 'misbehaving'
+    
+    def __init__(self, hang_page: int, balloon_page: int = None, balloon_mb: int = 0):
+        self.hang_page = hang_page
+        self.balloon_page = balloon_page
+        self.balloon_mb = balloon_mb
+    
+    def page_text(self, document, page_index: int) -> str:
+        if page_index == self.hang_page:
+            time.sleep(10)
+        if page_index == self.balloon_page:
+            ballast = bytearray(self.balloon_mb * 1024 * 1024)
+            time.sleep(10)
+        return super().page_text(document, page_index)
+
+
+def test_sandbox_early_close():
+    """A worker left mid-document is not reused for the next document"""
+    
+    print("\n" + "=" * 60)
+    print("SANDBOX EARLY CLOSE TEST")
+    print("=" * 60)
+    
+    backend = get_backend('pypdf2')
+    documents = []
+    for path in (SAMPLE_PDF, os.path.join(REPO_ROOT, "2005.11401v4.pdf")):
+        with open(path, 'rb') as f:
+            pdf_bytes = f.read()
+        reader = backend.open(pdf_bytes)
+        pages = [backend.page_text(reader, i) for i in range(backend.page_count(reader))]
+        documents.append((pdf_bytes, pages))
+    
+    sandbox = SandboxedExtractor(page_timeout=10, document_timeout=60)
+    try:
+        # Stop reading the first document after one page
+        (first_bytes, first_pages), (second_bytes, second_pages) = documents
+        pages = sandbox.iter_pages(first_bytes, len(first_pages), backend=backend)
+        assert next(pages) == first_pages[0]
+        pages.close()
+        assert len(sandbox._idle) == 0
+        
+        second = list(sandbox.iter_pages(second_bytes, len(second_pages), backend=backend))
+        print(f"  Second document: {len(second)} pages")
+        assert second == second_pages
+        assert len(sandbox._idle) == 1
+    finally:
+        sandbox.close()
+    
+    print("\n✓ Early close discards the worker!")
+
+
+def test_extraction_backends():
+    """Every installed backend extracts the sample; selection by name or env"""
+    
+    print("\n" + "=" * 60)
+    print("EXTRACTION BACKENDS TEST")
+    print("=" * 60)
+    
+    names = available_backends()
+    assert 'pypdf2' in names
+    assert PDFProcessor().backend.name == 'pypdf2'
+    
+    try:
+        get_backend('no-such-backend')
+        assert False, "unknown backend accepted"
+    except ValueError:
+        pass
+    
+    os.environ[BACKEND_ENV_VAR] = names[-1]
+    try:
+        assert PDFProcessor().backend.name == names[-1]
+    finally:
+        del os.environ[BACKEND_ENV_VAR]
+    
+    expected = PDFProcessor().process_pdf(SAMPLE_PDF)
+    for name in names:
+        serial = PDFProcessor(backend=name).process_pdf(SAMPLE_PDF)
+        parallel = PDFProcessor(backend=name, workers=2, parallel_min_pages=1).process_pdf(SAMPLE_PDF)
+        print(f"  {name}: {serial['metadata']['word_count']} words")
+        
+        assert serial['metadata']['page_count'] == expected['metadata']['page_count']
+        assert "Attention Is All You Need" in serial['full_text']
+        assert parallel['full_text'] == serial['full_text']
+    
+    # Page counts come from the backend, even where PyPDF2 disagrees...
+    processor = PDFProcessor()
+    processor.backend = _FirstPagesBackend()
+    result = processor.process_pdf(SAMPLE_PDF)
+    assert result['metadata']['page_count'] == len(result['page_starts']) == 2
+    assert max(result['chunks'].column('end_page')) == 2
+    assert result['metadata']['title'] == expected['metadata']['title']
+    
+    # ...or cannot parse the file at all (document info falls back to defaults)
+    processor = PDFProcessor()
+    processor.backend = _PlainTextBackend()
+    result = processor.process_pdf_bytes(b"First page.\fSecond page.\f\fFourth page.")
+    assert result['metadata']['page_count'] == 4
+    assert result['metadata']['title'] == 'Unknown'
+    assert result['full_text'] == "First page. Second page. Fourth page."
+    assert result['chunks'][0]['end_page'] == 4
+    
+    try:
+        PDFProcessor().process_pdf_bytes(b"First page.")
+        assert False, "PyPDF2 backend accepted a non-PDF"
+    except Exception:
+        pass
+    
+    print(f"\n✓ {len(names)} backend(s) work!")
+
+
+class _FirstPagesBackend(PyPDF2Backend):
+    """PyPDF2 extraction that only sees the first two pages"""
+    
+    name = 'first-pages'
+    
+    def page_count(self, document) -> int:
+        return 2
+
+
+class _PlainTextBackend(ExtractionBackend):
+    """Reads form-feed separated plain text, which PyPDF2 cannot parse"""
+    
+    name = 'plain-text'
+    
+    def open(self, pdf_bytes: bytes):
+        return pdf_bytes.decode('utf-8').split('\f')
+    
+    def page_count(self, document) -> int:
+        return len(document)
+    
+    def page_text(self, document, page_index: int) -> str:
+        return document[page_index]
+
+
+def _pdf_with_textless_pages(text_pages: int) -> bytes:
+    """Sample pages followed by a blank page and a scanned-image page"""
+    from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+    
+    writer = PyPDF2.PdfWriter()
+    for page in PyPDF2.PdfReader(SAMPLE_PDF).pages[:text_pages]:
+        writer.add_page(page)
+    writer.add_blank_page(612, 792)
+    
+    image = DecodedStreamObject()
+    image.set_data(b'\x80' * 64)
+    image.update({
+        NameObject('/Type'): NameObject('/XObject'),
+        NameObject('/Subtype'): NameObject('/Image'),
+        NameObject('/Width'): NumberObject(8),
+        NameObject('/Height'): NumberObject(8),
+        NameObject('/ColorSpace'): NameObject('/DeviceGray'),
+        NameObject('/BitsPerComponent'): NumberObject(8)
+    })
+    content = DecodedStreamObject()
+    content.set_data(b'q 612 0 0 792 0 0 cm /Im0 Do Q')
+    
+    page = PyPDF2.PageObject.create_blank_page(width=612, height=792)
+    page[NameObject('/Contents')] = writer._add_object(content)
+    page[NameObject('/Resources')] = DictionaryObject({
+        NameObject('/XObject'): DictionaryObject({NameObject('/Im0'): writer._add_object(image)})
+    })
+    writer.add_page(page)
+    
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def test_textless_pages():
+    """Image-only and empty pages are skipped without extraction and reported"""
+    
+    print("\n" + "=" * 60)
+    print("TEXTLESS PAGE TEST")
+    print("=" * 60)
+    
+    pdf_bytes = _pdf_with_textless_pages(3)
+    
+    calls = []
+    original_extract = PyPDF2.PageObject.extract_text
+    
+    def counting_extract(page, *args, **kwargs):
+        calls.append(page)
+        return original_extract(page, *args, **kwargs)
+    
+    PyPDF2.PageObject.extract_text = counting_extract
+    try:
+        result = PDFProcessor().process_pdf_bytes(pdf_bytes)
+    finally:
+        PyPDF2.PageObject.extract_text = original_extract
+    
+    metadata = result['metadata']
+    print(f"  Extracted pages: {len(calls)} of {metadata['page_count']}")
+    print(f"  Empty: {metadata['empty_pages']}, image-only: {metadata['image_only_pages']}")
+    
+    assert len(calls) == 3
+    assert metadata['page_count'] == 5
+    assert metadata['empty_pages'] == [4]
+    assert metadata['image_only_pages'] == [5]
+    assert metadata['needs_ocr'] is True
+    
+    unchecked = PDFProcessor(skip_textless_pages=False).process_pdf_bytes(pdf_bytes)
+    assert result['full_text'] == unchecked['full_text']
+    assert unchecked['metadata']['needs_ocr'] is False
+    
+    # A document that is all scans has no text, but is flagged for OCR
+    scans = PDFProcessor().process_pdf_bytes(_pdf_with_textless_pages(0))
+    assert scans['metadata']['word_count'] == 0 and len(scans['chunks']) == 0
+    assert scans['metadata']['needs_ocr'] is True
+    
+    # Text pages are never mistaken for textless ones
+    sample = PDFProcessor().process_pdf(SAMPLE_PDF)['metadata']
+    assert sample['empty_pages'] == [] and sample['image_only_pages'] == []
+    assert sample['needs_ocr'] is False
+    
+    print("\n✓ Textless pages skipped!")
+
+
+def test_rechunk_from_artifacts():
+    """Rechunking stored text matches processing the PDF with the new settings"""
+    
+    print("\n" + "=" * 60)
+    print("RECHUNK TEST")
+    print("=" * 60)
+    
+    import pandas as pd
+    
+    result = PDFProcessor().process_pdf(SAMPLE_PDF)
+    
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        parquet_path = os.path.join(corpus_dir, "paper.parquet")
+        text_path = artifact_path(parquet_path)
+        size = save_text_artifact(text_path, result, {'filename': 'paper.pdf',
+                                                      'word_count': result['metadata']['word_count']})
+        print(f"  Artifact: {os.path.basename(text_path)} ({size} bytes, "
+              f"{len(result['full_text'])} chars of text)")
+        
+        artifact = load_text_artifact(text_path)
+        assert artifact['full_text'] == result['full_text']
+        assert artifact['page_starts'] == result['page_starts']
+        
+        processor = PDFProcessor(chunk_size=120, overlap=20, chunk_strategy='sentences')
+        outcomes = list(rechunk_corpus(corpus_dir, processor, workers=1))
+        
+        assert len(outcomes) == 1 and outcomes[0]['error'] is None
+        df = pd.read_parquet(parquet_path)
+    
+    expected = processor.process_pdf(SAMPLE_PDF)
+    print(f"  Rechunked: {len(df)} chunks, direct: {len(expected['chunks'])} chunks")
+    
+    assert list(df['text']) == [chunk['text'] for chunk in expected['chunks']]
+    assert list(df['start_page']) == [chunk['start_page'] for chunk in expected['chunks']]
+    assert set(df['doc_filename']) == {'paper.pdf'}
+    
+    print("\n✓ Rechunking from artifacts works!")
+
+
+def test_rechunk_parallel_dedup():
+    """Parallel rechunking deduplicates in input order with one index writer"""
+    
+    print("\n" + "=" * 60)
+    print("PARALLEL RECHUNK DEDUP TEST")
+    print("=" * 60)
+    
+    result = PDFProcessor().process_pdf(SAMPLE_PDF)
+    
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        # The same text under three document hashes: the first in input
+        # order is the original, the others duplicate it
+        for name in ("a", "b", "c"):
+            duplicate = dict(result, metadata=dict(result['metadata'], sha256=f"doc-{name}"))
+            save_text_artifact(artifact_path(os.path.join(corpus_dir, f"{name}.parquet")),
+                               duplicate, {'filename': f"{name}.pdf"})
+        
+        processor = PDFProcessor(chunk_size=200, overlap=20)
+        creator = ParquetCreator(output_formats=('parquet', 'feather'))
+        outcomes = list(rechunk_corpus(corpus_dir, processor, workers=3,
+                                       dedup_index=os.path.join(corpus_dir, "index.sqlite"),
+                                       parquet_creator=creator))
+        
+        assert [outcome['error'] for outcome in outcomes] == [None] * 3
+        assert [os.path.basename(outcome['path'])[0] for outcome in outcomes] == ["a", "b", "c"]
+        
+        flags = {}
+        for name in ("a", "b", "c"):
+            assert os.path.exists(os.path.join(corpus_dir, f"{name}.arrow"))
+            table = pq.read_table(os.path.join(corpus_dir, f"{name}.parquet"))
+            flags[name] = table.column('duplicate_of').to_pylist()
+    
+    print(f"  Duplicates: {', '.join(f'{name}={sum(f is not None for f in flags[name])}' for name in flags)}")
+    assert all(flag is None or flag.startswith("doc-a:") for flag in flags["a"])
+    assert all(flag is not None and flag.startswith("doc-a:") for flag in flags["b"] + flags["c"])
+    
+    print("\n✓ Parallel rechunk deduplication works!")
+
+
+def test_token_chunking():
+    """Token strategy packs chunks up to the budget with batched counting"""
+    
+    print("\n" + "=" * 60)
+    print("TOKEN BUDGET CHUNKING TEST")
+    print("=" * 60)
+    
+    result = PDFProcessor().process_pdf(SAMPLE_PDF)
+    
+    batches = []
+    
+    def counting_estimator(texts):
+        batches.append(len(texts))
+        return estimate_tokens(texts)
+    
+    processor = PDFProcessor(chunk_size=256, overlap=32, chunk_strategy='tokens',
+                             token_counter=counting_estimator)
+    chunks = processor.chunk_text(result['full_text'], result['page_starts'])
+    
+    token_counts = [chunk['token_count'] for chunk in chunks]
+    print(f"  {len(chunks)} chunks, tokens min/max: {min(token_counts)}/{max(token_counts)}")
+    print(f"  Counter calls: {len(batches)} (batch sizes {batches})")
+    
+    # One batch of distinct words, one batch of chunk texts
+    assert len(batches) == 2
+    assert token_counts == estimate_tokens([chunk['text'] for chunk in chunks])
+    assert max(token_counts) <= 256
+    assert sum(count >= 200 for count in token_counts[:-1]) >= len(chunks) - 2
+    assert chunks[-1]['end_word'] == result['metadata']['word_count']
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk['start_word'] <= previous['end_word']
+    
+    # A counter that charges more in context than per word forces a repack
+    def contextual(texts):
+        return [2 * len(text.split()) - 1 for text in texts]
+    
+    repacked = PDFProcessor(chunk_size=100, overlap=10, chunk_strategy='tokens',
+                            token_counter=contextual).chunk_text(result['full_text'])
+    assert max(chunk['token_count'] for chunk in repacked) <= 100
+    
+    # Other strategies keep their windows but report token counts
+    words = PDFProcessor(token_counter=estimate_tokens).process_pdf(SAMPLE_PDF)
+    assert all(chunk['token_count'] > 0 for chunk in words['chunks'])
+    assert 'token_count' not in dict(result['chunks'][0])
+    
+    print("\n✓ Token budget chunking works!")
+
+
+def test_chunk_batch():
+    """Chunks are stored column by column and convert to Arrow without copying"""
+    
+    print("\n" + "=" * 60)
+    print("CHUNK BATCH TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=50, overlap=10)
+    text = " ".join([f"w{i}" for i in range(60)] + ["caf\u00e9 na\u00efve"] * 40)
+    chunks = processor.chunk_text(text, [0, 200])
+    
+    assert isinstance(chunks, ChunkBatch)
+    print(f"  {chunks!r}: {chunks.nbytes} bytes of buffers")
+    
+    # Rows read like chunk dictionaries
+    words = text.split()
+    for chunk in chunks:
+        assert chunk['text'] == " ".join(words[chunk['start_word']:chunk['end_word']])
+        assert chunk['text'] == text[chunk.start_char:chunk.end_char]
+    assert list(dict(chunks[0])) == ['chunk_id', 'text', 'word_count', 'start_word', 'end_word',
+                                     'start_char', 'end_char', 'start_page', 'end_page']
+    assert chunks[-1]['chunk_id'] == len(chunks) - 1
+    assert [chunk['chunk_id'] for chunk in chunks[1:3]] == [1, 2]
+    
+    # Arrow columns share the batch buffers
+    table = chunks.to_arrow()
+    assert table.column_names == list(dict(chunks[0]))
+    assert table.column('text').to_pylist() == chunks.texts()
+    assert table.column('start_word').to_pylist() == list(chunks.column('start_word'))
+    start_words = table.column('start_word').chunk(0).buffers()[1]
+    assert start_words.address == pa.py_buffer(chunks.column('start_word')).address
+    
+    # Optional columns appear once set, and survive take()
+    chunks[1].duplicate_of = "doc:0"
+    kept = chunks.take([1, 2])
+    assert kept[0]['duplicate_of'] == "doc:0" and kept[1]['duplicate_of'] is None
+    assert kept.to_arrow().column('duplicate_of').to_pylist() == ["doc:0", None]
+    
+    # Plain dicts convert too
+    rebuilt = ChunkBatch.from_chunks([dict(chunk) for chunk in chunks])
+    assert [dict(chunk) for chunk in rebuilt] == [dict(chunk) for chunk in chunks]
+    
+    print("\n✓ Chunk batches work!")
+
+
+def test_streaming_parquet():
+    """Streamed chunks are written one row group at a time"""
+    
+    print("\n" + "=" * 60)
+    print("STREAMING PARQUET TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=100, overlap=10)
+    pages = list(processor.iter_pages(SAMPLE_PDF))
+    full_text, page_starts = processor._join_pages(pages)
+    expected = processor.chunk_text(full_text, page_starts)
+    document = {'filename': 'paper.pdf', 'page_count': len(pages)}
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "streamed.parquet")
+        chunks = processor.iter_chunks(processor.iter_pages(SAMPLE_PDF))
+        assert ParquetCreator().write_chunks(chunks, path, document, row_group_rows=8)
+        
+        parquet_file = pq.ParquetFile(path)
+        table = parquet_file.read()
+        print(f"  {table.num_rows} rows in {parquet_file.num_row_groups} row groups")
+        
+        assert parquet_file.num_row_groups == -(-len(expected) // 8)
+        assert table.column('text').to_pylist() == expected.texts()
+        assert table.column('start_page').to_pylist() == list(expected.column('start_page'))
+        assert set(table.column('doc_filename').to_pylist()) == {'paper.pdf'}
+        
+        # The byte limit flushes too; batches are split without per-chunk copies
+        with StreamingParquetWriter(path, row_group_bytes=1) as writer:
+            writer.write_batch(expected[:3])
+        assert pq.ParquetFile(path).num_row_groups == 3
+        
+        # The byte limit counts UTF-8 bytes: 60 characters of Greek are 120
+        # bytes, so each chunk alone reaches a 150-byte limit
+        greek = ChunkBatch.from_spans("αβγδεζ" * 10 + " " + "ηθικλμ" * 10,
+                                      [(0, 1, 0, 60, 1, 1), (1, 2, 61, 121, 1, 1)])
+        with StreamingParquetWriter(path, row_group_bytes=150) as writer:
+            for chunk in greek:
+                writer.write(chunk)
+        assert pq.ParquetFile(path).num_row_groups == 2
+        assert pq.read_table(path).column('text').to_pylist() == greek.texts()
+        
+        # A failed stream leaves no partial file behind
+        try:
+            with StreamingParquetWriter(path, row_group_rows=1) as writer:
+                writer.write(expected[0])
+                raise RuntimeError("extraction failed")
+        except RuntimeError:
+            pass
+        assert not os.path.exists(path)
+        
+        # An empty stream still produces a readable file
+        assert ParquetCreator().write_chunks(iter([]), path, document)
+        assert pq.read_table(path).num_rows == 0
+    
+    print("\n✓ Streaming Parquet writes work!")
+
+
+def test_parquet_schema():
+    """Chunk files use an explicit schema with dictionary-encoded doc_ columns"""
+    
+    print("\n" + "=" * 60)
+    print("PARQUET SCHEMA TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=100, overlap=10)
+    chunks = processor.chunk_text(" ".join(f"w{i}" for i in range(2000)))
+    document = {'document_id': 7, 'filename': 'paper.pdf', 'duplicate_chunk_count': None}
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "paper.parquet")
+        assert ParquetCreator().create_parquet(chunks, path, document)
+        
+        parquet_file = pq.ParquetFile(path)
+        schema = parquet_file.schema_arrow
+        print(f"  Columns: {schema.names}")
+        
+        assert schema.names == chunk_schema(chunks.column_names, document).names
+        assert not schema.field('text').nullable
+        assert pa.types.is_dictionary(schema.field('doc_filename').type)
+        
+        # Document metadata is readable from the footer alone
+        stored = json.loads(parquet_file.schema_arrow.metadata[DOCUMENT_METADATA_KEY])
+        assert stored == document
+        
+        # Each constant column is one dictionary entry plus run-length indices
+        for name in ('doc_document_id', 'doc_filename'):
+            column = parquet_file.metadata.row_group(0).column(schema.get_field_index(name))
+            assert 'RLE_DICTIONARY' in column.encodings
+            assert column.total_compressed_size < 200
+        
+        table = pq.read_table(path)
+        assert set(table.column('doc_filename').to_pylist()) == {'paper.pdf'}
+        assert table.column('doc_duplicate_chunk_count').null_count == len(chunks)
+    
+    print("\n✓ Parquet schema works!")
+
+
+def test_parquet_reads():
+    """Info comes from the footer; reads project columns and prune row groups"""
+    
+    print("\n" + "=" * 60)
+    print("PARQUET READ TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=20, overlap=0)
+    text = " ".join(f"w{i}" for i in range(40000))
+    page_starts = range(0, len(text), len(text) // 50)
+    chunks = processor.chunk_text(text, page_starts)
+    creator = ParquetCreator()
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "paper.parquet")
+        assert creator.write_chunks(chunks, path, {'filename': 'paper.pdf'}, row_group_rows=100)
+        
+        start = time.perf_counter()
+        info = creator.get_parquet_info(path)
+        elapsed = time.perf_counter() - start
+        print(f"  Info in {elapsed * 1000:.1f} ms: {info['row_count']} rows, "
+              f"{info['row_group_count']} row groups")
+        
+        assert info['row_count'] == len(chunks) == 2000
+        assert info['row_group_count'] == 20
+        assert info['columns'][:2] == ['chunk_id', 'text']
+        assert info['document'] == {'filename': 'paper.pdf'}
+        assert info['sample_row']['text'] == chunks[0]['text']
+        assert info['sample_row']['doc_filename'] == 'paper.pdf'
+        
+        df = creator.read_parquet(path, columns=['chunk_id', 'start_page'],
+                                  filters=[('start_page', '>=', 45)])
+        assert list(df.columns) == ['chunk_id', 'start_page']
+        assert list(df['chunk_id']) == [chunk['chunk_id'] for chunk in chunks
+                                        if chunk['start_page'] >= 45]
+        
+        # Row group statistics are what lets the filter skip row groups
+        statistics = pq.ParquetFile(path).metadata.row_group(0).column(7).statistics
+        assert statistics.has_min_max and statistics.max < 45
+    
+    print("\n✓ Parquet reads work!")
+
+
+def test_corpus_dataset():
+    """Documents append into one partitioned dataset that compacts and prunes"""
+    
+    print("\n" + "=" * 60)
+    print("CORPUS DATASET TEST")
+    print("=" * 60)
+    
+    processor = PDFProcessor(chunk_size=50, overlap=5)
+    
+    with tempfile.TemporaryDirectory() as root:
+        corpus = CorpusDataset(root, bucket_count=4)
+        
+        for document_id in range(12):
+            chunks = processor.chunk_text(" ".join(f"d{document_id}w{i}" for i in range(300)))
+            document = {'document_id': document_id, 'filename': f"paper{document_id}.pdf",
+                        # Null in some files, integers in others
+                        'duplicate_chunk_count': None if document_id % 2 else 0}
+            corpus.append(chunks, document, date(2026, 10, 1 + document_id % 2))
+        
+        total = corpus.dataset().count_rows()
+        print(f"  {total} chunks in {len(corpus.data_files())} files")
+        assert len(corpus.data_files()) == 12
+        
+        # Partition filters read only the matching directories
+        table = corpus.scan(columns=['doc_document_id'],
+                            filters=[('ingest_date', '=', '2026-10-02'), ('doc_bucket', '=', 1)])
+        assert set(table.column('doc_document_id').to_pylist()) == {1, 5, 9}
+        
+        stats = corpus.compact(target_file_bytes=1024 * 1024)
+        print(f"  Compacted: {stats}")
+        assert stats == {'partitions': 4, 'files_before': 12, 'files_after': 4}
+        assert corpus.dataset().count_rows() == total
+        
+        merged = pq.read_table(corpus.data_files()[0], columns=['doc_document_id', 'chunk_id'])
+        keys = list(zip(*(column.to_pylist() for column in merged.columns)))
+        assert keys == sorted(keys)
+        
+        # An interrupted compaction is finished by the next one
+        directory = os.path.dirname(corpus.data_files()[0])
+        original = os.path.join(directory, os.listdir(directory)[0])
+        pending = os.path.join(directory, ".part-pending.parquet.tmp")
+        pq.write_table(pq.read_table(original), pending)
+        with open(os.path.join(directory, COMPACTION_JOURNAL_FILE), 'w') as f:
+            json.dump({'inputs': [os.path.basename(original)],
+                       'outputs': [os.path.basename(pending)]}, f)
+        corpus.compact()
+        assert os.listdir(directory) == ["part-pending.parquet"]
+        assert corpus.dataset().count_rows() == total
+    
+    print("\n✓ Corpus dataset works!")
+
+
+def test_corpus_concurrent_writers():
+    """Concurrent appends and compaction lose no schema updates or rows"""
+    
+    print("\n" + "=" * 60)
+    print("CORPUS CONCURRENT WRITERS TEST")
+    print("=" * 60)
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    processor = PDFProcessor(chunk_size=50, overlap=5)
+    
+    with tempfile.TemporaryDirectory() as root:
+        corpus = CorpusDataset(root, bucket_count=2)
+        
+        def append(document_id):
+            chunks = processor.chunk_text(" ".join(f"d{document_id}w{i}" for i in range(200)))
+            # A column only this document has: its schema update must survive
+            corpus.append(chunks, {'document_id': document_id, f"extra_{document_id}": 1},
+                          date(2026, 10, 1))
+            return len(chunks)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            appends = [pool.submit(append, document_id) for document_id in range(32)]
+            compactions = [pool.submit(corpus.compact, 1024 * 1024) for _ in range(4)]
+            total = sum(future.result() for future in appends)
+            for future in compactions:
+                future.result()
+        
+        names = corpus.schema().names
+        print(f"  {total} chunks, {len(corpus.data_files())} files, {len(names)} columns")
+        assert all(f"doc_extra_{document_id}" in names for document_id in range(32))
+        assert corpus.dataset().count_rows() == total
+    
+    print("\n✓ Concurrent corpus writers are serialised!")
+
+
+def test_feather_output():
+    """Arrow IPC output is written alongside or instead of Parquet and maps without copies"""
+    
+    print("\n" + "=" * 60)
+    print("ARROW IPC OUTPUT TEST")
+    print("=" * 60)
+    
+    chunks = PDFProcessor(chunk_size=50, overlap=5).chunk_text(
+        " ".join(f"w{i}" for i in range(5000)))
+    document = {'document_id': 3, 'filename': 'paper.pdf'}
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "paper.parquet")
+        
+        creator = ParquetCreator(output_formats=['feather'])
+        assert creator.output_paths(path) == [feather_path(path)]
+        assert creator.create_parquet(chunks, path, document)
+        assert not os.path.exists(path)
+        
+        # Uncompressed buffers point into the mapped file: nothing is allocated
+        allocated = pa.total_allocated_bytes()
+        table = creator.read_feather(feather_path(path), columns=['chunk_id', 'text'])
+        assert pa.total_allocated_bytes() == allocated
+        assert table.column('text').to_pylist() == chunks.texts()
+        del table
+        
+        both = ParquetCreator(output_formats=['parquet', 'feather'], feather_compression='lz4')
+        assert both.create_parquet(chunks, path, document)
+        table = both.read_feather(feather_path(path))
+        print(f"  Parquet {os.path.getsize(path)} bytes, "
+              f"LZ4 Arrow IPC {os.path.getsize(feather_path(path))} bytes")
+        
+        assert table.to_pylist() == pq.read_table(path).to_pylist()
+        assert json.loads(table.schema.metadata[DOCUMENT_METADATA_KEY]) == document
+    
+    try:
+        ParquetCreator(output_formats=['csv'])
+        assert False, "unknown formats must be rejected"
+    except ValueError:
+        pass
+    
+    print("\n✓ Arrow IPC output works!")
+
+
+def test_write_profiles():
+    """Write profiles pick the codec, row groups, encodings and indexes"""
+    
+    print("\n" + "=" * 60)
+    print("PARQUET WRITE PROFILE TEST")
+    print("=" * 60)
+    
+    chunks = PDFProcessor(chunk_size=50, overlap=5).chunk_text(
+        " ".join(f"w{i}" for i in range(60000)))
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        files = {}
+        for profile in WRITE_PROFILES:
+            path = os.path.join(cache_dir, f"{profile}.parquet")
+            assert ParquetCreator(write_profile=profile).create_parquet(
+                chunks, path, {'filename': 'paper.pdf'})
+            files[profile] = pq.ParquetFile(path).metadata
+            print(f"  {profile}: {os.path.getsize(path)} bytes, "
+                  f"{files[profile].num_row_groups} row group(s)")
+        
+        text = {profile: metadata.row_group(0).column(1) for profile, metadata in files.items()}
+        assert text['default'].compression == 'SNAPPY'
+        assert text['fast-write'].compression == 'LZ4'
+        assert not text['fast-write'].is_stats_set
+        assert 'RLE_DICTIONARY' not in text['fast-write'].encodings
+        assert text['small-on-drive'].compression == 'ZSTD'
+        assert files['fast-scan'].num_row_groups == -(-len(chunks) // 1024)
+        assert text['fast-scan'].has_column_index and text['fast-scan'].is_stats_set
+        
+        # Dict profiles extend a preset; streamed writes use the profile too
+        path = os.path.join(cache_dir, "custom.parquet")
+        assert ParquetCreator(write_profile={'base': 'fast-scan', 'compression': 'zstd'}
+                              ).write_chunks(chunks, path, row_group_rows=500)
+        metadata = pq.ParquetFile(path).metadata
+        assert metadata.row_group(0).column(1).compression == 'ZSTD'
+        assert metadata.row_group(0).column(1).has_column_index
+        assert metadata.num_row_groups == -(-len(chunks) // 500)
+    
+    for profile in ('tiny', {'compression': 'rar'}, {'row_groups': 5}):
+        try:
+            resolve_write_profile(profile)
+            assert False, f"{profile} must be rejected"
+        except ValueError:
+            pass
+    
+    print("\n✓ Write profiles work!")
+
+
+def test_view_parquet():
+    """The viewer streams a row range from Arrow batches"""
+    
+    print("\n" + "=" * 60)
+    print("PARQUET VIEWER TEST")
+    print("=" * 60)
+    
+    chunks = PDFProcessor(chunk_size=30, overlap=0).chunk_text(
+        " ".join(f"w{i}" for i in range(30000)))
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "paper.parquet")
+        assert ParquetCreator().write_chunks(chunks, path, {'filename': 'paper.pdf'},
+                                             row_group_rows=100)
+        
+        # A range across a row group boundary, projected and previewed
+        rows = list(iter_chunk_rows(path, columns=['chunk_id', 'text'], start=195, limit=10,
+                                    preview_chars=12, batch_size=7))
+        assert [row['chunk_id'] for row in rows] == list(range(195, 205))
+        assert set(rows[0]) == {'chunk_id', 'text'}
+        assert rows[0]['text'] == chunks[195]['text'][:12]
+        
+        assert [row['chunk_id'] for row in iter_chunk_rows(path, start=990)] == list(range(990, 1000))
+        assert list(iter_chunk_rows(path, start=5000)) == []
+        
+        shown = view_parquet_file(path, start=998, limit=5, preview_chars=20)
+        assert shown == 2
+    
+    print("\n✓ Parquet viewer works!")
+
+
 if __name__ == "__main__":
     print("\n" + "=" * 60)
     print("PDF PROCESSOR FUNCTIONALITY TEST")
@@ -133,9 +1226,50 @@ if __name__ == "__main__":
     # Test text chunking
     test_text_chunking()
     
+    test_streaming_chunks()
+    test_chunk_offsets()
+    test_sentence_chunking()
+    test_token_chunking()
+    test_chunk_batch()
+    test_streaming_parquet()
+    test_parquet_schema()
+    test_parquet_reads()
+    test_corpus_dataset()
+    test_corpus_concurrent_writers()
+    test_feather_output()
+    test_write_profiles()
+    test_view_parquet()
+    test_header_footer_stripping()
+    
     # Test PDF extraction
     test_pdf_extraction()
     
+    # Test parallel extraction
+    test_parallel_extraction()
+    
+    # Test extraction cache
+    test_extraction_cache()
+    
+    # Test metadata-only inspection
+    test_inspect()
+    
+    # Test batch processing
+    test_process_many()
+    
+    # Test resource-bounded extraction
+    test_sandboxed_extraction()
+    test_sandbox_early_close()
+    
+    # Test pluggable extraction backends
+    test_extraction_backends()
+    
+    # Test image-only / empty page pre-check
+    test_textless_pages()
+    
+    # Test rechunking from stored text
+    test_rechunk_from_artifacts()
+    test_rechunk_parallel_dedup()
+    
     print("\n" + "=" * 60)
     print("TESTS COMPLETE")
     print("=" * 60)
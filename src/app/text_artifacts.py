@@ -0,0 +1,118 @@
+"""
+Text Artifacts Module
+Compressed cleaned-text artifacts stored next to each chunk Parquet file
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import pyarrow as pa
+
+
+# Bump when the artifact layout changes
+ARTIFACT_FORMAT_VERSION = 1
+
+# zstd through pyarrow's bundled codec; gzip if this build lacks it
+ARTIFACT_CODEC = 'zstd' if pa.Codec.is_available('zstd') else 'gzip'
+ARTIFACT_SUFFIXES = {'zstd': '.text.json.zst', 'gzip': '.text.json.gz'}
+
+
+def artifact_path(parquet_path: str, codec: str = ARTIFACT_CODEC) -> str:
+    """
+    Path of the text artifact that belongs to a chunk Parquet file
+
+    Args:
+        parquet_path: Chunk Parquet file (e.g. paper.parquet)
+        codec: 'zstd' or 'gzip'
+
+    Returns:
+        Artifact path (e.g. paper.text.json.zst)
+    """
+    stem = parquet_path[:-len('.parquet')] if parquet_path.endswith('.parquet') else parquet_path
+    return stem + ARTIFACT_SUFFIXES[codec]
+
+
+def parquet_path_for(path: str) -> str:
+    """
+    Chunk Parquet file that belongs to a text artifact
+
+    Args:
+        path: Artifact path
+
+    Returns:
+        Parquet path
+    """
+    for suffix in ARTIFACT_SUFFIXES.values():
+        if path.endswith(suffix):
+            return path[:-len(suffix)] + '.parquet'
+    raise ValueError(f"Not a text artifact: {path}")
+
+
+def is_artifact(path: str) -> bool:
+    """True if the path names a text artifact"""
+    return path.endswith(tuple(ARTIFACT_SUFFIXES.values()))
+
+
+def save_text_artifact(path: str, result: Dict, document: Optional[Dict] = None) -> str:
+    """
+    Write the cleaned text of a processed document
+
+    Holds everything needed to chunk the document again: the cleaned
+    text, page start offsets and metadata, plus the document-level
+    columns written into its Parquet file. The file is written to a
+    temporary name and renamed, so readers never see a partial artifact.
+
+    Args:
+        path: Artifact path (see artifact_path); the suffix picks the codec
+        result: Output of PDFProcessor.process_pdf
+        document: Document-level Parquet columns (without the doc_ prefix)
+
+    Returns:
+        Size of the artifact in bytes
+    """
+    codec = 'gzip' if path.endswith(ARTIFACT_SUFFIXES['gzip']) else 'zstd'
+    payload = json.dumps({
+        'version': ARTIFACT_FORMAT_VERSION,
+        'full_text': result['full_text'],
+        'page_starts': list(result['page_starts']),
+        'metadata': result['metadata'],
+        'document': document or {}
+    }, default=str).encode('utf-8')
+
+    # Unique per writer; created with default permissions, like the Parquet files
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with pa.CompressedOutputStream(temp_path, codec) as stream:
+            stream.write(payload)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return os.path.getsize(path)
+
+
+def load_text_artifact(path: str) -> Dict:
+    """
+    Read a text artifact
+
+    Args:
+        path: Artifact path
+
+    Returns:
+        Dict with full_text, page_starts, metadata and document
+
+    Raises:
+        ValueError: If the artifact was written in another format version
+    """
+    codec = 'gzip' if path.endswith(ARTIFACT_SUFFIXES['gzip']) else 'zstd'
+    with pa.CompressedInputStream(pa.OSFile(path), codec) as stream:
+        artifact = json.loads(stream.read())
+
+    if artifact.get('version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported text artifact version: {artifact.get('version')}")
+
+    return artifact
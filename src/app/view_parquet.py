@@ -1,67 +1,226 @@
-from src.app.gdrive_storage import GoogleDriveStorage
-from src.app.parquet_creator import ParquetCreator
-import pandas as pd
+"""
+View Parquet Module
+Prints chunk Parquet files batch by batch, locally or from Google Drive
+
+Usage (from the repository root):
+
+    python -m src.app.view_parquet paper.parquet --start 100 --limit 20
+    python -m src.app.view_parquet --drive paper.parquet --columns chunk_id,text
+"""
+
+import argparse
+import os
+from typing import Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+# Rows decoded at a time; memory stays bounded by one batch
+DEFAULT_BATCH_SIZE = 256
+
+
+def iter_chunk_rows(parquet_path: str, columns: Optional[List[str]] = None, start: int = 0,
+                    limit: Optional[int] = None, preview_chars: Optional[int] = None,
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict]:
+    """
+    Stream rows of a chunk Parquet file
+
+    Row groups that end before start are skipped using the footer row
+    counts, so reaching a late row reads nothing before it. Only the
+    requested columns are decoded, one batch at a time.
+
+    Args:
+        parquet_path: Path to parquet file
+        columns: Columns to read (None = all)
+        start: Index of the first row to yield
+        limit: Maximum number of rows (None = to the end)
+        preview_chars: Cut text to this many characters in Arrow before
+            it becomes a Python string (None = full text)
+        batch_size: Rows decoded at a time
+
+    Yields:
+        One dict per row
+    """
+    if limit is not None and limit <= 0:
+        return
+
+    with pq.ParquetFile(parquet_path, memory_map=True) as parquet_file:
+        file_metadata = parquet_file.metadata
+
+        row_groups = []
+        skip = start
+        for index in range(file_metadata.num_row_groups):
+            rows = file_metadata.row_group(index).num_rows
+            if skip >= rows and not row_groups:
+                skip -= rows
+                continue
+            row_groups.append(index)
+        if not row_groups:
+            return
+
+        remaining = limit
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups,
+                                               columns=columns):
+            if skip >= batch.num_rows:
+                skip -= batch.num_rows
+                continue
+            batch = batch.slice(skip, remaining)
+            skip = 0
+
+            if preview_chars is not None and 'text' in batch.schema.names:
+                arrays = batch.columns
+                index = batch.schema.get_field_index('text')
+                arrays[index] = pc.utf8_slice_codeunits(arrays[index], 0, preview_chars)
+                batch = pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+
+            yield from batch.to_pylist()
+
+            if remaining is not None:
+                remaining -= batch.num_rows
+                if remaining <= 0:
+                    return
+
+
+def render_chunk(row: Dict, preview_chars: int = 200) -> str:
+    """
+    Format one chunk row for the terminal
+
+    Only the columns present in the row are shown, so projected reads
+    render too.
+
+    Args:
+        row: Row from iter_chunk_rows
+        preview_chars: Characters of text shown
+
+    Returns:
+        Multi-line string
+    """
+    lines = [f"\nChunk {row.get('chunk_id', '?')}:"]
+    if 'word_count' in row:
+        lines.append(f"  Word count: {row['word_count']}")
+    if 'token_count' in row:
+        lines.append(f"  Token count: {row['token_count']}")
+    if 'start_page' in row and 'end_page' in row:
+        lines.append(f"  Pages: {row['start_page']}-{row['end_page']}")
+    if 'start_char' in row and 'end_char' in row:
+        lines.append(f"  Characters: {row['start_char']}-{row['end_char']}")
+    if row.get('duplicate_of'):
+        lines.append(f"  Duplicate of: {row['duplicate_of']}")
+    if 'doc_document_id' in row:
+        lines.append(f"  Document ID: {row['doc_document_id']}")
+    if 'doc_filename' in row:
+        lines.append(f"  Filename: {row['doc_filename']}")
+
+    if 'text' in row:
+        text = row['text']
+        lines.append(f"\n  Text preview (first {preview_chars} chars):")
+        lines.append(f"  {text[:preview_chars]}{'...' if len(text) > preview_chars else ''}")
+    lines.append("-" * 60)
+
+    return "\n".join(lines)
+
+
+def view_parquet_file(parquet_path: str, columns: Optional[List[str]] = None, start: int = 0,
+                      limit: Optional[int] = 20, preview_chars: int = 200) -> int:
+    """
+    Print a chunk Parquet file's footer summary and a range of its rows
+
+    Args:
+        parquet_path: Path to parquet file
+        columns: Columns to show (None = all)
+        start: Index of the first row shown
+        limit: Maximum number of rows shown (None = all)
+        preview_chars: Characters of text shown per chunk
+
+    Returns:
+        Number of rows printed
+    """
+    with pq.ParquetFile(parquet_path, memory_map=True) as parquet_file:
+        file_metadata = parquet_file.metadata
+        names = parquet_file.schema_arrow.names
+
+    print(f"\n✓ Parquet file contents:")
+    print(f"  Rows: {file_metadata.num_rows} in {file_metadata.num_row_groups} row group(s)")
+    print(f"  Columns: {names}")
+    print(f"  Size: {os.path.getsize(parquet_path)} bytes")
+
+    end = file_metadata.num_rows if limit is None else min(file_metadata.num_rows, start + limit)
+    print(f"\n📋 Rows {start}-{max(start, end) - 1}:")
+    print("=" * 60)
+
+    shown = 0
+    for row in iter_chunk_rows(parquet_path, columns, start, limit, preview_chars + 1):
+        print(render_chunk(row, preview_chars))
+        shown += 1
+
+    return shown
+
+
+def view_parquet_from_drive(filename: Optional[str] = None, columns: Optional[List[str]] = None,
+                            start: int = 0, limit: Optional[int] = 20, preview_chars: int = 200):
+    """
+    Download and view a Parquet file from Google Drive
+
+    Args:
+        filename: File in the parquet/ folder (None = the first .parquet file)
+        columns: Columns to show (None = all)
+        start: Index of the first row shown
+        limit: Maximum number of rows shown (None = all)
+        preview_chars: Characters of text shown per chunk
+    """
+    from src.app.gdrive_storage import GoogleDriveStorage
 
-def view_parquet_from_drive():
-    """Download and view Parquet file from Google Drive"""
     print("=" * 60)
     print("View Parquet File from Google Drive")
     print("=" * 60)
-    
+
     # Initialize storage
     storage = GoogleDriveStorage()
-    
-    # List files in parquet folder
+
+    # The parquet/ folder also holds text artifacts and Arrow IPC files
     print("\n📁 Files in parquet/ folder:")
-    files = storage.list_files_in_folder('parquet')
-    
+    files = [file for file in storage.list_files_in_folder('parquet')
+             if file['name'].endswith('.parquet') and (filename is None or file['name'] == filename)]
+
     if not files:
         print("No parquet files found!")
         return
-    
-    # Get the first parquet file
+
     parquet_file = files[0]
-    file_id = parquet_file['id']
-    filename = parquet_file['name']
-    
-    print(f"\n📥 Downloading: {filename}")
-    
-    # Download to local
-    local_path = f"temp_{filename}"
-    storage.download_file(file_id, local_path)
-    
-    # Read and display
-    print(f"\n📊 Reading Parquet file...")
-    df = pd.read_parquet(local_path)
-    
-    print(f"\n✓ Parquet file contents:")
-    print(f"  Rows: {len(df)}")
-    print(f"  Columns: {list(df.columns)}")
-    
-    print(f"\n📋 Data preview:")
-    print("="*60)
-    
-    # Show each chunk
-    for idx, row in df.iterrows():
-        print(f"\nChunk {row['chunk_id']}:")
-        print(f"  Position: {row['position']}%")
-        print(f"  Word count: {row['word_count']}")
-        print(f"  Char count: {row['char_count']}")
-        print(f"  Document ID: {row['doc_document_id']}")
-        print(f"  Filename: {row['doc_filename']}")
-        print(f"\n  Text preview (first 200 chars):")
-        print(f"  {row['text'][:200]}...")
-        print("-"*60)
-    
-    # Show full dataframe info
-    print(f"\n📊 Full DataFrame Info:")
-    print(df.info())
-    
-    # Cleanup
-    import os
-    if os.path.exists(local_path):
-        os.remove(local_path)
-        print(f"\n✓ Cleaned up temporary file")
+    print(f"\n📥 Downloading: {parquet_file['name']}")
+
+    local_path = f"temp_{parquet_file['name']}"
+    storage.download_file(parquet_file['id'], local_path)
+
+    try:
+        view_parquet_file(local_path, columns, start, limit, preview_chars)
+    finally:
+        if os.path.exists(local_path):
+            os.remove(local_path)
+            print(f"\n✓ Cleaned up temporary file")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print rows of a chunk Parquet file")
+    parser.add_argument('path', nargs='?', help="Local Parquet file")
+    parser.add_argument('--drive', metavar='NAME', nargs='?', const='',
+                        help="View a file from the Drive parquet/ folder (default: the first)")
+    parser.add_argument('--columns', help="Comma-separated columns to show")
+    parser.add_argument('--start', type=int, default=0, help="First row to show")
+    parser.add_argument('--limit', type=int, default=20, help="Rows to show (0 = all)")
+    parser.add_argument('--preview', type=int, default=200, help="Characters of text per chunk")
+    args = parser.parse_args()
+
+    columns = args.columns.split(',') if args.columns else None
+    limit = args.limit or None
+
+    if args.path:
+        view_parquet_file(args.path, columns, args.start, limit, args.preview)
+    else:
+        view_parquet_from_drive(args.drive or None, columns, args.start, limit, args.preview)
+
 
 if __name__ == "__main__":
-    view_parquet_from_drive()
\ No newline at end of file
+    main()